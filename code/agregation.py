@@ -0,0 +1,286 @@
+import time
+import threading
+from collections import deque
+from canal import Canal
+from protocole import Trame, Emetteur, Recepteur, TYPE_DATA, TYPE_ACK, TIMEOUT, get_timestamp
+
+# Agregation de liens: un seul transfert reparti sur plusieurs canaux
+# - espace de numeros de sequence global (numero absolu, transmis modulo 256)
+# - un thread et un etat ARQ (stop-and-wait) par lien
+# - ordonnanceur: round-robin ('rr') ou pondere par le debit utile mesure ('pondere')
+# - tampon de reordonnancement cote recepteur
+# Une trame qui echoue max_tentatives fois sur un lien est remise dans la file
+# globale et peut partir sur un autre lien.
+# Limite: chaque lien est en stop-and-wait (une trame en vol par lien), le debit agrege
+# ne depasse donc pas somme(taille_trame / RTT) sur les liens, soit nb_liens trames par RTT
+# (plafond affiche dans les resultats). PROFONDEUR ne fait que preparer les files d'avance.
+
+FENETRE_GLOBALE = 128  # ecart max entre la plus ancienne trame non acquittee et la plus recente envoyee
+PROFONDEUR = 8         # nombre total de trames distribuees d'avance aux liens
+LISSAGE = 0.2          # poids d'une nouvelle mesure dans la moyenne mobile du debit
+
+
+class Lien:
+    # Un canal membre de l'agregat et son etat
+
+    def __init__(self, numero, canal):
+        self.numero = numero
+        self.canal = canal
+        self.file = deque()  # trames attribuees a ce lien, pas encore envoyees
+
+        # Mesures
+        self.debit = None  # debit utile estime (octets/s), None = pas encore mesure
+        self.rtt = None
+
+        # Statistiques
+        self.trames_envoyees = 0
+        self.trames_retransmises = 0
+        self.duplicatas = 0  # trames deja recues: l'ACK precedent s'etait perdu
+        self.trames_acquittees = 0
+        self.octets_acquittes = 0
+
+    def mesurer(self, octets, duree, succes):
+        # Moyenne mobile du debit utile: un echec compte comme un debit nul
+        instant = octets / duree if succes and duree > 0 else 0.0
+        if self.debit is None:
+            self.debit = instant
+        else:
+            self.debit = (1 - LISSAGE) * self.debit + LISSAGE * instant
+        if succes:
+            self.rtt = duree if self.rtt is None else (1 - LISSAGE) * self.rtt + LISSAGE * duree
+
+
+class OrdonnanceurLiens:
+    # Distribue les trames aux liens et suit les acquittements (partage entre threads)
+
+    def __init__(self, liens, nb_trames, mode='pondere', profondeur=PROFONDEUR):
+        if mode not in ('rr', 'pondere'):
+            raise ValueError("mode doit etre 'rr' ou 'pondere'")
+        self.liens = liens
+        self.nb_trames = nb_trames
+        self.mode = mode
+        self.profondeur = profondeur
+
+        self.verrou = threading.Lock()
+        self.attente = deque(range(nb_trames))  # trames pas encore attribuees
+        self.acquittees = [False] * nb_trames
+        self.base = 0  # plus ancienne trame non acquittee
+        self.prochain_rr = 0
+
+    def _poids(self, lien):
+        # Liens pas encore mesures: poids moyen des autres (ou 1)
+        mesures = [l.debit for l in self.liens if l.debit is not None]
+        defaut = sum(mesures) / len(mesures) if mesures else 1.0
+        poids = lien.debit if lien.debit is not None else defaut
+        return max(poids, defaut * 0.01, 1e-9)
+
+    def _capacite(self, lien):
+        # Nombre de trames qu'un lien peut avoir en file
+        if self.mode == 'rr':
+            return max(1, self.profondeur // len(self.liens))
+        total = sum(self._poids(l) for l in self.liens)
+        return max(1, round(self.profondeur * self._poids(lien) / total))
+
+    def _distribuer(self):
+        while self.attente and self.attente[0] < self.base + FENETRE_GLOBALE:
+            candidats = [l for l in self.liens if len(l.file) < self._capacite(l)]
+            if not candidats:
+                return
+
+            if self.mode == 'rr':
+                lien = None
+                for _ in range(len(self.liens)):
+                    l = self.liens[self.prochain_rr % len(self.liens)]
+                    self.prochain_rr += 1
+                    if l in candidats:
+                        lien = l
+                        break
+            else:
+                lien = min(candidats, key=lambda l: (len(l.file) + 1) / self._poids(l))
+
+            lien.file.append(self.attente.popleft())
+
+    def prochaine(self, lien):
+        # Prochaine trame a envoyer sur ce lien (None si rien pour l'instant)
+        with self.verrou:
+            if not lien.file:
+                self._distribuer()
+            if lien.file:
+                return lien.file.popleft()
+            return None
+
+    def acquitter(self, index):
+        with self.verrou:
+            self.acquittees[index] = True
+            while self.base < self.nb_trames and self.acquittees[self.base]:
+                self.base += 1
+
+    def remettre(self, index):
+        # La trame a echoue sur un lien: elle repart en tete de la file globale
+        with self.verrou:
+            self.attente.appendleft(index)
+
+    def termine(self):
+        return self.base >= self.nb_trames
+
+
+class RecepteurReordonnancement:
+    # Recoit les trames de tous les liens et les livre dans l'ordre global
+
+    def __init__(self, recepteur):
+        self.recepteur = recepteur
+        self.verrou = threading.Lock()
+        self.tampon = {}  # numero absolu -> donnees, en attente des trames precedentes
+        self.taille_max_tampon = 0
+
+    def recevoir(self, trame):
+        # Retourne True si la trame est nouvelle, False si c'est un duplicata
+        # (deja livree ou deja dans le tampon); dans les deux cas l'emetteur doit recevoir un ACK
+        with self.verrou:
+            attendu = self.recepteur.dernier_num_seq + 1
+            # Numero absolu a partir du numero modulo 256: l'ordonnanceur n'envoie que des trames
+            # a moins de FENETRE_GLOBALE de la base, un numero au-dela est une trame deja livree
+            index = attendu + ((trame.num_seq - attendu) % 256)
+            if index >= attendu + FENETRE_GLOBALE or index in self.tampon:
+                self.recepteur.trames_rejetees += 1
+                return False
+
+            self.tampon[index] = trame.conserver().data
+            self.recepteur.trames_acceptees += 1
+            self.taille_max_tampon = max(self.taille_max_tampon, len(self.tampon))
+
+            # Livrer toutes les trames contigues
+            while attendu in self.tampon:
+                self.recepteur.trames_recues.append((attendu, self.tampon.pop(attendu)))
+                self.recepteur.dernier_num_seq = attendu
+                attendu += 1
+            return True
+
+
+def _boucle_lien(lien, ordonnanceur, reception, trames_data, timeout, max_tentatives):
+    # Thread d'un lien: ARQ stop-and-wait sur les trames attribuees a ce lien
+    while not ordonnanceur.termine():
+        index = ordonnanceur.prochaine(lien)
+        if index is None:
+            time.sleep(0.001)
+            continue
+
+        data = trames_data[index]
+        trame_bytes = Trame(index % 256, data, TYPE_DATA).serialiser()
+        acquittee = False
+
+        for tentative in range(max_tentatives):
+            if tentative == 0:
+                lien.trames_envoyees += 1
+            else:
+                lien.trames_retransmises += 1
+
+            debut = time.time()
+            trame_transmise = lien.canal.transmettre(trame_bytes)
+            if trame_transmise is not None:
+                trame_recue, crc_valide = Trame.deserialiser(trame_transmise, copier=False)
+                if crc_valide:
+                    if not reception.recevoir(trame_recue):
+                        lien.duplicatas += 1
+                    ack = Trame(trame_recue.num_seq, b'', TYPE_ACK).serialiser()
+                    with reception.verrou:
+                        reception.recepteur.acks_envoyes += 1
+                    ack_transmis = lien.canal.transmettre(ack)
+                    if ack_transmis is not None and Trame.deserialiser(ack_transmis)[1]:
+                        acquittee = True
+
+            duree = time.time() - debut
+            lien.mesurer(len(data), duree, acquittee)
+            if acquittee:
+                break
+
+            # Pas d'ACK: attendre la fin du timeout avant de reessayer
+            time.sleep(max(0.0, timeout - duree))
+
+        if acquittee:
+            lien.trames_acquittees += 1
+            lien.octets_acquittes += len(data)
+            ordonnanceur.acquitter(index)
+        else:
+            print(f"[{get_timestamp()}] 🔀 Lien {lien.numero}: trame #{index} remise dans la file globale")
+            ordonnanceur.remettre(index)
+
+
+def simulation_agregee(fichier_path, parametres_canaux, timeout=TIMEOUT, mode='pondere',
+                       profondeur=PROFONDEUR, max_tentatives=3):
+    # Simulation d'un transfert reparti sur plusieurs canaux
+    # parametres_canaux: liste de dicts {'probErreur', 'probPerte', 'delaiMax'}
+
+    print("\n" + "="*70)
+    print(f"SIMULATION AGREGATION DE LIENS ({len(parametres_canaux)} liens, mode={mode})")
+    print("="*70)
+    for i, p in enumerate(parametres_canaux):
+        print(f"Lien {i}: {p}")
+    print("="*70 + "\n")
+
+    liens = [Lien(i, Canal(**p)) for i, p in enumerate(parametres_canaux)]
+    recepteur = Recepteur(liens[0].canal)
+    reception = RecepteurReordonnancement(recepteur)
+
+    with open(fichier_path, 'rb') as f:
+        message = f.read()
+    trames_data = Emetteur(liens[0].canal)._segmenter(message)
+    ordonnanceur = OrdonnanceurLiens(liens, len(trames_data), mode, profondeur)
+
+    temps_debut = time.time()
+    threads = [threading.Thread(target=_boucle_lien,
+                                args=(lien, ordonnanceur, reception, trames_data, timeout, max_tentatives))
+               for lien in liens]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duree = time.time() - temps_debut
+
+    message_recu = recepteur.recomposer_message()
+
+    print("\n" + "="*70)
+    print("RESULTATS PAR LIEN")
+    print("="*70)
+    for lien in liens:
+        part = lien.octets_acquittes / max(len(message), 1) * 100
+        rtt = f"{lien.rtt*1000:.1f}ms" if lien.rtt is not None else "-"
+        print(f"Lien {lien.numero}: envoyees={lien.trames_envoyees}, retransmises={lien.trames_retransmises}, "
+              f"duplicatas={lien.duplicatas}, acquittees={lien.trames_acquittees} ({part:.1f}% des octets), "
+              f"RTT={rtt}")
+    print("-"*70)
+    # Stop-and-wait par lien: au mieux une trame par RTT sur chaque lien
+    plafond = sum(len(trames_data[0]) / lien.rtt for lien in liens if lien.rtt) if trames_data else 0.0
+    print(f"Duree totale     : {duree:.2f} s")
+    print(f"Debit agrege     : {len(message) / duree:.0f} octets/s (plafond stop-and-wait: {plafond:.0f} octets/s)")
+    print(f"Tampon reordon.  : {reception.taille_max_tampon} trames max")
+    print(f"Identiques       : {message == message_recu}")
+    print("="*70 + "\n")
+
+    return {
+        'envoyees': sum(l.trames_envoyees for l in liens),
+        'retransmises': sum(l.trames_retransmises for l in liens),
+        'acks': sum(l.trames_acquittees for l in liens),
+        'duree': duree,
+        'succes': message == message_recu,
+        'debit': len(message) / duree,
+        'plafond': plafond,
+        'duplicatas': sum(l.duplicatas for l in liens),
+        'parts': [l.octets_acquittes for l in liens]
+    }
+
+
+if __name__ == "__main__":
+    fichier_message = '../message.txt'
+    lien_normal = {'probErreur': 0.02, 'probPerte': 0.02, 'delaiMax': 0.02}
+    lien_degrade = {'probErreur': 0.20, 'probPerte': 0.20, 'delaiMax': 0.06}
+
+    # Reference: un seul lien
+    simulation_agregee(fichier_message, [lien_normal], timeout=0.1)
+
+    # Trois liens identiques: le debit doit approcher 3x
+    simulation_agregee(fichier_message, [lien_normal] * 3, timeout=0.1, mode='rr')
+
+    # Deux bons liens + un lien degrade: le mode pondere lui donne une plus petite part
+    simulation_agregee(fichier_message, [lien_normal, lien_normal, lien_degrade], timeout=0.1, mode='rr')
+    simulation_agregee(fichier_message, [lien_normal, lien_normal, lien_degrade], timeout=0.1, mode='pondere')
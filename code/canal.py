@@ -1,5 +1,8 @@
+import queue
 import random
+import threading
 import time
+from stuffing import bytes_to_bits, bits_to_bytes
 
 
 class Canal:
@@ -22,6 +25,10 @@ class Canal:
         # On simule un delai random, avec un delai maximum
         delai = random.uniform(0, self.delaiMax)
         time.sleep(delai)
+        return self.alterer(data)
+
+    def alterer(self, data):
+        # Pertes et erreurs de transmission, sans le delai (voir LienAsynchrone)
 
         # Simulation de perte de trame
         if random.random() < self.probPerte:
@@ -37,6 +44,43 @@ class Canal:
         self.trames_transmises = self.trames_transmises + 1
         return data
     
+    def transmettre_flux(self, data, frontieres=None):
+        # Simule la transmission d'un flux contenant plusieurs trames collees
+        # (flags partages, voir Trame.serialiser_flux)
+        # frontieres: position (en bits) du flag d'ouverture de chaque trame, puis du flag final
+        # (voir Emetteur.envoyer_flux); None = une seule trame
+        # Un seul delai pour tout le flux; pertes et erreurs sont tirees pour chaque trame:
+        #  - perte: la trame et son flag d'ouverture sont retires du flux, le flag de la
+        #    suivante la delimite toujours: les trames voisines restent intactes
+        #  - erreur: un bit inverse dans la trame
+
+        delai = random.uniform(0, self.delaiMax)
+        time.sleep(delai)
+
+        if frontieres is None:
+            return self.alterer(data)
+        bits = bytes_to_bits(data)
+
+        morceaux = []
+        for debut, fin in zip(frontieres, frontieres[1:]):
+            if random.random() < self.probPerte:
+                self.trames_perdues = self.trames_perdues + 1
+                continue
+
+            morceau = bits[debut:fin]
+            if random.random() < self.probErreur:
+                self.trames_corrompues = self.trames_corrompues + 1
+                position = random.randrange(len(morceau))
+                morceau = morceau[:position] + ('1' if morceau[position] == '0' else '0') + morceau[position + 1:]
+
+            self.trames_transmises = self.trames_transmises + 1
+            morceaux.append(morceau)
+
+        if not morceaux:
+            return None  # tout le flux est perdu
+        morceaux.append(bits[frontieres[-1]:frontieres[-1] + 8])  # flag final
+        return bits_to_bytes(''.join(morceaux))
+
     def introduire_erreur(self, data):
         # Simule l'introduction d'une erreur au donnees d'une trame
         if len(data) == 0:
@@ -90,6 +134,47 @@ class Canal:
         
         print("=" * 60 + "\n")
 
+class LienAsynchrone:
+    # Un sens d'un lien ou plusieurs trames sont en vol en meme temps
+    # envoyer() rend la main tout de suite; un fil livre chaque trame a livrer(data) apres
+    # son delai (U(0, delaiMax) du canal), dans l'ordre d'envoi comme sur un vrai lien.
+    # Pertes et erreurs: celles du canal (Canal.alterer). Un seul fil doit appeler envoyer().
+    # inactif(): appele quand plus aucune trame n'attend (ex: decoder un lot partiel)
+
+    def __init__(self, canal, livrer, inactif=None):
+        self.canal = canal
+        self.livrer = livrer
+        self.inactif = inactif
+        self.file = queue.Queue()
+        self.derniere_arrivee = 0.0
+        self.fil = threading.Thread(target=self._boucle, daemon=True)
+        self.fil.start()
+
+    def envoyer(self, data):
+        arrivee = max(time.time() + random.uniform(0, self.canal.delaiMax), self.derniere_arrivee)
+        self.derniere_arrivee = arrivee
+        self.file.put((arrivee, data))
+
+    def _boucle(self):
+        while True:
+            element = self.file.get()
+            if element is None:
+                return
+            arrivee, data = element
+            attente = arrivee - time.time()
+            if attente > 0:
+                time.sleep(attente)
+            data = self.canal.alterer(data)
+            if data is not None:
+                self.livrer(data)
+            if self.inactif is not None and self.file.empty():
+                self.inactif()
+
+    def fermer(self):
+        self.file.put(None)
+        self.fil.join()
+
+
 if __name__ == "__main__":
     # Test 1: Canal avec probabilites moyennes
     print("\n--- Test 1: Canal bruite (probErreur=0.3, probPerte=0.2) ---")
@@ -0,0 +1,135 @@
+import bz2
+import lzma
+import zlib
+
+# Compression optionnelle du fichier avant la segmentation
+# L'algorithme est annonce dans l'en-tete de chaque trame (bits 4 a 6
+# de l'octet de type) pour que le recepteur decompresse au fil de la livraison.
+
+COMPRESSION_AUCUNE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+COMPRESSION_BZ2 = 3
+
+NOMS_COMPRESSION = {
+    'aucune': COMPRESSION_AUCUNE,
+    'zlib': COMPRESSION_ZLIB,
+    'lzma': COMPRESSION_LZMA,
+    'bz2': COMPRESSION_BZ2,
+}
+
+TAILLE_BLOC_LECTURE = 64 * 1024  # Lecture du fichier par blocs de 64 Ko
+SEUIL_AUTO = 0.90                # Mode auto: on compresse seulement si taille < 90%
+
+
+def creer_compresseur(algo):
+    if algo == COMPRESSION_ZLIB:
+        return zlib.compressobj(6)
+    if algo == COMPRESSION_LZMA:
+        return lzma.LZMACompressor()
+    if algo == COMPRESSION_BZ2:
+        return bz2.BZ2Compressor()
+    raise ValueError(f"Algorithme de compression inconnu: {algo}")
+
+
+def creer_decompresseur(algo):
+    if algo == COMPRESSION_ZLIB:
+        return zlib.decompressobj()
+    if algo == COMPRESSION_LZMA:
+        return lzma.LZMADecompressor()
+    if algo == COMPRESSION_BZ2:
+        return bz2.BZ2Decompressor()
+    raise ValueError(f"Algorithme de compression inconnu: {algo}")
+
+
+def compresser_flux(fichier, algo, taille_bloc=TAILLE_BLOC_LECTURE):
+    # Generateur: lit le fichier par blocs et produit les blocs compresses
+    # Ne garde jamais tout le fichier en memoire
+    if algo == COMPRESSION_AUCUNE:
+        while True:
+            bloc = fichier.read(taille_bloc)
+            if not bloc:
+                return
+            yield bloc
+
+    compresseur = creer_compresseur(algo)
+    while True:
+        bloc = fichier.read(taille_bloc)
+        if not bloc:
+            break
+        sortie = compresseur.compress(bloc)
+        if sortie:
+            yield sortie
+    sortie = compresseur.flush()
+    if sortie:
+        yield sortie
+
+
+def choisir_compression(fichier, algo=COMPRESSION_ZLIB, seuil=SEUIL_AUTO, taille_echantillon=TAILLE_BLOC_LECTURE):
+    # Mode auto: compresse un echantillon du debut du fichier et mesure le ratio
+    # Retourne (algo retenu, ratio mesure). Le fichier est remis a sa position initiale.
+    position = fichier.tell()
+    echantillon = fichier.read(taille_echantillon)
+    fichier.seek(position)
+
+    if not echantillon:
+        return COMPRESSION_AUCUNE, 1.0
+
+    compresseur = creer_compresseur(algo)
+    taille = len(compresseur.compress(echantillon)) + len(compresseur.flush())
+    ratio = taille / len(echantillon)
+
+    if ratio < seuil:
+        return algo, ratio
+    return COMPRESSION_AUCUNE, ratio
+
+
+class Decompresseur:
+    # Decompression incrementale: les donnees des trames sont fournies
+    # dans l'ordre de livraison, le texte clair est produit au fur et a mesure
+
+    def __init__(self, algo):
+        self.algo = algo
+        self.objet = creer_decompresseur(algo)
+        self.termine = False
+
+    def alimenter(self, donnees):
+        return self.objet.decompress(donnees)
+
+    def terminer(self):
+        # Vide ce qui reste dans le decompresseur (zlib seulement garde un tampon)
+        if self.termine:
+            return b''
+        self.termine = True
+        if self.algo == COMPRESSION_ZLIB:
+            return self.objet.flush()
+        return b''
+
+
+if __name__ == "__main__":
+    import io
+
+    with open('../message.txt', 'rb') as f:
+        original = f.read()
+
+    for nom in ('zlib', 'lzma', 'bz2'):
+        algo = NOMS_COMPRESSION[nom]
+        blocs = list(compresser_flux(io.BytesIO(original), algo, taille_bloc=1000))
+        compresse = b''.join(blocs)
+
+        # Decompression par petits morceaux (comme des trames de 100 octets)
+        decompresseur = Decompresseur(algo)
+        resultat = b''
+        for i in range(0, len(compresse), 100):
+            resultat = resultat + decompresseur.alimenter(compresse[i:i+100])
+        resultat = resultat + decompresseur.terminer()
+
+        print(f"{nom:5s}: {len(original)} -> {len(compresse)} octets "
+              f"({len(compresse) / len(original) * 100:.1f}%), identique: {resultat == original}")
+
+    # Mode auto sur des donnees deja compressees -> compression ignoree
+    import os
+    algo, ratio = choisir_compression(io.BytesIO(os.urandom(10000)))
+    print(f"Auto sur donnees aleatoires: algo={algo}, ratio={ratio:.2f}")
+    algo, ratio = choisir_compression(io.BytesIO(original))
+    print(f"Auto sur message.txt       : algo={algo}, ratio={ratio:.2f}")
@@ -0,0 +1,173 @@
+import time
+import struct
+from collections import deque
+from canal import Canal
+from compression import COMPRESSION_AUCUNE
+from protocole import Trame, Emetteur, Recepteur, TYPE_ACK, TYPE_RNR, TIMEOUT, transfert_gobackn
+
+# Controle de flux pilote par le recepteur (semantique HDLC RR/RNR)
+# Le recepteur place les trames livrees dans un tampon borne (capacite en trames)
+# que l'application (consommateur lent: disque, decompression...) vide a son rythme.
+# Chaque ACK annonce la place libre dans le tampon:
+# - ACK (RR) : donnees = fenetre annoncee sur 2 octets
+# - RNR      : tampon plein, fenetre 0
+# L'emetteur n'envoie jamais au-dela de (dernier ACK + fenetre annoncee).
+# Quand le consommateur libere de la place apres un RNR, le recepteur envoie un RR
+# de mise a jour; si ce RR se perd, l'emetteur sonde au timeout en renvoyant
+# la derniere trame acquittee (le recepteur y repond avec sa fenetre courante).
+
+FENETRE = struct.Struct('!H')
+CAPACITE_TAMPON = 16  # trames
+
+
+class RecepteurBorne(Recepteur):
+    # Recepteur Go-Back-N avec tampon de livraison borne et fenetre annoncee
+
+    def __init__(self, canal, capacite=CAPACITE_TAMPON, debit_consommateur=None):
+        super().__init__(canal)
+        self.capacite = capacite                      # None = tampon non borne
+        self.debit_consommateur = debit_consommateur  # octets/s, None = consommation immediate
+
+        # Trames livrees, pas encore lues par l'application: (num_seq, data, compression)
+        # Les trames compressees y attendent aussi: elles sont decompressees a la lecture
+        self.tampon = deque()
+        self.credit = 0.0
+        self.dernier_instant = None
+        self.rnr_annonce = False  # le dernier ACK envoye annoncait une fenetre nulle
+
+        # Statistiques
+        self.taille_max_tampon = 0
+        self.trames_refusees = 0  # trames valides jetees faute de place
+        self.rnr_envoyes = 0
+
+    def fenetre(self):
+        # Place libre dans le tampon (en trames), None si le tampon n'est pas borne
+        if self.capacite is None:
+            return None
+        return self.capacite - len(self.tampon)
+
+    def traiter_trame(self, trame, crc_valide):
+        if crc_valide and self.fenetre() == 0 and trame.num_seq == (self.dernier_num_seq + 1) % 256:
+            # Tampon plein: la trame attendue est jetee, l'emetteur devra la renvoyer
+            self.trames_refusees += 1
+            self.acks_envoyes += 1
+            return self.dernier_num_seq
+
+        return super().traiter_trame(trame, crc_valide)
+
+    def livrer(self, num, data, compression=COMPRESSION_AUCUNE):
+        # Trame livree: elle attend le consommateur dans le tampon
+        self.tampon.append((num, data, compression))
+        self.taille_max_tampon = max(self.taille_max_tampon, len(self.tampon))
+
+    def trame_ack(self, num):
+        # ACK (RR) portant la fenetre annoncee, ou RNR si le tampon est plein
+        fenetre = self.fenetre()
+        if fenetre is None:
+            return Trame(num % 256, b'', TYPE_ACK)
+        self.rnr_annonce = fenetre == 0
+        if self.rnr_annonce:
+            self.rnr_envoyes += 1
+            return Trame(num % 256, FENETRE.pack(0), TYPE_RNR)
+        return Trame(num % 256, FENETRE.pack(fenetre), TYPE_ACK)
+
+    def consommer(self, maintenant=None):
+        # L'application lit le tampon au debit du consommateur
+        # Retourne un RR de mise a jour si un RNR avait ete annonce et qu'il y a de la place
+        if maintenant is None:
+            maintenant = time.time()
+        if self.dernier_instant is not None and self.debit_consommateur is not None:
+            self.credit += (maintenant - self.dernier_instant) * self.debit_consommateur
+        self.dernier_instant = maintenant
+
+        while self.tampon and (self.debit_consommateur is None or self.credit >= len(self.tampon[0][1])):
+            num_seq, data, compression = self.tampon.popleft()
+            self.credit -= len(data)
+            Recepteur.livrer(self, num_seq, data, compression)
+        if not self.tampon:
+            # Un consommateur inactif n'accumule pas de credit
+            self.credit = min(self.credit, 0.0)
+
+        if self.rnr_annonce and self.fenetre() > 0 and self.dernier_num_seq >= 0:
+            self.acks_envoyes += 1
+            return self.trame_ack(self.dernier_num_seq)
+        return None
+
+
+def simulation_controle_flux(fichier_path, debit_consommateur, capacite=CAPACITE_TAMPON, controle=True,
+                             probErreur=0.05, probPerte=0.05, delaiMax=0.005, timeout=TIMEOUT,
+                             taille_fenetre=32):
+    # Transfert Go-Back-N vers un consommateur lent
+    # - capacite: taille du tampon du recepteur en trames (None = non borne)
+    # - controle: l'emetteur respecte la fenetre annoncee (sinon il l'ignore)
+
+    print("\n" + "="*70)
+    print(f"SIMULATION CONTROLE DE FLUX (capacite={capacite}, controle={'oui' if controle else 'non'})")
+    print("="*70)
+    print(f"Consommateur: {debit_consommateur} octets/s, fenetre emetteur: {taille_fenetre}")
+    print("="*70 + "\n")
+
+    canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre)
+    recepteur = RecepteurBorne(canal, capacite, debit_consommateur)
+
+    with open(fichier_path, 'rb') as f:
+        message = f.read()
+    temps_debut = time.time()
+
+    # Boucle Go-Back-N commune: le consommateur lit le tampon a chaque tour (RR de mise a
+    # jour apres un RNR); sans controle, l'emetteur ignore la fenetre annoncee
+    temps_bloque = transfert_gobackn(emetteur, recepteur, emetteur._segmenter(message),
+                                     trame_ack=recepteur.trame_ack, a_chaque_tour=recepteur.consommer,
+                                     fenetre_annoncee=controle)['temps_bloque']
+
+    # L'application termine de lire le tampon
+    while recepteur.tampon:
+        time.sleep(0.001)
+        recepteur.consommer()
+    duree = time.time() - temps_debut
+    message_recu = recepteur.recomposer_message()
+
+    print("\n" + "="*70)
+    print("RESULTATS")
+    print("="*70)
+    print(f"Trames envoyees     : {emetteur.trames_envoyees}")
+    print(f"Trames retransmises : {emetteur.trames_retransmises}")
+    print(f"Blocages (fenetre)  : {emetteur.blocages_flux} ({temps_bloque:.2f} s)")
+    print(f"RNR envoyes         : {recepteur.rnr_envoyes}")
+    print(f"Trames refusees     : {recepteur.trames_refusees} (tampon plein)")
+    print(f"Tampon recepteur    : {recepteur.taille_max_tampon} trames max")
+    print(f"Duree totale        : {duree:.2f} s")
+    print(f"Identiques          : {message == message_recu}")
+    print("="*70 + "\n")
+
+    return {
+        'envoyees': emetteur.trames_envoyees,
+        'retransmises': emetteur.trames_retransmises,
+        'blocages': emetteur.blocages_flux,
+        'temps_bloque': temps_bloque,
+        'rnr': recepteur.rnr_envoyes,
+        'refusees': recepteur.trames_refusees,
+        'tampon_max': recepteur.taille_max_tampon,
+        'duree': duree,
+        'succes': message == message_recu
+    }
+
+
+if __name__ == "__main__":
+    fichier_message = '../message.txt'
+
+    # Consommateur lent (4000 octets/s) derriere un lien plus rapide
+    # Tampon non borne: la memoire du recepteur suit l'avance de l'emetteur
+    simulation_controle_flux(fichier_message, 4000, capacite=None, controle=False, timeout=0.05)
+
+    # Tampon borne sans controle de flux: les trames en trop sont jetees et renvoyees
+    simulation_controle_flux(fichier_message, 4000, capacite=8, controle=False, timeout=0.05)
+
+    # Tampon borne avec fenetre annoncee (RR/RNR): pas de trame jetee
+    simulation_controle_flux(fichier_message, 4000, capacite=8, controle=True, timeout=0.05)
+
+    # Meme controle de flux dans la simulation Go-Back-N principale
+    from protocole import simulation_gobackn
+    simulation_gobackn(fichier_message, probErreur=0.05, probPerte=0.05, delaiMax=0.005, timeout=0.05,
+                       taille_fenetre=32, capacite=8, debit_consommateur=4000)
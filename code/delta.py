@@ -0,0 +1,207 @@
+import time
+import struct
+import hashlib
+from canal import Canal
+from protocole import Emetteur, Recepteur, TIMEOUT, get_timestamp, transfert_gobackn
+
+# Transfert differentiel (a la rsync)
+# Le recepteur possede deja une ancienne version du fichier:
+# 1. il la decoupe en blocs de taille_bloc et envoie la signature de chaque bloc
+#    (somme glissante faible sur 4 octets + hash fort sur 8 octets)
+# 2. l'emetteur parcourt le nouveau fichier avec la somme glissante; quand un bloc
+#    de l'ancien fichier est retrouve (somme faible puis hash fort identiques),
+#    il envoie une reference au bloc au lieu des donnees
+# 3. le recepteur reconstruit le nouveau fichier a partir des references et des
+#    donnees litterales, et verifie le hash du resultat
+# Les octets sur le lien sont proportionnels aux changements, pas a la taille du fichier.
+#
+# Format du delta: [taille_bloc(4B)] [taille(8B)] [sha256(32B)] puis des instructions
+#   'R' [indice du bloc(4B)]            reference a un bloc de l'ancien fichier
+#   'L' [longueur(4B)] [donnees]        donnees litterales
+
+TAILLE_BLOC = 512
+MODULE = 1 << 16
+SIGNATURE = struct.Struct('!I8s')
+ENTETE_DELTA = struct.Struct('!IQ32s')
+INSTRUCTION = struct.Struct('!cI')  # code + indice du bloc ou longueur du litteral
+
+
+def somme_faible(bloc):
+    # Somme de controle d'rsync: a = somme des octets, b = somme ponderee par la position
+    a = sum(bloc) % MODULE
+    b = sum((len(bloc) - i) * octet for i, octet in enumerate(bloc)) % MODULE
+    return a, b
+
+
+def hash_fort(bloc):
+    return hashlib.blake2b(bloc, digest_size=8).digest()
+
+
+def calculer_signatures(ancien, taille_bloc=TAILLE_BLOC):
+    # Recepteur: signature de chaque bloc de l'ancien fichier, serialisee
+    signatures = bytearray()
+    for debut in range(0, len(ancien), taille_bloc):
+        bloc = ancien[debut:debut + taille_bloc]
+        a, b = somme_faible(bloc)
+        signatures += SIGNATURE.pack((b << 16) | a, hash_fort(bloc))
+    return bytes(signatures)
+
+
+def calculer_delta(nouveau, signatures, taille_bloc=TAILLE_BLOC):
+    # Emetteur: delta du nouveau fichier par rapport aux blocs signes
+    # Seuls les blocs complets sont cherches (le dernier bloc partiel n'est jamais reutilise)
+    table = {}  # somme faible -> [(hash fort, indice du bloc)]
+    for indice in range(len(signatures) // SIGNATURE.size):
+        faible, fort = SIGNATURE.unpack_from(signatures, indice * SIGNATURE.size)
+        table.setdefault(faible, []).append((fort, indice))
+
+    delta = bytearray(ENTETE_DELTA.pack(taille_bloc, len(nouveau), hashlib.sha256(nouveau).digest()))
+    debut_litteral = 0
+    position = 0
+    n = len(nouveau)
+    a = b = None
+
+    def emettre_litteral(fin):
+        if fin > debut_litteral:
+            delta.extend(INSTRUCTION.pack(b'L', fin - debut_litteral))
+            delta.extend(nouveau[debut_litteral:fin])
+
+    while position + taille_bloc <= n:
+        if a is None:
+            a, b = somme_faible(nouveau[position:position + taille_bloc])
+
+        candidats = table.get((b << 16) | a)
+        indice = None
+        if candidats is not None:
+            fort = hash_fort(nouveau[position:position + taille_bloc])
+            for fort_candidat, indice_candidat in candidats:
+                if fort_candidat == fort:
+                    indice = indice_candidat
+                    break
+
+        if indice is not None:
+            # Bloc retrouve: litteral en attente, puis reference; on saute le bloc
+            emettre_litteral(position)
+            delta.extend(INSTRUCTION.pack(b'R', indice))
+            position += taille_bloc
+            debut_litteral = position
+            a = None
+            continue
+
+        # Glisser d'un octet: retirer nouveau[position], ajouter nouveau[position + taille_bloc]
+        if position + taille_bloc < n:
+            sortant = nouveau[position]
+            entrant = nouveau[position + taille_bloc]
+            a = (a - sortant + entrant) % MODULE
+            b = (b - taille_bloc * sortant + a) % MODULE
+        position += 1
+
+    emettre_litteral(n)
+    return bytes(delta)
+
+
+def appliquer_delta(ancien, delta):
+    # Recepteur: reconstruit le nouveau fichier
+    # Retourne les donnees, ou None si le delta est incoherent ou le hash ne correspond pas
+    taille_bloc, taille, empreinte = ENTETE_DELTA.unpack_from(delta)
+    resultat = bytearray()
+    position = ENTETE_DELTA.size
+    while position < len(delta):
+        code, valeur = INSTRUCTION.unpack_from(delta, position)
+        position += INSTRUCTION.size
+        if code == b'R':
+            resultat += ancien[valeur * taille_bloc:(valeur + 1) * taille_bloc]
+        elif code == b'L':
+            resultat += delta[position:position + valeur]
+            position += valeur
+        else:
+            return None
+
+    if len(resultat) != taille or hashlib.sha256(resultat).digest() != empreinte:
+        return None
+    return bytes(resultat)
+
+
+def transferer(canal, donnees, timeout=TIMEOUT, taille_fenetre=5):
+    # Go-Back-N simple d'un bloc de donnees sur le canal (dans un sens)
+    # Retourne (donnees recues, octets emis sur le lien, trames envoyees, trames retransmises)
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre)
+    recepteur = Recepteur(canal)
+    octets = transfert_gobackn(emetteur, recepteur, emetteur._segmenter(donnees))['octets']
+    return recepteur.recomposer_message(), octets, emetteur.trames_envoyees, emetteur.trames_retransmises
+
+
+def simulation_delta(ancien, nouveau, taille_bloc=TAILLE_BLOC, probErreur=0.02, probPerte=0.02,
+                     delaiMax=0.002, timeout=TIMEOUT, taille_fenetre=5):
+    # Mise a jour d'un fichier que le recepteur possede deja en version 'ancien'
+    # Compare au transfert complet du nouveau fichier
+
+    print("\n" + "="*70)
+    print("SIMULATION TRANSFERT DIFFERENTIEL")
+    print("="*70)
+    print(f"Ancienne version: {len(ancien)} octets, nouvelle: {len(nouveau)} octets, blocs de {taille_bloc} octets")
+    print("="*70 + "\n")
+
+    canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    temps_debut = time.time()
+
+    # Recepteur -> emetteur: signatures de l'ancienne version
+    signatures = calculer_signatures(ancien, taille_bloc)
+    signatures_recues, octets_signatures, trames_sig, retrans_sig = transferer(canal, signatures, timeout, taille_fenetre)
+    print(f"[{get_timestamp()}] ✍️  Signatures: {len(signatures)} octets ({trames_sig} trames)")
+
+    # Emetteur -> recepteur: delta
+    debut_delta = time.time()
+    delta = calculer_delta(nouveau, signatures_recues, taille_bloc)
+    duree_calcul = time.time() - debut_delta
+    delta_recu, octets_delta, trames_delta, retrans_delta = transferer(canal, delta, timeout, taille_fenetre)
+    print(f"[{get_timestamp()}] 📦 Delta: {len(delta)} octets ({trames_delta} trames), calcule en {duree_calcul*1000:.0f} ms")
+
+    reconstruit = appliquer_delta(ancien, delta_recu)
+    duree = time.time() - temps_debut
+
+    # Reference: transfert complet du nouveau fichier
+    debut_complet = time.time()
+    complet_recu, octets_complet, trames_complet, retrans_complet = transferer(canal, nouveau, timeout, taille_fenetre)
+    duree_complet = time.time() - debut_complet
+
+    octets_lien = octets_signatures + octets_delta
+    print("\n" + "="*70)
+    print("RESULTATS")
+    print("="*70)
+    print(f"Differentiel : {octets_lien} octets sur le lien, {trames_sig + trames_delta} trames "
+          f"(+{retrans_sig + retrans_delta} retransmissions), {duree:.2f} s")
+    print(f"Complet      : {octets_complet} octets sur le lien, {trames_complet} trames "
+          f"(+{retrans_complet} retransmissions), {duree_complet:.2f} s")
+    print(f"Gain         : {(1 - octets_lien / max(octets_complet, 1)) * 100:.1f}% d'octets en moins")
+    print(f"Identiques   : {reconstruit == nouveau}")
+    print("="*70 + "\n")
+
+    return {
+        'octets': octets_lien,
+        'octets_complet': octets_complet,
+        'taille_delta': len(delta),
+        'taille_signatures': len(signatures),
+        'duree': duree,
+        'duree_complet': duree_complet,
+        'succes': reconstruit == nouveau
+    }
+
+
+if __name__ == "__main__":
+    with open('../message.txt', 'rb') as f:
+        texte = f.read()
+
+    ancien = texte * 4
+
+    # Nouvelle version: une phrase inseree au milieu (decale tout le reste),
+    # quelques octets modifies et un paragraphe ajoute a la fin
+    milieu = len(ancien) // 2
+    nouveau = bytearray(ancien[:milieu] + b" [Ajout: nouvelle phrase inseree dans la version 2.] " + ancien[milieu:])
+    nouveau[5000:5004] = b"XXXX"
+    nouveau = bytes(nouveau) + b"\nParagraphe ajoute a la fin de la nouvelle version.\n"
+
+    simulation_delta(ancien, nouveau, timeout=0.05)
+
+    # Aucun changement: seules les references circulent
+    simulation_delta(ancien, ancien, timeout=0.05)
@@ -0,0 +1,381 @@
+import time
+import struct
+from canal import Canal
+from protocole import Trame, Recepteur, Emetteur, TYPE_DATA, TYPE_ACK, TYPE_PARITE, TIMEOUT, TAILLE_MAX_DATA, get_timestamp
+
+# Codage d'effacement au niveau des trames
+# L'emetteur ajoute M trames de parite apres chaque groupe de K trames de donnees.
+# Le recepteur reconstruit jusqu'a M trames perdues (ou rejetees) d'un groupe
+# sans aucune retransmission.
+#  - M = 1 : simple XOR de toutes les trames du groupe
+#  - M > 1 : Reed-Solomon (matrice de Cauchy sur GF(2^8))
+
+# En-tete de groupe au debut des donnees de chaque trame:
+# [groupe(2B)] [index(1B)] [taille_groupe(1B)]
+# index < taille_groupe pour une trame de donnees, sinon trame de parite
+ENTETE_GROUPE = struct.Struct('!HBB')
+
+# Donnees par trame: une trame de parite porte l'en-tete de groupe, la longueur (2B) et le
+# plus grand bloc du groupe; elle ne doit pas depasser TAILLE_MAX_DATA
+TAILLE_CHUNK = TAILLE_MAX_DATA - ENTETE_GROUPE.size - 2
+
+
+# ============================================================================
+# ARITHMETIQUE DANS GF(2^8) (polynome 0x11D)
+# ============================================================================
+GF_EXP = [0] * 512
+GF_LOG = [0] * 256
+
+_x = 1
+for _i in range(255):
+    GF_EXP[_i] = _x
+    GF_LOG[_x] = _i
+    _x = _x << 1
+    if _x & 0x100:
+        _x = _x ^ 0x11D
+for _i in range(255, 512):
+    GF_EXP[_i] = GF_EXP[_i - 255]
+
+
+def gf_mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return GF_EXP[GF_LOG[a] + GF_LOG[b]]
+
+
+def gf_inv(a):
+    return GF_EXP[255 - GF_LOG[a]]
+
+
+# Table de multiplication par une constante, utilisable avec bytes.translate()
+TABLES_MUL = [bytes(gf_mul(c, b) for b in range(256)) for c in range(256)]
+
+
+def combinaison(coefficients, blocs):
+    # Calcule somme(coef_i * bloc_i) dans GF(2^8), octet par octet
+    # L'addition dans GF(2^8) est un XOR: on la fait sur des entiers Python
+    taille = len(blocs[0])
+    resultat = 0
+    for coef, bloc in zip(coefficients, blocs):
+        if coef == 0:
+            continue
+        if coef != 1:
+            bloc = bloc.translate(TABLES_MUL[coef])
+        resultat = resultat ^ int.from_bytes(bloc, 'big')
+    return resultat.to_bytes(taille, 'big')
+
+
+class CodeEffacement:
+    # Code d'effacement systematique (K trames de donnees, M trames de parite)
+    # N'importe quelles K trames parmi les K+M suffisent a reconstruire le groupe
+
+    def __init__(self, k=4, m=1):
+        if k < 1 or m < 1 or k + m > 256:
+            raise ValueError("il faut k >= 1, m >= 1 et k + m <= 256")
+        self.k = k
+        self.m = m
+
+        # Ligne de la matrice generatrice pour chaque index (0..k+m-1)
+        self.lignes = []
+        for i in range(k):
+            ligne = [0] * k
+            ligne[i] = 1
+            self.lignes.append(ligne)
+        for j in range(m):
+            if m == 1:
+                # Parite XOR
+                self.lignes.append([1] * k)
+            else:
+                # Matrice de Cauchy: 1 / (x_j + y_i), avec x_j = k + j et y_i = i
+                self.lignes.append([gf_inv((k + j) ^ i) for i in range(k)])
+
+    def encoder(self, blocs):
+        # blocs: k blocs de meme taille -> retourne les m blocs de parite
+        return [combinaison(self.lignes[self.k + j], blocs) for j in range(self.m)]
+
+    def decoder(self, recus):
+        # recus: dict index -> bloc (au moins k entrees)
+        # Retourne la liste des k blocs de donnees, ou None si pas assez de blocs
+        if len(recus) < self.k:
+            return None
+
+        # Cas rapide: toutes les donnees sont la
+        if all(i in recus for i in range(self.k)):
+            return [recus[i] for i in range(self.k)]
+
+        # Choisir k blocs (donnees en priorite) et inverser la sous-matrice
+        indices = sorted(recus)[:self.k]
+        matrice = [list(self.lignes[i]) for i in indices]
+        inverse = _inverser(matrice)
+
+        blocs = [recus[i] for i in indices]
+        resultat = []
+        for i in range(self.k):
+            if i in recus:
+                resultat.append(recus[i])
+            else:
+                resultat.append(combinaison(inverse[i], blocs))
+        return resultat
+
+
+def _inverser(matrice):
+    # Inversion d'une matrice carree dans GF(2^8) (elimination de Gauss-Jordan)
+    n = len(matrice)
+    a = [ligne + [1 if i == j else 0 for j in range(n)] for i, ligne in enumerate(matrice)]
+
+    for col in range(n):
+        # Trouver un pivot non nul
+        pivot = col
+        while a[pivot][col] == 0:
+            pivot = pivot + 1
+        a[col], a[pivot] = a[pivot], a[col]
+
+        # Normaliser la ligne du pivot
+        inv = gf_inv(a[col][col])
+        a[col] = [gf_mul(inv, v) for v in a[col]]
+
+        # Eliminer la colonne dans les autres lignes
+        for ligne in range(n):
+            if ligne != col and a[ligne][col] != 0:
+                facteur = a[ligne][col]
+                a[ligne] = [v ^ gf_mul(facteur, p) for v, p in zip(a[ligne], a[col])]
+
+    return [ligne[n:] for ligne in a]
+
+
+def construire_groupe(num_groupe, chunks, nb_parites):
+    # Construit les trames (donnees + parite) d'un groupe
+    # Chaque bloc code = longueur(2B) + donnees, complete a la taille maximale du groupe
+    k = len(chunks)
+    taille = 2 + max(len(c) for c in chunks)
+    blocs = [struct.pack('!H', len(c)) + c + b'\x00' * (taille - 2 - len(c)) for c in chunks]
+    parites = CodeEffacement(k, nb_parites).encoder(blocs)
+
+    trames = []
+    for index, chunk in enumerate(chunks):
+        entete = ENTETE_GROUPE.pack(num_groupe, index, k)
+        trames.append(Trame(num_groupe % 256, entete + chunk, TYPE_DATA))
+    for j, parite in enumerate(parites):
+        entete = ENTETE_GROUPE.pack(num_groupe, k + j, k)
+        trames.append(Trame(num_groupe % 256, entete + parite, TYPE_PARITE))
+    return trames
+
+
+def reconstruire_groupe(recus, k, nb_parites):
+    # recus: dict index -> trame recue (donnees ou parite, sans en-tete de groupe)
+    # Retourne la liste des k chunks, ou None si trop de trames manquent
+    if all(i in recus for i in range(k)):
+        return [recus[i] for i in range(k)]
+    if len(recus) < k:
+        return None
+
+    # Taille des blocs codes = taille d'une trame de parite
+    taille = max(len(b) for i, b in recus.items() if i >= k)
+
+    blocs = {}
+    for index, donnees in recus.items():
+        if index < k:
+            donnees = struct.pack('!H', len(donnees)) + donnees
+            donnees = donnees + b'\x00' * (taille - len(donnees))
+        blocs[index] = donnees
+
+    decodes = CodeEffacement(k, nb_parites).decoder(blocs)
+    chunks = []
+    for bloc in decodes:
+        longueur = struct.unpack('!H', bloc[:2])[0]
+        chunks.append(bloc[2:2 + longueur])
+    return chunks
+
+
+def simulation_parite(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0.02,
+                      timeout=TIMEOUT, taille_fenetre=4, taille_groupe=4, nb_parites=1,
+                      max_tentatives=5):
+    # Simulation avec codage d'effacement
+    # - taille_fenetre est exprimee en groupes
+    # - le recepteur acquitte un groupe des qu'il peut le reconstruire
+    # - un groupe non acquitte est renvoye en entier apres le timeout
+
+    print("\n" + "="*70)
+    print("SIMULATION AVEC TRAMES DE PARITE")
+    print("="*70)
+    print(f"Fichier: {fichier_path}")
+    print(f"Parametres: erreur={probErreur}, perte={probPerte}, delai={delaiMax*1000}ms")
+    print(f"Timeout: {timeout*1000}ms, Fenetre: {taille_fenetre} groupes")
+    print(f"Groupes: K={taille_groupe} donnees + M={nb_parites} parite(s)")
+    print("="*70 + "\n")
+
+    canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre, taille_trame=TAILLE_CHUNK)
+    recepteur = Recepteur(canal)
+
+    with open(fichier_path, 'rb') as f:
+        message = f.read()
+
+    trames_data = emetteur._segmenter(message)
+    groupes = [trames_data[i:i + taille_groupe] for i in range(0, len(trames_data), taille_groupe)]
+    nb_groupes = len(groupes)
+    print(f"Taille: {len(message)} octets, {len(trames_data)} trames, {nb_groupes} groupes\n")
+
+    acquittes = [False] * nb_groupes
+    tentatives = [0] * nb_groupes
+    trames_parite = 0
+    trames_reconstruites = 0
+
+    # Groupe abandonne (max_tentatives atteint): le transfert s'arrete
+    abandon = None
+
+    # Etat du recepteur: trames recues par groupe, et groupes reconstruits
+    recus_par_groupe = {}
+    groupes_complets = {}
+
+    temps_debut = time.time()
+    base = 0
+
+    while base < nb_groupes and abandon is None:
+        fin = min(base + taille_fenetre, nb_groupes)
+        print(f"[{get_timestamp()}] 📊 Fenetre groupes: [{base}, {fin-1}]")
+
+        for g in range(base, fin):
+            if acquittes[g]:
+                continue
+
+            if tentatives[g] >= max_tentatives:
+                # On n'avance pas la base: le message recu aurait un trou
+                print(f"[{get_timestamp()}] ❌ ABANDON groupe #{g}: transfert interrompu")
+                abandon = g
+                break
+
+            for trame in construire_groupe(g, groupes[g], nb_parites):
+                if trame.type_trame == TYPE_PARITE:
+                    trames_parite += 1
+                elif tentatives[g] > 0:
+                    emetteur.trames_retransmises += 1
+                else:
+                    emetteur.trames_envoyees += 1
+
+                trame_transmise = canal.transmettre(trame.serialiser())
+                if trame_transmise is None:
+                    continue
+
+                trame_recue, crc_valide = Trame.deserialiser(trame_transmise)
+                if not crc_valide or len(trame_recue.data) < ENTETE_GROUPE.size:
+                    recepteur.trames_rejetees += 1
+                    continue
+
+                num_groupe, index, k = ENTETE_GROUPE.unpack(trame_recue.data[:ENTETE_GROUPE.size])
+                if num_groupe in groupes_complets:
+                    # Groupe deja reconstruit (renvoye apres un ACK perdu): duplicata
+                    continue
+                recus_par_groupe.setdefault(num_groupe, {})[index] = trame_recue.data[ENTETE_GROUPE.size:]
+                recepteur.trames_acceptees += 1
+            tentatives[g] += 1
+
+            # Le recepteur tente de reconstruire le groupe
+            if g not in groupes_complets:
+                recus = recus_par_groupe.get(g, {})
+                k = len(groupes[g])
+                chunks = reconstruire_groupe(recus, k, nb_parites)
+                if chunks is None:
+                    print(f"[{get_timestamp()}]   ❌ Groupe #{g}: {len(recus)}/{k} trames, impossible a reconstruire")
+                    continue
+                manquantes = sum(1 for i in range(k) if i not in recus)
+                if manquantes > 0:
+                    print(f"[{get_timestamp()}]   🧩 Groupe #{g}: {manquantes} trame(s) reconstruite(s) par parite")
+                    trames_reconstruites += manquantes
+                groupes_complets[g] = chunks
+                del recus_par_groupe[g]
+
+            # ACK du groupe (le numero de groupe est dans les donnees)
+            ack = Trame(g % 256, struct.pack('!H', g), TYPE_ACK)
+            ack_transmis = canal.transmettre(ack.serialiser())
+            recepteur.acks_envoyes += 1
+            if ack_transmis is None:
+                print(f"[{get_timestamp()}]   ❌ ACK groupe #{g} PERDU")
+                continue
+            ack_recu, crc_valide = Trame.deserialiser(ack_transmis)
+            if crc_valide and ack_recu.type_trame == TYPE_ACK:
+                print(f"[{get_timestamp()}]   ✅ Emetteur recoit ACK groupe #{g}")
+                emetteur.acks_recus += 1
+                acquittes[g] = True
+
+        if abandon is not None:
+            break
+
+        ancien_base = base
+        while base < nb_groupes and acquittes[base]:
+            base += 1
+
+        if any(not acquittes[g] for g in range(base, fin)):
+            # Des groupes de la fenetre attendent encore: on attend le timeout
+            print(f"[{get_timestamp()}] ⏱️  TIMEOUT: groupes non acquittes dans [{base}, {fin-1}]\n")
+            time.sleep(timeout)
+        elif base > ancien_base:
+            print(f"[{get_timestamp()}] 📊 Base avance: {ancien_base} → {base}\n")
+
+    duree = time.time() - temps_debut
+
+    message_recu = b''.join(b''.join(groupes_complets[g]) for g in sorted(groupes_complets))
+    identiques = abandon is None and message == message_recu
+
+    print("\n" + "="*70)
+    print("RESULTATS")
+    print("="*70)
+    print(f"Frames envoyees       : {emetteur.trames_envoyees}")
+    print(f"Frames retransmises   : {emetteur.trames_retransmises}")
+    print(f"Trames de parite      : {trames_parite}")
+    print(f"Trames reconstruites  : {trames_reconstruites}")
+    print(f"Duree totale          : {duree:.2f} s")
+    print(f"Identiques            : {identiques}")
+    if abandon is not None:
+        print(f"Transfert interrompu au groupe #{abandon}")
+    print("="*70)
+
+    canal.afficher_statistiques()
+
+    taux = (emetteur.trames_retransmises / emetteur.trames_envoyees * 100) if emetteur.trames_envoyees > 0 else 0
+
+    return {
+        'envoyees': emetteur.trames_envoyees,
+        'retransmises': emetteur.trames_retransmises,
+        'acks': emetteur.acks_recus,
+        'duree': duree,
+        'succes': identiques,
+        'taux_retransmission': taux,
+        'parites': trames_parite,
+        'reconstruites': trames_reconstruites,
+        'abandon': abandon
+    }
+
+
+if __name__ == "__main__":
+    # Test 1: XOR, une trame perdue
+    print("\n--- Test 1: parite XOR (K=4, M=1) ---")
+    chunks = [b"AAAA", b"BBBBBB", b"CC", b"DDDDD"]
+    trames = construire_groupe(0, chunks, 1)
+    recus = {ENTETE_GROUPE.unpack(t.data[:4])[1]: t.data[4:] for t in trames}
+    del recus[2]
+    print("Reconstruction:", reconstruire_groupe(recus, 4, 1) == chunks)
+
+    # Test 2: Reed-Solomon, deux trames perdues
+    print("\n--- Test 2: Reed-Solomon (K=4, M=2) ---")
+    trames = construire_groupe(0, chunks, 2)
+    recus = {ENTETE_GROUPE.unpack(t.data[:4])[1]: t.data[4:] for t in trames}
+    del recus[0]
+    del recus[3]
+    print("Reconstruction:", reconstruire_groupe(recus, 4, 2) == chunks)
+
+    # Test 3: trop de pertes
+    del recus[1]
+    print("Trop de pertes -> None:", reconstruire_groupe(recus, 4, 2) is None)
+
+    # Test 4: simulation sur un lien a fort delai
+    simulation_parite('../message.txt', probErreur=0.05, probPerte=0.10,
+                      delaiMax=0.02, timeout=0.300, taille_groupe=4, nb_parites=1)
+
+    # Test 5: canal tres mauvais, peu de tentatives: le transfert s'arrete au lieu de livrer un trou
+    import io
+    import contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultat = simulation_parite('../message.txt', probErreur=0.3, probPerte=0.5, delaiMax=0.002,
+                                     timeout=0.01, taille_groupe=4, nb_parites=1, max_tentatives=1)
+    print(f"\n--- Test 5: abandon ---\nSucces: {resultat['succes']}, groupe abandonne: {resultat['abandon']}")
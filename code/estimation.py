@@ -0,0 +1,395 @@
+import time
+from protocole import TAILLE_MAX_DATA, TIMEOUT, FCS_CRC16, PAUSE_ACK, PAUSE_BOUCLE
+
+# Estimation statistique (Monte-Carlo) des performances Go-Back-N
+# Reproduit la machine a etats de simulation_gobackn sur des trames abstraites:
+# pas de serialisation, de stuffing ni de CRC, et pas d'attente reelle (horloge simulee).
+# nb_simulations transferts independants avancent en parallele, une transmission par pas,
+# et tous les tirages (pertes, erreurs, delais) d'un pas sont faits en une fois avec NumPy.
+# Les metriques sont celles du dictionnaire retourne par simulation_gobackn.
+#
+# Hypotheses (identiques au simulateur reel):
+# - chaque appel a Canal.transmettre dure U(0, delaiMax), perd la trame avec probPerte,
+#   puis la corrompt avec probErreur (un bit inverse: toujours detecte par le CRC)
+# - un ACK arrive s'il n'est pas perdu (simulation_gobackn ne verifie pas le CRC des ACKs)
+# - memes pauses que la simulation (PAUSE_ACK, PAUSE_BOUCLE de protocole.py), plus un cout de
+#   calcul par transmission de donnees: SURCOUT + COUT_OCTET par octet (CRC et stuffing en Python)
+# Stop-and-wait = taille_fenetre=1.
+# Limites (voir valider): seules les moyennes sont estimees. Avec timeout < RTT (ex: 15 ms pour
+# des delais U(0, 10 ms) + 10 ms de pause), la plupart des trames partent d'abord dans une passe
+# de retransmission: 'envoyees' est petit et 'taux_retransmission' (moyenne des rapports par
+# transfert) a une queue lourde; 10 transferts reels peuvent s'ecarter de 40% de l'estimation
+# sans erreur du modele. Les decisions de timeout proches du RTT dependent aussi de la gigue
+# de l'ordonnanceur, que le modele ne represente que par la moyenne SURCOUT: dans ce regime
+# 'succes' est sous-estime d'environ 7 points (0.76 mesure sur 140 transferts, 0.68 estime).
+#
+# estimer_lien: meme methode sur le lien du modele analytique (modele.py), pour Go-Back-N et
+# Selective Repeat: chaque trame occupe le lien t_f, son ACK revient t_cycle apres le debut de
+# l'emission, l'echange trame + ACK echoue avec la probabilite p du modele (ACKs individuels).
+# valider_modele compare l'efficacite mesuree aux formules de modele.efficacite.
+# Go-Back-N suit sa formule; la formule Selective Repeat (U = 1-p si W >= C) suppose que la
+# fenetre ne bloque jamais pendant une retransmission: il faut W >~ 2C pour l'atteindre.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SURCOUT = 0.001      # decodage, affichage et imprecision de time.sleep, par transmission (mesure)
+COUT_OCTET = 1.5e-6  # encodage/decodage, par octet de donnees et par transmission (mesure, trames de 100 a 4000 o)
+
+NORMALE = 0          # passe normale: s'arrete au premier echec
+RETRANS_DEBUT = 1    # retransmission depuis la base sur timeout detecte en debut de tour
+RETRANS_FIN = 2      # retransmission depuis la base sur timeout detecte en fin de tour
+
+
+def estimer_gobackn(nb_trames, probErreur=0.05, probPerte=0.10, delaiMax=0.02, timeout=TIMEOUT,
+                    taille_fenetre=5, max_tentatives=5, taille_trame=TAILLE_MAX_DATA,
+                    nb_simulations=1000, graine=None, surcout=SURCOUT, cout_octet=COUT_OCTET):
+    # Retourne les metriques moyennes sur nb_simulations transferts de nb_trames trames
+    if np is None:
+        raise ImportError("estimation.py demande NumPy")
+
+    rng = np.random.default_rng(graine)
+    R = nb_simulations
+    W = taille_fenetre
+    lignes = np.arange(R)
+
+    # Etat de chaque simulation
+    base = np.zeros(R, dtype=np.int64)
+    fin = np.minimum(W, nb_trames) + np.zeros(R, dtype=np.int64)
+    pos = np.zeros(R, dtype=np.int64)
+    passe = np.full(R, NORMALE, dtype=np.int8)
+    dernier = np.full(R, -1, dtype=np.int64)   # dernier numero accepte par le recepteur
+    ack_max = np.full(R, -1, dtype=np.int64)   # plus grand numero acquitte recu par l'emetteur
+    t = np.zeros(R)
+    actif = np.full(R, nb_trames > 0)
+    abandon = np.zeros(R, dtype=bool)
+
+    # Tentatives et instant du dernier envoi, par trame de la fenetre (tampon circulaire de W cases)
+    proprietaire = np.full((R, W), -1, dtype=np.int64)
+    tentatives = np.zeros((R, W), dtype=np.int64)
+    instant_envoi = np.zeros((R, W))
+
+    envoyees = np.zeros(R, dtype=np.int64)
+    retransmises = np.zeros(R, dtype=np.int64)
+    acks = np.zeros(R, dtype=np.int64)
+    rejetees = np.zeros(R, dtype=np.int64)
+
+    def instant_base(r):
+        # send_times[base] de la simulation: None (nan) si jamais envoyee ou deja acquittee
+        case = base[r] % W
+        valide = (proprietaire[r, case] == base[r]) & (base[r] > ack_max[r])
+        return np.where(valide, instant_envoi[r, case], np.nan)
+
+    def nouveau_tour(r):
+        # Debut d'un tour de la boucle principale (ou fin du transfert)
+        termine = base[r] >= nb_trames
+        actif[r[termine]] = False
+        r = r[~termine]
+        fin[r] = np.minimum(base[r] + W, nb_trames)
+        pos[r] = base[r]
+        ecoule = t[r] - instant_base(r)
+        passe[r] = np.where(ecoule > timeout, RETRANS_DEBUT, NORMALE)  # nan > x est faux
+
+    while actif.any():
+        r = lignes[actif]
+        num = pos[r]
+        case = num % W
+        nouvelle = proprietaire[r, case] != num
+        tent = np.where(nouvelle, 0, tentatives[r, case])
+        normale = passe[r] == NORMALE
+
+        # Abandon (passe normale seulement): le transfert s'arrete
+        abandonne = normale & (tent >= max_tentatives)
+        if abandonne.any():
+            abandon[r[abandonne]] = True
+            actif[r[abandonne]] = False
+            garder = ~abandonne
+            r, num, case, tent, normale = r[garder], num[garder], case[garder], tent[garder], normale[garder]
+            if len(r) == 0:
+                continue
+
+        # Envoi de la trame
+        retransmises[r] += np.where(normale, tent > 0, True)
+        envoyees[r] += normale & (tent == 0)
+        proprietaire[r, case] = num
+        tentatives[r, case] = tent + 1
+        instant_envoi[r, case] = t[r]
+
+        n = len(r)
+        tirages = rng.random((4, n))
+        delais = rng.uniform(0, delaiMax, (2, n))
+        t[r] += delais[0] + surcout + cout_octet * taille_trame
+
+        arrivee = tirages[0] >= probPerte
+        valide = arrivee & (tirages[1] >= probErreur)
+        rejetees[r] += arrivee & ~valide
+
+        # Recepteur: trame attendue -> acceptee + ACK; sinon duplicata -> ACK du dernier recu
+        dans_ordre = valide & (num == dernier[r] + 1)
+        duplicata = valide & ~dans_ordre
+        dernier[r] = np.where(dans_ordre, num, dernier[r])
+        rejetees[r] += duplicata
+
+        ack_envoye = dans_ordre | (duplicata & (dernier[r] >= 0))
+        ack_recu = ack_envoye & (tirages[2] >= probPerte)
+        pause = np.where(normale, PAUSE_ACK, delaiMax)
+        t[r] += np.where(ack_envoye, delais[1], 0.0) + np.where(dans_ordre, pause, 0.0)
+        acks[r] += ack_recu
+        ack_max[r] = np.where(ack_recu, np.maximum(ack_max[r], dernier[r]), ack_max[r])
+
+        # Suite de la passe: la passe normale s'arrete au premier echec,
+        # une retransmission seulement si l'ACK d'une trame acceptee se perd
+        pos[r] += 1
+        continuer = np.where(normale, dans_ordre & ack_recu, ~(dans_ordre & ~ack_recu))
+        finie = ~continuer | (pos[r] >= fin[r])
+        r = r[finie]
+        if len(r) == 0:
+            continue
+
+        # Fin de passe
+        fin_tour = r[passe[r] == RETRANS_FIN]
+        t[fin_tour] += timeout * 0.1 + PAUSE_BOUCLE
+
+        r = r[passe[r] != RETRANS_FIN]
+        nouvelle_base = ack_max[r] + 1
+        progres = nouvelle_base > base[r]
+        base[r] = np.maximum(base[r], nouvelle_base)
+        sans_progres = r[~progres]
+        ecoule = t[sans_progres] - instant_base(sans_progres)
+        expire = (ecoule > timeout) & (base[sans_progres] < nb_trames)
+
+        # Timeout en fin de tour: retransmission immediate depuis la base (meme fenetre)
+        a_retransmettre = sans_progres[expire]
+        passe[a_retransmettre] = RETRANS_FIN
+        pos[a_retransmettre] = base[a_retransmettre]
+
+        # Pas de timeout: courte attente
+        t[sans_progres[~expire]] += PAUSE_BOUCLE
+        suivants = np.concatenate([r[progres], sans_progres[~expire]])
+        t[suivants] += PAUSE_BOUCLE
+        nouveau_tour(np.concatenate([suivants, fin_tour]))
+
+    taux = np.where(envoyees > 0, retransmises / np.maximum(envoyees, 1) * 100, 0.0)
+    succes = ~abandon
+    debit = np.where(succes & (t > 0), nb_trames * taille_trame / np.maximum(t, 1e-12), 0.0)
+    return {
+        'simulations': R,
+        'trames': R * nb_trames,
+        'envoyees': float(envoyees.mean()),
+        'retransmises': float(retransmises.mean()),
+        'acks': float(acks.mean()),
+        'rejetees': float(rejetees.mean()),
+        'duree': float(t.mean()),
+        'duree_p95': float(np.percentile(t, 95)),
+        'succes': float(succes.mean()),
+        'taux_retransmission': float(taux.mean()),
+        'debit': float(debit[succes].mean()) if succes.any() else 0.0
+    }
+
+
+def estimer_lien(protocole, taille_donnees, probErreur, probPerte, delai_moyen, debit, taille_fenetre=5,
+                 timeout=None, ber=None, fcs=FCS_CRC16, nb_trames=2000, nb_simulations=200, graine=None):
+    # Efficacite moyenne d'un transfert de nb_trames trames, protocole 'gbn' ou 'sr'
+    # Temps en durees de trame (t_f = 1); memes parametres que modele.efficacite
+    if np is None:
+        raise ImportError("estimation.py demande NumPy")
+    if protocole not in ('gbn', 'sr'):
+        raise ValueError("protocole doit etre 'gbn' ou 'sr'")
+    from modele import bits_trame, probabilite_echec
+
+    t_f = bits_trame(taille_donnees, fcs) / debit
+    t_a = bits_trame(0, fcs) / debit
+    cycle = (t_f + t_a + 2 * delai_moyen) / t_f
+    if timeout is None:
+        timeout = t_f + t_a + 2 * delai_moyen - t_f
+    expiration = (t_f + timeout) / t_f  # du debut de l'emission au timeout
+    p = 1 - (1 - probabilite_echec(taille_donnees, probErreur, probPerte, ber, fcs)) * \
+        (1 - probabilite_echec(0, probErreur, probPerte, ber, fcs))
+
+    rng = np.random.default_rng(graine)
+    R = nb_simulations
+    W = taille_fenetre
+    lignes = np.arange(R)
+    colonnes = np.arange(W)
+
+    # Trames de la fenetre (tampon circulaire: la trame n occupe la case n % W)
+    numero = np.full((R, W), -1, dtype=np.int64)
+    reussie = np.zeros((R, W), dtype=bool)
+    evenement = np.full((R, W), np.inf)  # arrivee de l'ACK si reussie, sinon timeout
+    base = np.zeros(R, dtype=np.int64)
+    prochain = np.zeros(R, dtype=np.int64)
+    libre = np.zeros(R)                  # instant ou le lien est libre
+    fin = np.zeros(R)                    # arrivee du dernier ACK
+
+    actif = np.ones(R, dtype=bool)
+    while actif.any():
+        r = lignes[actif]
+        t = libre[r]
+
+        # Base: avance sur les trames acquittees avant t (au plus W)
+        for _ in range(W):
+            case = base[r] % W
+            acquittee = (base[r] < prochain[r]) & (numero[r, case] == base[r]) & reussie[r, case] & \
+                        (evenement[r, case] <= t)
+            if not acquittee.any():
+                break
+            fin[r[acquittee]] = np.maximum(fin[r[acquittee]], evenement[r[acquittee], case[acquittee]])
+            base[r[acquittee]] += 1
+        termine = base[r] >= nb_trames
+        actif[r[termine]] = False
+        r, t = r[~termine], t[~termine]
+        if len(r) == 0:
+            break
+
+        en_vol = (numero[r] >= base[r, None]) & (numero[r] < prochain[r, None])
+        expiree = en_vol & ~reussie[r] & (evenement[r] <= t[:, None])
+        if protocole == 'gbn':
+            # Timeout de la base: tout ce qui suit est perdu pour le recepteur, on repart de la base
+            case = base[r] % W
+            retour = (base[r] < prochain[r]) & expiree[np.arange(len(r)), case]
+            prochain[r[retour]] = base[r[retour]]
+            a_renvoyer = np.zeros(len(r), dtype=bool)
+        else:
+            # Selective Repeat: seule la trame expiree (la plus ancienne) est renvoyee
+            a_renvoyer = expiree.any(axis=1)
+        ouverte = (prochain[r] < nb_trames) & (prochain[r] < base[r] + W)
+        envoi = a_renvoyer | ouverte
+
+        # Fenetre fermee, rien a renvoyer: on attend le prochain ACK ou timeout
+        attente = r[~envoi]
+        if len(attente):
+            futurs = np.where((numero[attente] >= base[attente, None]) & (numero[attente] < prochain[attente, None])
+                              & (evenement[attente] > libre[attente, None]), evenement[attente], np.inf)
+            libre[attente] = np.maximum(libre[attente], futurs.min(axis=1))
+
+        r, t, a_renvoyer, expiree = r[envoi], t[envoi], a_renvoyer[envoi], expiree[envoi]
+        if len(r) == 0:
+            continue
+        ancienne = np.where(expiree, numero[r], np.iinfo(np.int64).max).argmin(axis=1)
+        num = np.where(a_renvoyer, numero[r, ancienne], prochain[r])
+        prochain[r] += ~a_renvoyer
+        case = num % W
+        succes = rng.random(len(r)) >= p
+        numero[r, case] = num
+        reussie[r, case] = succes
+        evenement[r, case] = t + np.where(succes, cycle, expiration)
+        libre[r] = t + 1
+
+    U = nb_trames / fin
+    debit_utile = U * debit * taille_donnees / bits_trame(taille_donnees, fcs)
+    return {'efficacite': float(U.mean()), 'efficacite_p5': float(np.percentile(U, 5)),
+            'debit_utile': float(debit_utile.mean())}
+
+
+def valider_modele(cas, nb_trames=2000, nb_simulations=200, graine=None):
+    # Efficacite Monte-Carlo (estimer_lien) vs formule (modele.efficacite), pour 'gbn' et 'sr'
+    # cas: liste de (protocole, parametres de modele.efficacite sans le protocole)
+    from modele import efficacite
+    resultats = []
+    for protocole, parametres in cas:
+        estime = estimer_lien(protocole, nb_trames=nb_trames, nb_simulations=nb_simulations, graine=graine,
+                              **parametres)
+        U, _ = efficacite(protocole, **parametres)
+        resultats.append((protocole, parametres, estime['efficacite'], U))
+    return resultats
+
+
+METRIQUES_VALIDEES = ('envoyees', 'retransmises', 'acks', 'duree', 'succes', 'taux_retransmission')
+TOLERANCE = 0.10  # ecart relatif accepte en plus de l'incertitude de la moyenne reelle
+
+
+def valider(nb_trames=40, nb_essais=20, **parametres):
+    # Compare l'estimation a la vraie simulation (simulation_gobackn) sur de petits transferts
+    # Retourne (reel, estime, verdict): verdict[cle] = (erreur type de la moyenne reelle, accord)
+    # Accord si |estime - reel| <= 3 erreurs types + TOLERANCE * |reel|
+    import io
+    import os
+    import tempfile
+    import contextlib
+    from protocole import simulation_gobackn
+
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(os.urandom(nb_trames * TAILLE_MAX_DATA))
+        chemin = f.name
+    try:
+        reels = []
+        for _ in range(nb_essais):
+            with contextlib.redirect_stdout(io.StringIO()):
+                reels.append(simulation_gobackn(chemin, **parametres))
+    finally:
+        os.remove(chemin)
+
+    estime = estimer_gobackn(nb_trames, nb_simulations=2000, **parametres)
+    reel = {}
+    verdict = {}
+    for cle in METRIQUES_VALIDEES:
+        valeurs = np.array([float(r[cle]) for r in reels])
+        reel[cle] = float(valeurs.mean())
+        erreur_type = float(valeurs.std(ddof=1) / np.sqrt(nb_essais)) if nb_essais > 1 else 0.0
+        if cle == 'succes':
+            # Proportion: 20 essais tous reussis (ou tous echoues) n'ont pas d'ecart type,
+            # on prend celui d'une loi binomiale de parametre estime
+            erreur_type = max(erreur_type, float(np.sqrt(estime[cle] * (1 - estime[cle]) / nb_essais)))
+        accord = abs(estime[cle] - reel[cle]) <= 3 * erreur_type + TOLERANCE * abs(reel[cle])
+        verdict[cle] = (erreur_type, accord)
+    return reel, estime, verdict
+
+
+if __name__ == "__main__":
+    if np is None:
+        print("NumPy absent: estimation indisponible")
+        raise SystemExit
+
+    # Validation sur de petits transferts (la vraie simulation dort en temps reel)
+    print("="*78)
+    print("VALIDATION: simulation reelle (moyenne de 20 essais) vs estimation (2000 tirages)")
+    print(f"Accord: |estime - reel| <= 3 erreurs types + {TOLERANCE:.0%} du reel")
+    print("="*78)
+    cas = [
+        {'probErreur': 0.05, 'probPerte': 0.10, 'delaiMax': 0.005, 'timeout': 0.25, 'taille_fenetre': 5},
+        {'probErreur': 0.10, 'probPerte': 0.10, 'delaiMax': 0.010, 'timeout': 0.015, 'taille_fenetre': 8},
+        {'probErreur': 0.20, 'probPerte': 0.20, 'delaiMax': 0.005, 'timeout': 0.25, 'taille_fenetre': 5,
+         'max_tentatives': 3},
+    ]
+    echecs = []
+    for parametres in cas:
+        reel, estime, verdict = valider(**parametres)
+        print(parametres)
+        for cle in METRIQUES_VALIDEES:
+            erreur_type, accord = verdict[cle]
+            print(f"  {cle:20s} reel={reel[cle]:9.3f} +/- {erreur_type:8.3f}   estime={estime[cle]:9.3f}   "
+                  f"{'ok' if accord else 'ECHEC'}")
+            if not accord:
+                echecs.append((parametres, cle))
+    if echecs:
+        print(f"VALIDATION ECHOUEE: {len(echecs)} metrique(s) hors tolerance")
+        for parametres, cle in echecs:
+            print(f"  {cle} pour {parametres}")
+    else:
+        print("VALIDATION REUSSIE: toutes les metriques dans la tolerance")
+
+    # Lien du modele analytique: Monte-Carlo vs formules, Go-Back-N et Selective Repeat
+    print("\n" + "="*78)
+    print("VALIDATION DU MODELE: 1 Mbit/s, 20 ms, trames de 1000 octets (C ~ 6), 2000 trames x 200")
+    print("="*78)
+    cas = [(protocole, {'taille_donnees': 1000, 'probErreur': 0.0, 'probPerte': perte, 'delai_moyen': 0.020,
+                        'debit': 1_000_000, 'taille_fenetre': W})
+           for protocole in ('gbn', 'sr') for W in (3, 7, 16) for perte in (0.01, 0.10)]
+    print(f"  {'protocole':10s} {'W':>3s} {'perte':>6s} {'estime':>8s} {'formule':>8s} {'ecart':>7s}")
+    for protocole, parametres, estime, formule in valider_modele(cas, graine=1):
+        print(f"  {protocole:10s} {parametres['taille_fenetre']:3d} {parametres['probPerte']:6.2f} "
+              f"{estime:8.3f} {formule:8.3f} {(estime - formule) / formule * 100:+6.1f}%")
+
+    # Question de dimensionnement: 8% de pertes, fenetre 16, un million de trames
+    print("\n" + "="*78)
+    print("ESTIMATION: perte 8%, erreur 2%, fenetre 16, 1000 x 1000 trames")
+    print("="*78)
+    debut = time.time()
+    resultat = estimer_gobackn(1000, probErreur=0.02, probPerte=0.08, delaiMax=0.02, timeout=0.25,
+                               taille_fenetre=16, max_tentatives=10, nb_simulations=1000, graine=1)
+    duree_calcul = time.time() - debut
+    for cle, valeur in resultat.items():
+        print(f"  {cle:20s} {valeur:.3f}")
+    print(f"Calcul: {duree_calcul:.1f} s pour {resultat['trames']} trames")
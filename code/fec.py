@@ -0,0 +1,132 @@
+class CodeHamming:
+    # Code correcteur d'erreurs (FEC) : Hamming etendu SECDED
+    # (Single Error Correction, Double Error Detection)
+    #
+    # Chaque bloc de k bits de donnees devient un bloc de n = 2^r bits:
+    #  - bits de parite aux positions puissances de 2 (1, 2, 4, 8, ...)
+    #  - bit de parite globale a la position 0 (detecte les erreurs doubles)
+    #  - bits de donnees aux autres positions
+    #
+    # Le rendement k/n est configurable avec r:
+    #  r=3 -> (8,4)   rendement 0.50
+    #  r=4 -> (16,11) rendement 0.69
+    #  r=5 -> (32,26) rendement 0.81
+    #  r=6 -> (64,57) rendement 0.89
+    # n est toujours un multiple de 8, donc un bloc encode reste aligne sur l'octet.
+
+    def __init__(self, r=4):
+        if r < 3 or r > 8:
+            raise ValueError("r doit etre entre 3 et 8")
+
+        self.r = r
+        self.n = 2 ** r
+        self.k = self.n - r - 1
+
+        # Positions des bits de donnees (ni 0, ni une puissance de 2)
+        self.positions_donnees = [p for p in range(3, self.n) if p & (p - 1) != 0]
+
+    def rendement(self):
+        return self.k / self.n
+
+    def encoder(self, bits_str):
+        # Encode une chaine de bits, en completant le dernier bloc avec des '0'
+        # Le recepteur retrouve la vraie longueur grace a l'en-tete de la trame
+        if len(bits_str) % self.k != 0:
+            bits_str = bits_str + '0' * (self.k - len(bits_str) % self.k)
+
+        resultat = []
+        for i in range(0, len(bits_str), self.k):
+            resultat.append(self._encoder_bloc(bits_str[i:i + self.k]))
+
+        return ''.join(resultat)
+
+    def decoder(self, bits_str):
+        # Decode une chaine de bits encodee
+        # Retourne (bits_donnees, nb_bits_corriges)
+        # ou (None, 0) si une erreur non corrigible est detectee
+        if len(bits_str) % self.n != 0:
+            return None, 0
+
+        resultat = []
+        nb_corriges = 0
+        for i in range(0, len(bits_str), self.n):
+            donnees, corrige = self._decoder_bloc(bits_str[i:i + self.n])
+            if donnees is None:
+                return None, 0
+            resultat.append(donnees)
+            nb_corriges = nb_corriges + corrige
+
+        return ''.join(resultat), nb_corriges
+
+    def _encoder_bloc(self, bloc):
+        bits = [0] * self.n
+
+        # Placer les donnees et calculer le syndrome (XOR des positions a '1')
+        syndrome = 0
+        for bit, position in zip(bloc, self.positions_donnees):
+            if bit == '1':
+                bits[position] = 1
+                syndrome = syndrome ^ position
+
+        # Les bits de parite annulent le syndrome
+        for i in range(self.r):
+            bits[1 << i] = (syndrome >> i) & 1
+
+        # Parite globale (position 0)
+        bits[0] = sum(bits) % 2
+
+        return ''.join('1' if b else '0' for b in bits)
+
+    def _decoder_bloc(self, bloc):
+        # Retourne (bits_donnees, nb_bits_corriges) ou (None, 0)
+        syndrome = 0
+        parite = 0
+        for position in range(self.n):
+            if bloc[position] == '1':
+                syndrome = syndrome ^ position
+                parite = parite ^ 1
+
+        corrige = 0
+        if parite == 1:
+            # Erreur simple a la position 'syndrome' (0 = bit de parite globale)
+            bits = list(bloc)
+            bits[syndrome] = '1' if bits[syndrome] == '0' else '0'
+            bloc = ''.join(bits)
+            corrige = 1
+        elif syndrome != 0:
+            # Erreur double: detectee mais non corrigible
+            return None, 0
+
+        donnees = ''.join(bloc[p] for p in self.positions_donnees)
+        return donnees, corrige
+
+
+if __name__ == "__main__":
+    import random
+
+    for r in (3, 4, 5):
+        code = CodeHamming(r)
+        print(f"\n--- Hamming SECDED ({code.n},{code.k}) rendement={code.rendement():.2f} ---")
+
+        data = ''.join(f"{byte:08b}" for byte in b"Bonjour")
+        encode = code.encoder(data)
+        print(f"Bits: {len(data)} -> encodes: {len(encode)}")
+
+        # Test 1: aucune erreur
+        decode, nb = code.decoder(encode)
+        print("Sans erreur      :", decode[:len(data)] == data, f"(corriges={nb})")
+
+        # Test 2: une erreur par bloc -> corrigee
+        bits = list(encode)
+        for i in range(0, len(bits), code.n):
+            position = i + random.randint(0, code.n - 1)
+            bits[position] = '1' if bits[position] == '0' else '0'
+        decode, nb = code.decoder(''.join(bits))
+        print("1 erreur/bloc    :", decode[:len(data)] == data, f"(corriges={nb})")
+
+        # Test 3: deux erreurs dans le meme bloc -> detectee
+        bits = list(encode)
+        for position in (1, 2):
+            bits[position] = '1' if bits[position] == '0' else '0'
+        decode, nb = code.decoder(''.join(bits))
+        print("2 erreurs/bloc   : rejete =", decode is None)
@@ -0,0 +1,266 @@
+import os
+import time
+import struct
+from fec import CodeHamming
+from canal import Canal, LienAsynchrone
+from pipeline import PipelineReception
+from protocole import Trame, Emetteur, Recepteur, TYPE_DATA, TYPE_ACK, TYPE_FICHIER, TAILLE_MAX_DATA, TIMEOUT, \
+    TRAMAGE_BITS, FCS_CRC16, get_timestamp, TransfertGoBackN
+
+# Transfert d'un lot de fichiers sur une seule session Go-Back-N
+# Les fichiers se suivent dans le meme espace de numeros de sequence:
+#   [FICHIER a] [DATA a] ... [DATA a] [FICHIER b] [DATA b] ... [FICHIER c] ...
+# Une trame TYPE_FICHIER annonce le fichier suivant: [taille(8B)] [position(8B)] [nom (utf-8)]
+# (position: octet du fichier ou commencent les donnees qui suivent, 0 pour un fichier complet).
+# Emetteur et Recepteur sont ceux de protocole.py; le lien (LienAsynchrone, canal.py) laisse
+# plusieurs trames en vol et ramene les ACKs de facon asynchrone. La fenetre reste donc pleine
+# d'un fichier a l'autre: les premieres trames du fichier suivant partent pendant que les
+# dernieres du precedent attendent leur ACK, au lieu d'un aller-retour a vide par fichier.
+# Les fichiers sont lus au fil de l'envoi, et le recepteur ecrit chaque fichier
+# (nom.part, renomme a la fin) des qu'il est complet.
+# nb_processus: le recepteur decode les trames dans un pool de processus (pipeline.py);
+# utile avec FEC, ou le decodage coute plus cher que le reste de la reception.
+
+META = struct.Struct('!QQ')
+TAILLE_MAX_NOM = TAILLE_MAX_DATA - META.size
+
+
+def trames_lot(fichiers, taille_trame=TAILLE_MAX_DATA):
+    # Suite (type, donnees, nom) des trames du lot; les fichiers sont lus au fur et a mesure
+    # fichiers: chemins, ou (chemin, position) pour n'envoyer que la fin d'un fichier
+    for element in fichiers:
+        chemin, position = element if isinstance(element, tuple) else (element, 0)
+        nom = os.path.basename(chemin)
+        taille = os.path.getsize(chemin)
+        yield TYPE_FICHIER, META.pack(taille, position) + nom.encode('utf-8'), nom
+        with open(chemin, 'rb') as f:
+            f.seek(position)
+            while True:
+                chunk = f.read(taille_trame)
+                if not chunk:
+                    break
+                yield TYPE_DATA, chunk, nom
+
+
+class RecepteurFichiers(Recepteur):
+    # Recepteur Go-Back-N qui ecrit les fichiers du lot sur disque au fil de la livraison
+
+    def __init__(self, canal, dossier):
+        super().__init__(canal)
+        self.dossier = dossier
+        self.courant = None    # [nom, fichier ouvert, octets restants]
+        self.termines = {}     # nom -> instant ou le fichier est complet
+
+    def traiter_trame(self, trame, crc_valide):
+        avant = self.dernier_num_seq
+        ack = super().traiter_trame(trame, crc_valide)
+        if self.dernier_num_seq != avant:
+            # Les donnees vont sur disque: on ne les garde pas en memoire
+            data = self.trames_recues.pop()[1]
+            if trame.type_trame == TYPE_FICHIER:
+                self._ouvrir(data)
+            elif self.courant is not None:
+                self.courant[1].write(data)
+                self.courant[2] -= len(data)
+            if self.courant is not None and self.courant[2] <= 0:
+                self._terminer()
+        return ack
+
+    def _ouvrir(self, meta):
+        taille, position = META.unpack_from(meta)
+        nom = os.path.basename(bytes(meta[META.size:]).decode('utf-8'))
+        partiel = os.path.join(self.dossier, nom + '.part')
+        # Reprise (position > 0): on complete le .part d'un lot precedent
+        f = open(partiel, 'r+b' if position > 0 and os.path.exists(partiel) else 'wb')
+        f.seek(position)
+        self.courant = [nom, f, taille - position]
+        print(f"[{get_timestamp()}]   📂 Recepteur ouvre {nom} ({taille} octets)")
+
+    def _terminer(self):
+        nom, f, _ = self.courant
+        f.truncate()
+        f.close()
+        os.replace(os.path.join(self.dossier, nom + '.part'), os.path.join(self.dossier, nom))
+        self.termines[nom] = time.time()
+        self.courant = None
+        print(f"[{get_timestamp()}]   🏁 Fichier {nom} complet")
+
+
+def simulation_fichiers(fichiers, dossier_sortie, probErreur=0.05, probPerte=0.10, delaiMax=0.02,
+                        timeout=TIMEOUT, taille_fenetre=5, pipeline=True, tramage=TRAMAGE_BITS, fcs=FCS_CRC16,
+                        fec_r=None, nb_processus=None):
+    # Transfert de plusieurs fichiers sur un seul lien Go-Back-N
+    # Les trames sont en vol en meme temps (LienAsynchrone): l'emetteur remplit sa fenetre
+    # sans attendre, les ACKs reviennent de facon asynchrone et font avancer la base.
+    # pipeline=False: chaque fichier attend que le precedent soit entierement acquitte
+    # (fenetre videe a chaque frontiere, comme des transferts separes)
+    # fec_r: code correcteur Hamming (voir simulation_gobackn)
+    # nb_processus: decodage des trames recues en parallele (PipelineReception)
+
+    noms = [os.path.basename(e[0] if isinstance(e, tuple) else e) for e in fichiers]
+    if len(set(noms)) != len(noms):
+        raise ValueError("deux fichiers du lot ont le meme nom")
+    if any(len(nom.encode('utf-8')) > TAILLE_MAX_NOM for nom in noms):
+        raise ValueError(f"nom de fichier trop long (maximum {TAILLE_MAX_NOM} octets)")
+
+    print("\n" + "="*70)
+    print("SIMULATION LOT DE FICHIERS")
+    print("="*70)
+    print(f"{len(fichiers)} fichiers vers {dossier_sortie}, fenetre={taille_fenetre}, "
+          f"{'fenetre pleine entre fichiers' if pipeline else 'fenetre videe entre fichiers'}")
+    print("="*70 + "\n")
+
+    fec = CodeHamming(fec_r) if fec_r is not None else None
+    decodeur = None
+    if nb_processus is not None:
+        decodeur = PipelineReception(nb_processus, taille_lot=taille_fenetre, fec=fec, tramage=tramage, fcs=fcs)
+
+    os.makedirs(dossier_sortie, exist_ok=True)
+    canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    canal_retour = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre, tramage=tramage, fcs=fcs)
+    recepteur = RecepteurFichiers(canal, dossier_sortie)
+    lot = trames_lot(fichiers, emetteur.taille_trame)
+    suivante = next(lot, None)
+    debuts = {}    # nom -> instant d'envoi de sa trame FICHIER
+    temps_debut = time.time()
+
+    def source():
+        # Une trame d'avance: pret() regarde si la suivante ouvre un fichier
+        nonlocal suivante
+        while suivante is not None:
+            type_trame, donnees, nom = suivante
+            if type_trame == TYPE_FICHIER:
+                debuts[nom] = time.time()
+                print(f"[{get_timestamp()}] 📄 Debut de {nom}")
+            suivante = next(lot, None)
+            yield type_trame, donnees
+
+    def pret():
+        # pipeline=False: un fichier ne part qu'une fois le precedent entierement acquitte
+        return pipeline or suivante is None or suivante[0] != TYPE_FICHIER or not transfert.en_vol
+
+    def encoder(num, element):
+        type_trame, donnees = element
+        return Trame(num % 256, donnees, type_trame).serialiser(fec, tramage, fcs)
+
+    def traiter(resultats):
+        # Le recepteur ecrit les fichiers et renvoie un ACK par trame decodee
+        for trame_recue, crc_valide in resultats:
+            ack_num = recepteur.traiter_trame(trame_recue, crc_valide)
+            if ack_num is not None:
+                retour.envoyer(Trame(ack_num % 256, b'', TYPE_ACK).serialiser(fec, tramage, fcs))
+
+    def recevoir_trame(trame_bytes):
+        # Fil du lien aller
+        if decodeur is None:
+            traiter([Trame.deserialiser(trame_bytes, fec, copier=False, tramage=tramage, fcs=fcs)])
+        else:
+            traiter(decodeur.soumettre(trame_bytes))
+
+    def lien_inactif():
+        # Plus rien en attente sur le lien: on decode le lot partiel sans attendre qu'il soit plein
+        traiter(decodeur.vider())
+
+    # Les trames partent sur le lien aller sans attendre; les ACKs reviennent par le fil
+    # du lien retour (recevoir_ack) et font avancer la base de la boucle Go-Back-N commune
+    transfert = TransfertGoBackN(emetteur, recepteur, source(), encoder=encoder,
+                                 envoyer=lambda trame_bytes: aller.envoyer(trame_bytes), pret=pret, fec=fec)
+    aller = LienAsynchrone(canal, recevoir_trame, lien_inactif if decodeur is not None else None)
+    retour = LienAsynchrone(canal_retour, transfert.recevoir_ack)
+    transfert.executer()
+
+    aller.fermer()
+    retour.fermer()
+    if decodeur is not None:
+        decodeur.fermer()
+    duree = time.time() - temps_debut
+
+    print("\n" + "="*70)
+    print("RESULTATS PAR FICHIER")
+    print("="*70)
+    resultats = {}
+    total = 0
+    for element, nom in zip(fichiers, noms):
+        chemin = element[0] if isinstance(element, tuple) else element
+        with open(chemin, 'rb') as f:
+            original = f.read()
+        recu_chemin = os.path.join(dossier_sortie, nom)
+        identique = False
+        if os.path.exists(recu_chemin):
+            with open(recu_chemin, 'rb') as f:
+                identique = f.read() == original
+        duree_fichier = recepteur.termines.get(nom, time.time()) - debuts.get(nom, temps_debut)
+        debit = len(original) / duree_fichier if duree_fichier > 0 else 0.0
+        total += len(original)
+        resultats[nom] = {'taille': len(original), 'duree': duree_fichier, 'debit': debit, 'identique': identique}
+        print(f"{nom:20s} {len(original):8d} octets  {duree_fichier:6.2f} s  {debit/1000:7.2f} Ko/s  "
+              f"identique: {identique}")
+    print("-"*70)
+    print(f"Total               : {total} octets en {duree:.2f} s ({total/duree/1000:.2f} Ko/s)")
+    print(f"Trames envoyees     : {emetteur.trames_envoyees}")
+    print(f"Trames retransmises : {emetteur.trames_retransmises}")
+    print("="*70 + "\n")
+
+    return {
+        'envoyees': emetteur.trames_envoyees,
+        'retransmises': emetteur.trames_retransmises,
+        'duree': duree,
+        'debit': total / duree if duree > 0 else 0.0,
+        'succes': all(r['identique'] for r in resultats.values()),
+        'fichiers': resultats
+    }
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    # Un lot varie: texte, binaire, fichier vide, tres petits fichiers
+    dossier = tempfile.mkdtemp()
+    with open('../message.txt', 'rb') as f:
+        texte = f.read()
+    contenus = {
+        'message.txt': texte,
+        'aleatoire.bin': os.urandom(3000),
+        'vide.txt': b'',
+        'court.txt': b'Quelques octets seulement.\n',
+        'config.ini': b'[lien]\nfenetre = 8\ntimeout = 0.1\n',
+        'extrait.txt': texte[:1500],
+    }
+    # Beaucoup de petits fichiers: c'est la que les frontieres coutent le plus
+    for i in range(15):
+        contenus[f'note_{i:02d}.txt'] = texte[i * 200:i * 200 + 150 + i * 20]
+    chemins = []
+    for nom, contenu in contenus.items():
+        chemin = os.path.join(dossier, nom)
+        with open(chemin, 'wb') as f:
+            f.write(contenu)
+        chemins.append(chemin)
+
+    try:
+        # Quelques essais de chaque mode: les pertes font varier la duree d'un essai a l'autre
+        import io
+        import contextlib
+        durees = {True: [], False: []}
+        succes = True
+        for essai in range(3):
+            for pipeline in (True, False):
+                sortie = os.path.join(dossier, f"recu_{essai}_{pipeline}")
+                if essai == 0 and pipeline:
+                    resultat = simulation_fichiers(chemins, sortie, probErreur=0.01, probPerte=0.01,
+                                                   delaiMax=0.020, timeout=0.10, taille_fenetre=8)
+                else:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        resultat = simulation_fichiers(chemins, sortie, probErreur=0.01, probPerte=0.01,
+                                                       delaiMax=0.020, timeout=0.10, taille_fenetre=8,
+                                                       pipeline=pipeline)
+                durees[pipeline].append(resultat['duree'])
+                succes = succes and resultat['succes']
+        total = sum(len(c) for c in contenus.values())
+        for pipeline, libelle in ((True, "Fenetre pleine entre fichiers"), (False, "Fenetre videe entre fichiers ")):
+            moyenne = sum(durees[pipeline]) / len(durees[pipeline])
+            print(f"{libelle}: {moyenne:.2f} s en moyenne ({total/moyenne/1000:.2f} Ko/s)")
+        print(f"Gain: {(1 - sum(durees[True]) / sum(durees[False])) * 100:.0f}%, tous identiques: {succes}")
+    finally:
+        shutil.rmtree(dossier)
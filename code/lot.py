@@ -0,0 +1,166 @@
+from protocole import Trame, TYPE_DATA, TRAMAGE_BITS, FCS_CRC16
+from compression import COMPRESSION_AUCUNE
+
+# Encodage de trames par lots avec NumPy
+# Toutes les trames d'un lot de meme taille sont traitees en une seule fois:
+# en-tetes, CRC (table, colonne par colonne pour toutes les lignes),
+# conversion en bits (unpackbits), bit stuffing (detection vectorisee des
+# suites de '1') et ajout des flags.
+# NumPy est optionnel: sans NumPy, ou pour les trames isolees, on utilise Trame.serialiser().
+# Le chemin par lots ne fait que le tramage bit (HDLC) avec CRC-16 et sans FEC; pour le CRC-32,
+# le tramage octet ou le FEC, serialiser_lot encode trame par trame (Trame.serialiser).
+# Pas de decodage par lots: Trame.deserialiser() (str.replace et binascii, en C) est deja
+# plus rapide qu'un destuffing NumPy trame par trame.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FLAG = 0x7E
+
+# Table du CRC-16 CCITT (polynome 0x1021), un octet a la fois
+TABLE_CRC16 = []
+for _octet in range(256):
+    _crc = _octet << 8
+    for _ in range(8):
+        if _crc & 0x8000:
+            _crc = ((_crc << 1) ^ 0x1021) & 0xFFFF
+        else:
+            _crc = (_crc << 1) & 0xFFFF
+    TABLE_CRC16.append(_crc)
+
+if np is not None:
+    TABLE_CRC16_NP = np.array(TABLE_CRC16, dtype=np.uint16)
+    BITS_FLAG = np.unpackbits(np.array([FLAG], dtype=np.uint8))
+
+
+def crc16_lot(matrice):
+    # CRC-16 de chaque ligne d'une matrice (nb_lignes, nb_octets) de uint8
+    # Meme resultat que calculer_crc16() ligne par ligne
+    crc = np.full(matrice.shape[0], 0xFFFF, dtype=np.uint16)
+    for colonne in matrice.T:
+        index = (crc >> 8) ^ colonne
+        crc = (crc << 8) ^ TABLE_CRC16_NP[index]
+    return crc
+
+
+def _suites_de_uns(bits):
+    # Pour chaque position, nombre de '1' consecutifs qui se terminent a cette position
+    # (calcule ligne par ligne sur une matrice de bits)
+    cumul = np.cumsum(bits, axis=-1, dtype=np.int32)
+    dernier_zero = np.maximum.accumulate(np.where(bits == 0, cumul, 0), axis=-1)
+    return cumul - dernier_zero
+
+
+def serialiser_lot(num_seqs, payloads, type_trame=TYPE_DATA, compression=COMPRESSION_AUCUNE,
+                   fec=None, tramage=TRAMAGE_BITS, fcs=FCS_CRC16):
+    # Serialise plusieurs trames d'un coup
+    # Retourne la liste des trames en bytes, dans l'ordre, identiques a Trame.serialiser()
+    if fec is not None or tramage != TRAMAGE_BITS or fcs != FCS_CRC16:
+        # Pas de chemin par lots: trame par trame
+        return [Trame(num_seq, payload, type_trame, compression).serialiser(fec, tramage, fcs)
+                for num_seq, payload in zip(num_seqs, payloads)]
+
+    resultat = [None] * len(payloads)
+
+    # Regrouper les payloads par taille
+    groupes = {}
+    for i, payload in enumerate(payloads):
+        groupes.setdefault(len(payload), []).append(i)
+
+    for taille, indices in groupes.items():
+        if np is None or len(indices) < 2:
+            # Chemin scalaire pour les trames isolees
+            for i in indices:
+                resultat[i] = Trame(num_seqs[i], payloads[i], type_trame, compression).serialiser()
+            continue
+
+        encodees = _serialiser_matrice([num_seqs[i] for i in indices],
+                                       [payloads[i] for i in indices],
+                                       type_trame | (compression << 4), taille)
+        for i, trame_bytes in zip(indices, encodees):
+            resultat[i] = trame_bytes
+
+    return resultat
+
+
+def _serialiser_matrice(num_seqs, payloads, type_byte, taille):
+    nb = len(payloads)
+    seqs = np.asarray(num_seqs)
+    if seqs.min() < 0 or seqs.max() > 255:
+        raise ValueError("num_seq doit tenir sur 1 octet")
+
+    # (1) Corps = en-tete + donnees, une ligne par trame
+    corps = np.empty((nb, 4 + taille), dtype=np.uint8)
+    corps[:, 0] = seqs
+    corps[:, 1] = type_byte
+    corps[:, 2] = taille >> 8
+    corps[:, 3] = taille & 0xFF
+    if taille > 0:
+        corps[:, 4:] = np.frombuffer(b''.join(payloads), dtype=np.uint8).reshape(nb, taille)
+
+    # (2) CRC de toutes les lignes
+    crc = crc16_lot(corps)
+    trames = np.empty((nb, 6 + taille), dtype=np.uint8)
+    trames[:, :-2] = corps
+    trames[:, -2] = crc >> 8
+    trames[:, -1] = crc & 0xFF
+
+    # (3) Bits
+    bits = np.unpackbits(trames, axis=1)
+    nb_bits = bits.shape[1]
+
+    # (4) Bit stuffing: un '0' apres chaque 5e '1' consecutif
+    suites = _suites_de_uns(bits)
+    insertion = (suites > 0) & (suites % 5 == 0)
+    nb_insertions = insertion.sum(axis=1)
+    # Nouvelle position de chaque bit = position + insertions avant lui
+    decalage = np.cumsum(insertion, axis=1) - insertion
+    positions = np.arange(nb_bits) + decalage
+
+    # (5) Placer flags + donnees stuffees dans une matrice alignee sur l'octet
+    longueurs = 16 + nb_bits + nb_insertions
+    largeur = int(-(-longueurs.max() // 8) * 8)
+    sortie = np.zeros((nb, largeur), dtype=np.uint8)
+    lignes = np.arange(nb)[:, None]
+    sortie[:, :8] = BITS_FLAG
+    sortie[lignes, 8 + positions] = bits
+    fin = 8 + nb_bits + nb_insertions
+    sortie[lignes, fin[:, None] + np.arange(8)] = BITS_FLAG
+
+    # (6) Retour aux octets (le padding final est a 0, comme bits_to_bytes)
+    octets = np.packbits(sortie, axis=1)
+    nb_octets = -(-longueurs // 8)
+    return [octets[i, :nb_octets[i]].tobytes() for i in range(nb)]
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    if np is None:
+        print("NumPy absent: chemin scalaire seulement")
+
+    # Verification: meme resultat que le chemin scalaire
+    payloads = [os.urandom(100) for _ in range(200)] + [b'\xff' * 100, b'', b'abc']
+    num_seqs = [i % 256 for i in range(len(payloads))]
+
+    debut = time.time()
+    scalaire = [Trame(s, p).serialiser() for s, p in zip(num_seqs, payloads)]
+    duree_scalaire = time.time() - debut
+
+    debut = time.time()
+    vectorise = serialiser_lot(num_seqs, payloads)
+    duree_lot = time.time() - debut
+
+    print(f"Encodage identique : {scalaire == vectorise}")
+    print(f"Scalaire: {duree_scalaire*1000:.1f} ms, lot: {duree_lot*1000:.1f} ms")
+
+    # Sans chemin par lots (CRC-32, tramage octet, FEC): meme resultat que Trame.serialiser()
+    from fec import CodeHamming
+    from protocole import TRAMAGE_OCTETS, FCS_CRC32
+    for nom, options in (("CRC-32", {'fcs': FCS_CRC32}), ("tramage octet", {'tramage': TRAMAGE_OCTETS}),
+                         ("FEC Hamming", {'fec': CodeHamming(4)})):
+        attendu = [Trame(s, p).serialiser(**options) for s, p in zip(num_seqs, payloads)]
+        print(f"Encodage identique ({nom}) : {serialiser_lot(num_seqs, payloads, **options) == attendu}")
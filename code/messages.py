@@ -0,0 +1,191 @@
+import time
+import struct
+from canal import Canal
+from protocole import Trame, Emetteur, Recepteur, TYPE_MESSAGES, TAILLE_MAX_DATA, TIMEOUT, transfert_gobackn
+
+# Agregation de petits messages (a la Nagle)
+# Au lieu d'envoyer chaque petit message dans sa propre trame (en-tete, CRC,
+# flags, stuffing et ACK pour quelques octets), l'emetteur les accumule dans
+# une trame de type TYPE_MESSAGES jusqu'a TAILLE_MAX_DATA octets.
+# La trame part quand elle est pleine ou quand le plus ancien message attend
+# depuis plus de 'delai' secondes.
+# Format des donnees: [longueur(2B)] [message] [longueur(2B)] [message] ...
+
+PREFIXE = struct.Struct('!H')
+DELAI_NAGLE = 0.010  # 10 ms
+
+
+class AgregateurMessages:
+
+    def __init__(self, taille_max=TAILLE_MAX_DATA, delai=DELAI_NAGLE):
+        self.taille_max = taille_max
+        self.delai = delai
+        self.tampon = bytearray()
+        self.nb_messages = 0
+        self.debut_attente = None  # instant d'arrivee du plus ancien message en attente
+
+    def ajouter(self, message, maintenant=None):
+        # Ajoute un message; retourne la liste des payloads prets a partir
+        if PREFIXE.size + len(message) > self.taille_max:
+            raise ValueError(f"message trop grand ({len(message)} octets) pour une trame")
+        if maintenant is None:
+            maintenant = time.monotonic()
+
+        prets = []
+        if len(self.tampon) + PREFIXE.size + len(message) > self.taille_max:
+            prets.append(self._vider())
+
+        if self.debut_attente is None:
+            self.debut_attente = maintenant
+        self.tampon += PREFIXE.pack(len(message))
+        self.tampon += message
+        self.nb_messages += 1
+
+        # Trame pleine (plus de place pour un message vide)
+        if len(self.tampon) + PREFIXE.size > self.taille_max:
+            prets.append(self._vider())
+        return prets
+
+    def verifier_delai(self, maintenant=None):
+        # Retourne le payload en attente si le plus ancien message a assez attendu, sinon None
+        if maintenant is None:
+            maintenant = time.monotonic()
+        if self.debut_attente is not None and maintenant - self.debut_attente >= self.delai:
+            return self._vider()
+        return None
+
+    def prochaine_echeance(self):
+        # Instant ou le tampon devra partir (None si vide)
+        if self.debut_attente is None:
+            return None
+        return self.debut_attente + self.delai
+
+    def vider(self):
+        # Retourne le payload en attente (ou None si vide)
+        if not self.tampon:
+            return None
+        return self._vider()
+
+    def _vider(self):
+        payload = bytes(self.tampon)
+        self.tampon = bytearray()
+        self.nb_messages = 0
+        self.debut_attente = None
+        return payload
+
+
+def separer_messages(payload):
+    # Recepteur: decoupe le payload d'une trame TYPE_MESSAGES
+    # Retourne la liste des messages, ou None si le format est incoherent
+    messages = []
+    position = 0
+    while position < len(payload):
+        if position + PREFIXE.size > len(payload):
+            return None
+        longueur = PREFIXE.unpack_from(payload, position)[0]
+        position += PREFIXE.size
+        if position + longueur > len(payload):
+            return None
+        messages.append(bytes(payload[position:position + longueur]))
+        position += longueur
+    return messages
+
+
+class RecepteurMessages(Recepteur):
+    # Recepteur qui separe les messages de chaque trame livree
+
+    def __init__(self, canal):
+        super().__init__(canal)
+        self.messages = []
+        self.malformees = 0
+
+    def traiter_trame(self, trame, crc_valide):
+        contenu = None
+        if crc_valide:
+            contenu = separer_messages(trame.data)
+            if contenu is None:
+                # CRC valide mais format incoherent: rejetee comme une trame corrompue
+                # (pas d'ACK, l'emetteur la renvoie)
+                self.malformees += 1
+                crc_valide = False
+        avant = self.dernier_num_seq
+        ack = super().traiter_trame(trame, crc_valide)
+        if self.dernier_num_seq != avant:
+            self.messages.extend(contenu)
+        return ack
+
+
+def simulation_messages(messages, intervalle=0.001, agreger=True, delai=DELAI_NAGLE,
+                        probErreur=0.05, probPerte=0.05, delaiMax=0.005, timeout=TIMEOUT):
+    # Envoie une suite de petits messages produits toutes les 'intervalle' secondes
+    # (stop-and-wait, une trame par message si agreger=False)
+    # Octets sur le lien: trames et ACKs
+
+    print("\n" + "="*70)
+    print(f"SIMULATION PETITS MESSAGES ({'agreges' if agreger else 'une trame par message'})")
+    print("="*70)
+
+    canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=1)
+    recepteur = RecepteurMessages(canal)
+    agregateur = AgregateurMessages(delai=delai if agreger else 0.0)
+
+    def payloads():
+        # Trames produites au rythme des messages; avec une fenetre de 1, la suivante
+        # n'est demandee qu'une fois la precedente acquittee (stop-and-wait)
+        for i, message in enumerate(messages):
+            # Attendre l'arrivee du message suivant (en envoyant le tampon s'il a trop attendu)
+            arrivee = temps_debut + i * intervalle
+            echeance = agregateur.prochaine_echeance()
+            if echeance is not None and echeance < arrivee:
+                time.sleep(max(0.0, echeance - time.monotonic()))
+                payload = agregateur.verifier_delai()
+                if payload is not None:
+                    yield payload
+            time.sleep(max(0.0, arrivee - time.monotonic()))
+
+            yield from agregateur.ajouter(message)
+            payload = agregateur.verifier_delai()
+            if payload is not None:
+                yield payload
+
+        payload = agregateur.vider()
+        if payload is not None:
+            yield payload
+
+    def encoder(num, payload):
+        return Trame(num % 256, payload, TYPE_MESSAGES).serialiser()
+
+    temps_debut = time.monotonic()
+    octets = transfert_gobackn(emetteur, recepteur, payloads(), encoder=encoder)['octets']
+    duree = time.monotonic() - temps_debut
+    recus = recepteur.messages
+    stats = {'trames': emetteur.trames_envoyees, 'retransmises': emetteur.trames_retransmises,
+             'octets': octets, 'malformees': recepteur.malformees}
+
+    print(f"Messages envoyes    : {len(messages)} ({sum(len(m) for m in messages)} octets utiles)")
+    print(f"Trames envoyees     : {stats['trames']} (+{stats['retransmises']} retransmissions)")
+    print(f"Octets sur le lien  : {stats['octets']}")
+    print(f"Trames malformees   : {stats['malformees']}")
+    print(f"Duree               : {duree:.2f} s ({len(messages) / duree:.0f} messages/s)")
+    print(f"Messages identiques : {recus == list(messages)}")
+    print("="*70 + "\n")
+
+    return {
+        'messages': len(messages),
+        'trames': stats['trames'],
+        'retransmises': stats['retransmises'],
+        'octets': stats['octets'],
+        'malformees': stats['malformees'],
+        'duree': duree,
+        'succes': recus == list(messages)
+    }
+
+
+if __name__ == "__main__":
+    import random
+
+    messages = [f"capteur {random.randint(0, 9)}: {random.random():.3f}".encode() for _ in range(300)]
+
+    simulation_messages(messages, agreger=False, timeout=0.05)
+    simulation_messages(messages, agreger=True, timeout=0.05)
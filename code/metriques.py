@@ -0,0 +1,246 @@
+import os
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Metriques en direct (format texte Prometheus)
+# - Compteur: ne fait que croitre (trames envoyees, perdues, ...)
+# - Jauge: valeur courante (fenetre, trames en vol, RTO)
+# - Histogramme: repartition d'une duree dans des classes fixes (RTT, delai de livraison)
+# Une metrique peut etre "tiree": fonction lue seulement a l'export (ex: les compteurs deja
+# tenus par Canal, Emetteur et Recepteur), ce qui ne coute rien dans la boucle d'envoi.
+# Mises a jour sans verrou: chaque metrique a un seul ecrivain (le fil de la simulation);
+# le fil d'export lit une valeur au plus en retard d'une mise a jour.
+
+CONTENU_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+BORNES_DUREE = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)  # secondes
+
+
+def formater(valeur):
+    if valeur == float('inf'):
+        return '+Inf'
+    if float(valeur).is_integer():
+        return str(int(valeur))
+    return repr(float(valeur))
+
+
+class Compteur:
+    type_prometheus = 'counter'
+
+    def __init__(self, nom, aide, fonction=None):
+        self.nom = nom
+        self.aide = aide
+        self.fonction = fonction
+        self.valeur = 0
+
+    def inc(self, n=1):
+        self.valeur += n
+
+    def lire(self):
+        return self.fonction() if self.fonction is not None else self.valeur
+
+    def exposer(self):
+        return [f"{self.nom} {formater(self.lire())}"]
+
+
+class Jauge(Compteur):
+    type_prometheus = 'gauge'
+
+    def set(self, valeur):
+        self.valeur = valeur
+
+    def dec(self, n=1):
+        self.valeur -= n
+
+
+class Histogramme:
+    type_prometheus = 'histogram'
+
+    def __init__(self, nom, aide, bornes=BORNES_DUREE):
+        self.nom = nom
+        self.aide = aide
+        self.bornes = tuple(bornes)
+        self.comptes = [0] * (len(self.bornes) + 1)  # derniere case: au-dela de la plus grande borne
+        self.somme = 0.0
+
+    def observer(self, valeur):
+        self.comptes[bisect.bisect_left(self.bornes, valeur)] += 1
+        self.somme += valeur
+
+    def exposer(self):
+        # Classes cumulees, comme le veut le format Prometheus
+        comptes = list(self.comptes)
+        lignes = []
+        cumul = 0
+        for borne, compte in zip(self.bornes + (float('inf'),), comptes):
+            cumul += compte
+            lignes.append(f'{self.nom}_bucket{{le="{formater(borne)}"}} {cumul}')
+        lignes.append(f"{self.nom}_sum {formater(self.somme)}")
+        lignes.append(f"{self.nom}_count {cumul}")
+        return lignes
+
+
+class Registre:
+    # Ensemble de metriques nommees, exportables par HTTP ou dans un fichier
+
+    def __init__(self):
+        self.metriques = {}
+        self.serveur = None
+        self.arret = threading.Event()
+
+    def _ajouter(self, classe, nom, aide, *args):
+        # Une metrique deja enregistree sous ce nom est reutilisee
+        if nom not in self.metriques:
+            self.metriques[nom] = classe(nom, aide, *args)
+        return self.metriques[nom]
+
+    def compteur(self, nom, aide, fonction=None):
+        return self._tiree(self._ajouter(Compteur, nom, aide, fonction), fonction)
+
+    def jauge(self, nom, aide, fonction=None):
+        return self._tiree(self._ajouter(Jauge, nom, aide, fonction), fonction)
+
+    def _tiree(self, metrique, fonction):
+        # Un nouveau transfert sur le meme registre rebranche les metriques tirees sur ses
+        # propres objets (pour Prometheus, un compteur qui redescend est une remise a zero)
+        if fonction is not None:
+            metrique.fonction = fonction
+        return metrique
+
+    def histogramme(self, nom, aide, bornes=BORNES_DUREE):
+        return self._ajouter(Histogramme, nom, aide, bornes)
+
+    def exporter(self):
+        lignes = []
+        for metrique in list(self.metriques.values()):
+            lignes.append(f"# HELP {metrique.nom} {metrique.aide}")
+            lignes.append(f"# TYPE {metrique.nom} {metrique.type_prometheus}")
+            lignes.extend(metrique.exposer())
+        return "\n".join(lignes) + "\n"
+
+    def servir(self, port=9464, hote='127.0.0.1'):
+        # Point d'acces HTTP local (GET /metrics) dans un fil en arriere-plan
+        # port=0: port libre choisi par le systeme (voir self.serveur.server_address)
+        registre = self
+
+        class Gestionnaire(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                corps = registre.exporter().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENU_PROMETHEUS)
+                self.send_header('Content-Length', str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+
+            def log_message(self, format, *args):
+                pass  # pas de journal a chaque requete
+
+        self.serveur = ThreadingHTTPServer((hote, port), Gestionnaire)
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        return self.serveur.server_address
+
+    def ecrire(self, chemin):
+        # Ecriture atomique: un lecteur ne voit jamais un fichier a moitie ecrit
+        temporaire = chemin + '.tmp'
+        with open(temporaire, 'w') as f:
+            f.write(self.exporter())
+        os.replace(temporaire, chemin)
+
+    def ecrire_periodiquement(self, chemin, intervalle=5.0):
+        # Reecrit le fichier toutes les 'intervalle' secondes (et une derniere fois a l'arret)
+        def boucle():
+            while not self.arret.wait(intervalle):
+                self.ecrire(chemin)
+            self.ecrire(chemin)
+
+        fil = threading.Thread(target=boucle, daemon=True)
+        fil.start()
+        return fil
+
+    def arreter(self):
+        self.arret.set()
+        if self.serveur is not None:
+            self.serveur.shutdown()
+            self.serveur.server_close()
+            self.serveur = None
+
+
+class MetriquesGoBackN:
+    # Metriques d'un transfert Go-Back-N
+    # Les compteurs existants (Canal, Emetteur, Recepteur) sont tires a l'export;
+    # seuls les timeouts, les trames en vol et les histogrammes sont mis a jour dans la boucle.
+
+    def __init__(self, registre, canal, emetteur, recepteur, taille_fenetre, timeout):
+        registre.compteur('liaison_trames_envoyees_total', "Trames de donnees envoyees (premier envoi)",
+                          lambda: emetteur.trames_envoyees)
+        registre.compteur('liaison_trames_retransmises_total', "Trames de donnees retransmises",
+                          lambda: emetteur.trames_retransmises)
+        registre.compteur('liaison_acks_recus_total', "ACKs recus par l'emetteur",
+                          lambda: emetteur.acks_recus)
+        registre.compteur('liaison_trames_perdues_total', "Trames perdues par le canal",
+                          lambda: canal.trames_perdues)
+        registre.compteur('liaison_trames_corrompues_total', "Trames corrompues par le canal",
+                          lambda: canal.trames_corrompues)
+        registre.compteur('liaison_trames_rejetees_total', "Trames rejetees par le recepteur (CRC ou hors ordre)",
+                          lambda: recepteur.trames_rejetees)
+        registre.jauge('liaison_fenetre', "Taille de la fenetre d'emission", lambda: taille_fenetre)
+        registre.jauge('liaison_rto_secondes', "Timeout de retransmission", lambda: timeout)
+
+        self.timeouts = registre.compteur('liaison_timeouts_total', "Timeouts de retransmission")
+        self.en_vol = registre.jauge('liaison_trames_en_vol', "Trames envoyees et non acquittees")
+        self.rtt = registre.histogramme('liaison_rtt_secondes', "Duree entre l'envoi d'une trame et son ACK")
+        self.livraison = registre.histogramme('liaison_delai_livraison_secondes',
+                                              "Duree entre le premier envoi d'une trame et sa livraison")
+
+
+if __name__ == "__main__":
+    import io
+    import contextlib
+    import urllib.request
+    from protocole import simulation_gobackn
+
+    registre = Registre()
+    hote, port = registre.servir(port=0)
+    registre.ecrire_periodiquement('metriques.prom', intervalle=0.5)
+    print(f"Metriques: http://{hote}:{port}/metrics et metriques.prom")
+
+    # Transfert en arriere-plan, lecture des metriques pendant qu'il tourne
+    resultat = {}
+
+    def transfert():
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultat.update(simulation_gobackn('../message.txt', probErreur=0.05, probPerte=0.10,
+                                               delaiMax=0.005, metriques=registre))
+
+    fil = threading.Thread(target=transfert)
+    fil.start()
+    time.sleep(0.5)
+    texte = urllib.request.urlopen(f"http://{hote}:{port}/metrics").read().decode()
+    fil.join()
+    # (affiche apres coup: redirect_stdout capture aussi les print du fil principal)
+    print("\nPendant le transfert (a 0.5 s):")
+    print("\n".join(l for l in texte.splitlines() if l.startswith(('liaison_trames_envoyees', 'liaison_trames_en_vol'))))
+
+    print(f"\nApres le transfert (succes={resultat['succes']}):")
+    print(urllib.request.urlopen(f"http://{hote}:{port}/metrics").read().decode())
+    registre.arreter()
+    with open('metriques.prom') as f:
+        print(f"metriques.prom: {len(f.read().splitlines())} lignes")
+    os.remove('metriques.prom')
+
+    # Cout dans la boucle d'envoi
+    compteur = Compteur('test_total', "test")
+    histogramme = Histogramme('test_secondes', "test")
+    debut = time.perf_counter()
+    for _ in range(1_000_000):
+        compteur.inc()
+    duree_inc = time.perf_counter() - debut
+    debut = time.perf_counter()
+    for i in range(1_000_000):
+        histogramme.observer(0.003)
+    duree_obs = time.perf_counter() - debut
+    print(f"Cout: inc() {duree_inc*1000:.0f} ns, observer() {duree_obs*1000:.0f} ns par appel")
@@ -0,0 +1,161 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from protocole import Trame, TRAMAGE_BITS, FCS_CRC16
+
+# Pipeline de reception multi-coeurs
+# Le decodage des trames (flags, destuffing, FEC, CRC) est un travail CPU
+# independant pour chaque trame: il est envoye par lots a un pool de processus.
+# La logique du protocole (numeros de sequence, ACKs, recomposition) reste dans
+# le processus principal et voit les trames dans l'ordre de reception.
+#
+# soumettre() et vider() retournent les resultats deja decodes (liste, dans l'ordre):
+# rien n'est garde en attente d'un lecteur, donc rien ne se perd si l'appelant s'arrete.
+# Contre-pression: au plus max_lots_en_vol lots sont en cours de decodage;
+# soumettre() attend le lot le plus ancien avant d'en envoyer un nouveau.
+#
+# Le gain depend du cout du decodage: sans FEC une trame se decode en ~20 us, moins que
+# l'aller-retour vers un processus; avec FEC (Hamming) c'est ~250 us et le pool paie.
+# Avec un seul processus (ou un seul coeur), le decodage se fait sur place, sans pool.
+
+TAILLE_LOT = 64
+
+
+def _decoder_lot(liste_trames, fec, tramage, fcs):
+    # Execute dans un processus du pool
+    # Les trames sont copiees (copier=True): elles retournent au processus principal
+    return [Trame.deserialiser(trame_bytes, fec, tramage=tramage, fcs=fcs) for trame_bytes in liste_trames]
+
+
+class PipelineReception:
+
+    def __init__(self, nb_processus=None, taille_lot=TAILLE_LOT, max_lots_en_vol=None, fec=None,
+                 tramage=TRAMAGE_BITS, fcs=FCS_CRC16):
+        self.nb_processus = nb_processus or os.cpu_count() or 1
+        self.taille_lot = taille_lot
+        self.max_lots_en_vol = max_lots_en_vol or 2 * self.nb_processus
+        self.fec = fec
+        self.tramage = tramage
+        self.fcs = fcs
+
+        self.pool = ProcessPoolExecutor(max_workers=self.nb_processus) if self.nb_processus > 1 else None
+        self.lot_courant = []
+        self.en_vol = deque()  # futures des lots soumis, dans l'ordre
+
+        # Statistiques
+        self.lots_envoyes = 0
+        self.attentes_contre_pression = 0
+
+    def soumettre(self, trame_bytes):
+        # Ajoute une trame recue (None = trame perdue, ignoree)
+        # Retourne les (Trame, crc_valide) deja decodes, dans l'ordre de soumission
+        if trame_bytes is None:
+            return []
+        if self.pool is None:
+            return [Trame.deserialiser(trame_bytes, self.fec, tramage=self.tramage, fcs=self.fcs)]
+        self.lot_courant.append(trame_bytes)
+        if len(self.lot_courant) >= self.taille_lot:
+            return self._envoyer_lot()
+        return self._termines()
+
+    def _envoyer_lot(self):
+        prets = []
+        if not self.lot_courant:
+            return prets
+
+        # Contre-pression: on n'envoie pas plus de max_lots_en_vol lots a la fois
+        while len(self.en_vol) >= self.max_lots_en_vol:
+            self.attentes_contre_pression += 1
+            prets.extend(self.en_vol.popleft().result())
+
+        self.en_vol.append(self.pool.submit(_decoder_lot, self.lot_courant, self.fec, self.tramage, self.fcs))
+        self.lot_courant = []
+        self.lots_envoyes += 1
+        prets.extend(self._termines())
+        return prets
+
+    def _termines(self):
+        # Lots termines en tete de file (l'ordre de soumission est conserve)
+        prets = []
+        while self.en_vol and self.en_vol[0].done():
+            prets.extend(self.en_vol.popleft().result())
+        return prets
+
+    def vider(self):
+        # Envoie le lot partiel et attend tous les lots en cours
+        # Retourne tous les resultats restants, dans l'ordre
+        prets = self._envoyer_lot() if self.pool is not None else []
+        while self.en_vol:
+            prets.extend(self.en_vol.popleft().result())
+        return prets
+
+    def fermer(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fermer()
+
+
+if __name__ == "__main__":
+    import io
+    import time
+    import random
+    import shutil
+    import tempfile
+    import contextlib
+    from canal import Canal
+    from fec import CodeHamming
+    from protocole import Recepteur
+    from fichiers import simulation_fichiers
+
+    # Flux de trames recues avec FEC (le cas ou le decodage coute cher):
+    # 2000 trames de 100 octets sur un canal tres bruite
+    nb_trames = 2000
+    fec = CodeHamming(4)
+    trames = [Trame(i % 256, bytes(random.randrange(256) for _ in range(100))).serialiser(fec)
+              for i in range(nb_trames)]
+    canal = Canal(probErreur=0.3, probPerte=0.0, delaiMax=0.0)
+    recues = [canal.transmettre(t) for t in trames]
+
+    # Decodage serie
+    debut = time.time()
+    serie = [Trame.deserialiser(trame_bytes, fec, copier=False)[1] for trame_bytes in recues]
+    duree_serie = time.time() - debut
+
+    # Decodage en parallele (un processus par coeur); la logique du protocole reste ici
+    debut = time.time()
+    parallele = []
+    recepteur = Recepteur(canal)
+    with PipelineReception(fec=fec) as pipeline:
+        for trame_bytes in recues:
+            for trame, crc_valide in pipeline.soumettre(trame_bytes):
+                parallele.append(crc_valide)
+                recepteur.traiter_trame(trame, crc_valide)
+        for trame, crc_valide in pipeline.vider():
+            parallele.append(crc_valide)
+            recepteur.traiter_trame(trame, crc_valide)
+    duree_parallele = time.time() - debut
+
+    print(f"Coeurs / processus         : {os.cpu_count()} / {pipeline.nb_processus}"
+          f"{' (decodage sur place, pas de gain possible)' if pipeline.pool is None else ''}")
+    print(f"Serie (FEC)                : {duree_serie*1000:.0f} ms, CRC valides={sum(serie)}")
+    print(f"Pipeline (FEC)             : {duree_parallele*1000:.0f} ms, CRC valides={sum(parallele)}, "
+          f"acceleration x{duree_serie / duree_parallele:.2f}")
+    print(f"Meme ordre, memes resultats: {serie == parallele}")
+    print(f"Attentes (contre-pression) : {pipeline.attentes_contre_pression}")
+    print(f"Recepteur (Go-Back-N, sans retransmission): {recepteur.trames_acceptees} trames livrees")
+
+    # Dans un vrai recepteur: transfert de fichiers avec FEC, trames decodees par le pool
+    dossier = tempfile.mkdtemp()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultat = simulation_fichiers(['../message.txt'], dossier, probErreur=0.05, probPerte=0.05,
+                                           delaiMax=0.005, timeout=0.05, taille_fenetre=8, fec_r=4, nb_processus=2)
+        print(f"simulation_fichiers(fec_r=4, nb_processus=2): {resultat['duree']:.2f} s, "
+              f"identique: {resultat['succes']}")
+    finally:
+        shutil.rmtree(dossier)
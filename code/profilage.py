@@ -0,0 +1,260 @@
+import io
+import time
+import inspect
+import threading
+import pstats
+import cProfile
+import tracemalloc
+import canal
+import effacement
+import fec
+import lot
+import protocole
+
+# Profilage par phase de la chaine d'envoi/reception
+# Pendant un bloc 'with Profileur():', les fonctions de chaque phase sont remplacees par
+# une enveloppe qui cumule le temps mur (perf_counter) et CPU (process_time), puis remises
+# en place a la sortie. Hors du bloc, le code d'origine tourne tel quel: cout nul.
+# Les phases s'imbriquent (le CRC est calcule dans l'encodage et dans la verification):
+# le temps "propre" d'une phase exclut celui des phases appelees a l'interieur.
+# Le temps hors de toute phase est compte dans "boucle" (boucle du protocole, pauses).
+# Les generateurs (_segmenter_flux) sont mesures a chaque next(): un appel = une valeur produite,
+# y compris le travail des generateurs qu'il consomme (lecture et compression du fichier).
+# La pile des phases est propre a chaque thread (threading.local); les totaux sont partages
+# et mis a jour sous verrou.
+
+# (objet, nom de l'attribut, phase)
+PHASES = [
+    (protocole.Emetteur, '_segmenter', 'segment'),
+    (protocole.Emetteur, '_segmenter_flux', 'segment'),
+    (effacement.CodeEffacement, 'encoder', 'parite'),
+    (protocole.Trame, 'serialiser', 'encode'),
+    (protocole.Trame, 'serialiser_flux', 'encode'),
+    (lot, 'serialiser_lot', 'encode'),
+    (protocole, 'calculer_crc16', 'crc'),
+    (protocole, 'calculer_crc32', 'crc'),
+    (lot, 'crc16_lot', 'crc'),
+    (fec.CodeHamming, 'encoder', 'fec'),
+    (protocole, 'bit_stuffing', 'stuff'),
+    (protocole, 'byte_stuffing', 'stuff'),
+    (canal.Canal, 'transmettre', 'transmit'),
+    (canal.Canal, 'transmettre_flux', 'transmit'),
+    (protocole.Trame, 'deserialiser', 'decode'),
+    (protocole.Trame, 'deserialiser_flux', 'decode'),
+    (protocole, 'bit_destuffing', 'destuff'),
+    (protocole, 'byte_destuffing', 'destuff'),
+    (fec.CodeHamming, 'decoder', 'fec'),
+    (protocole.Trame, '_decoder_octets', 'verify'),
+    (effacement.CodeEffacement, 'decoder', 'effacement'),
+    (protocole.Recepteur, 'recomposer_message', 'reassemble'),
+]
+
+RACINE = 'boucle'
+
+
+class Profileur:
+
+    def __init__(self, cprofile=False, memoire=False):
+        self.cprofile = cprofile
+        self.memoire = memoire
+        self.phases = {}      # phase -> [appels, mur propre, cpu propre, mur inclus, cpu inclus]
+        self.piles = {}       # 'boucle;encode;crc' -> mur propre (s)
+        self.local = threading.local()  # .pile: [phase, chemin, mur des enfants, cpu des enfants]
+        self.verrou = threading.Lock()
+        self.originaux = []
+        self.duree = 0.0
+        self.duree_cpu = 0.0
+        self.profil = None
+        self.pic_memoire = None
+        self.allocations = None
+
+    def _envelopper(self, fonction, phase):
+        phases = self.phases
+        piles = self.piles
+        local = self.local
+        verrou = self.verrou
+        mur = time.perf_counter
+        cpu = time.process_time
+
+        def mesurer(appel, *args, **kwargs):
+            pile = getattr(local, 'pile', None)
+            if pile is None:
+                pile = local.pile = []
+            chemin = (pile[-1][1] if pile else RACINE) + ';' + phase
+            cadre = [phase, chemin, 0.0, 0.0]
+            pile.append(cadre)
+            debut_mur = mur()
+            debut_cpu = cpu()
+            try:
+                return appel(*args, **kwargs)
+            finally:
+                duree_mur = mur() - debut_mur
+                duree_cpu = cpu() - debut_cpu
+                pile.pop()
+                if pile:
+                    pile[-1][2] += duree_mur
+                    pile[-1][3] += duree_cpu
+                with verrou:
+                    stats = phases.get(phase)
+                    if stats is None:
+                        stats = phases[phase] = [0, 0.0, 0.0, 0.0, 0.0]
+                    stats[0] += 1
+                    stats[1] += duree_mur - cadre[2]
+                    stats[2] += duree_cpu - cadre[3]
+                    stats[3] += duree_mur
+                    stats[4] += duree_cpu
+                    piles[chemin] = piles.get(chemin, 0.0) + duree_mur - cadre[2]
+
+        if inspect.isgeneratorfunction(fonction):
+            # Chaque next() est mesure; le temps du consommateur entre deux valeurs ne l'est pas
+            def enveloppe(*args, **kwargs):
+                generateur = fonction(*args, **kwargs)
+                try:
+                    while True:
+                        try:
+                            valeur = mesurer(next, generateur)
+                        except StopIteration as fin:
+                            return fin.value
+                        yield valeur
+                finally:
+                    generateur.close()
+        else:
+            def enveloppe(*args, **kwargs):
+                return mesurer(fonction, *args, **kwargs)
+
+        enveloppe.__wrapped__ = fonction
+        return enveloppe
+
+    def __enter__(self):
+        for objet, nom, phase in PHASES:
+            original = vars(objet)[nom]
+            if isinstance(original, staticmethod):
+                remplacant = staticmethod(self._envelopper(original.__func__, phase))
+            else:
+                remplacant = self._envelopper(original, phase)
+            self.originaux.append((objet, nom, original))
+            setattr(objet, nom, remplacant)
+
+        if self.memoire:
+            tracemalloc.start()
+        if self.cprofile:
+            self.profil = cProfile.Profile()
+            self.profil.enable()
+        self.debut = time.perf_counter()
+        self.debut_cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exception):
+        self.duree += time.perf_counter() - self.debut
+        self.duree_cpu += time.process_time() - self.debut_cpu
+        if self.profil is not None:
+            self.profil.disable()
+        if self.memoire:
+            self.pic_memoire = tracemalloc.get_traced_memory()[1]
+            # Sans les allocations du profileur lui-meme
+            instantane = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__)])
+            self.allocations = instantane.statistics('lineno')[:5]
+            tracemalloc.stop()
+
+        for objet, nom, original in reversed(self.originaux):
+            setattr(objet, nom, original)
+        self.originaux = []
+        return False
+
+    def _temps_boucle(self):
+        # Temps hors de toute phase (la somme des temps propres = le temps des phases de premier niveau)
+        mur = self.duree - sum(stats[1] for stats in self.phases.values())
+        cpu = self.duree_cpu - sum(stats[2] for stats in self.phases.values())
+        return max(mur, 0.0), max(cpu, 0.0)
+
+    def tableau(self):
+        boucle, boucle_cpu = self._temps_boucle()
+        lignes = [f"{'phase':12s} {'appels':>8s} {'mur propre':>12s} {'%':>6s} {'CPU propre':>12s} {'mur inclus':>12s}"]
+        lignes.append("-" * len(lignes[0]))
+        ordre = sorted(self.phases.items(), key=lambda e: -e[1][1])
+        for phase, (appels, mur, cpu, mur_inclus, _) in ordre:
+            lignes.append(f"{phase:12s} {appels:8d} {mur*1000:10.1f}ms {mur/max(self.duree, 1e-12)*100:5.1f}% "
+                          f"{cpu*1000:10.1f}ms {mur_inclus*1000:10.1f}ms")
+        lignes.append(f"{RACINE:12s} {'':8s} {boucle*1000:10.1f}ms {boucle/max(self.duree, 1e-12)*100:5.1f}% "
+                      f"{boucle_cpu*1000:10.1f}ms")
+        lignes.append("-" * len(lignes[0]))
+        lignes.append(f"{'total':12s} {'':8s} {self.duree*1000:10.1f}ms {'':6s} {self.duree_cpu*1000:10.1f}ms")
+
+        if self.pic_memoire is not None:
+            lignes.append(f"\nPic memoire (tracemalloc): {self.pic_memoire / 1024:.0f} Kio")
+            for statistique in self.allocations:
+                lignes.append(f"  {statistique}")
+        return "\n".join(lignes)
+
+    def ecrire_piles(self, chemin):
+        # Format "piles repliees" (flamegraph.pl, speedscope, inferno): une pile par ligne,
+        # poids = temps mur propre en microsecondes
+        with open(chemin, 'w') as f:
+            f.write(f"{RACINE} {round(self._temps_boucle()[0] * 1e6)}\n")
+            for pile, duree in sorted(self.piles.items()):
+                f.write(f"{pile} {round(duree * 1e6)}\n")
+
+    def rapport_cprofile(self, nb_lignes=15, tri='cumulative'):
+        if self.profil is None:
+            return ""
+        sortie = io.StringIO()
+        pstats.Stats(self.profil, stream=sortie).sort_stats(tri).print_stats(nb_lignes)
+        return sortie.getvalue()
+
+
+if __name__ == "__main__":
+    import os
+    import contextlib
+    from protocole import simulation_gobackn, TRAMAGE_OCTETS
+
+    # Versions d'origine, pour verifier la remise en place a la fin
+    originaux = [(objet, nom, vars(objet)[nom]) for objet, nom, _ in PHASES]
+
+    # Chemin par defaut (encodage par lots), tramage octet trame par trame, puis les deux codes
+    # correcteurs: Hamming (fec) et trames de parite (parite, effacement)
+    simulations = (
+        ("bits, lot", simulation_gobackn, {}),
+        ("octets", simulation_gobackn, {'tramage': TRAMAGE_OCTETS}),
+        ("Hamming r=4", simulation_gobackn, {'fec_r': 4}),
+        ("parite K=4 M=1", effacement.simulation_parite, {'timeout': 0.3}),
+    )
+    appels_segment = {}
+    for nom, simulation, options in simulations:
+        with Profileur(memoire=True) as profil:
+            with contextlib.redirect_stdout(io.StringIO()):
+                simulation('../message.txt', probErreur=0.05, probPerte=0.10, delaiMax=0.005, **options)
+        print("="*70)
+        print(f"PROFIL PAR PHASE ({nom})")
+        print("="*70)
+        print(profil.tableau())
+        print()
+        appels_segment[nom] = profil.phases.get('segment', [0])[0]
+
+    profil.ecrire_piles('piles.txt')
+    with open('piles.txt') as f:
+        print("piles.txt (flamegraph.pl piles.txt > profil.svg):")
+        print(f.read())
+    os.remove('piles.txt')
+
+    # Segmentation en flux (simulation_gobackn) mesuree valeur par valeur
+    print("Appels 'segment' par simulation:", appels_segment)
+
+    # Plusieurs threads: chacun sa pile, aucun appel perdu
+    with Profileur() as profil:
+        fils = [threading.Thread(target=lambda: [protocole.calculer_crc16(b"x" * 100) for _ in range(1000)])
+                for _ in range(4)]
+        for fil in fils:
+            fil.start()
+        for fil in fils:
+            fil.join()
+    print("Threads: appels crc =", profil.phases['crc'][0], "(attendu 4000), piles =", sorted(profil.piles))
+    print()
+
+    # Avec cProfile: detail fonction par fonction
+    with Profileur(cprofile=True) as profil:
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation_gobackn('../message.txt', probErreur=0.0, probPerte=0.0, delaiMax=0.0)
+    print(profil.rapport_cprofile(nb_lignes=10, tri='tottime'))
+
+    # Cout desactive: les fonctions d'origine sont remises en place
+    print("Fonctions restaurees:", all(vars(objet)[nom] is original for objet, nom, original in originaux))
@@ -1,21 +1,78 @@
+import os
+import sys
 import time
+import itertools
+import threading
 import struct
+import zlib
+import binascii
 from datetime import datetime
-from stuffing import bit_stuffing, bit_destuffing, ajouter_flags, bits_to_bytes, extraire_entre_flags
+from stuffing import bit_stuffing, bit_destuffing, ajouter_flags, bits_to_bytes, extraire_entre_flags, \
+    ajouter_flags_multiples, extraire_trames, bytes_to_bits, byte_stuffing, byte_destuffing, \
+    ajouter_flags_octets, extraire_entre_flags_octets, ajouter_flags_multiples_octets, extraire_trames_octets
 from canal import Canal
+from fec import CodeHamming
+from compression import COMPRESSION_AUCUNE, NOMS_COMPRESSION, TAILLE_BLOC_LECTURE, compresser_flux, \
+    choisir_compression, Decompresseur
 
 
 
 TAILLE_MAX_DATA = 100  # Taille maximale des donnees par trame (octets)
 TIMEOUT = 0.250         # Timeout en secondes (250ms)
+LECTURE_AVANCE = 64    # trames lues (et encodees) en avance sur la fenetre
+
+# Pauses de simulation_gobackn (reprises par les modeles de estimation.py et modele.py)
+PAUSE_ACK = 0.01     # apres l'envoi d'un ACK (passe normale)
+PAUSE_BOUCLE = 0.01  # en fin de tour de boucle, et en attente d'un ACK
+PAUSE_ATTENTE = 0.001  # attente d'un ACK dans TransfertGoBackN
 
 # Types de trames
 TYPE_DATA = 0
 TYPE_ACK = 1
+TYPE_PARITE = 2  # trame de parite (codage d'effacement, voir effacement.py)
+TYPE_MESSAGES = 3  # plusieurs petits messages dans une trame (voir messages.py)
+TYPE_RNR = 4  # recepteur pas pret: tampon plein (controle de flux, voir controle_flux.py)
+TYPE_REPRISE = 5  # poignee de main de reprise d'un transfert interrompu (voir reprise.py)
+TYPE_FICHIER = 6  # debut d'un fichier dans un lot: nom, taille, position (voir fichiers.py)
+
+# En-tete et CRC precompiles
+ENTETE = struct.Struct('!BBH')  # num_seq (1B) + type (1B) + longueur (2B)
+STRUCT_CRC = struct.Struct('!H')
+STRUCT_CRC32 = struct.Struct('!I')
+
+# Sequence de controle (FCS), choisie par lien comme le tramage
+# Le CRC-16 garde une distance de Hamming de 4 jusqu'a ~4 Ko: au-dela, il detecte
+# moins bien les erreurs. Les grandes trames (jusqu'a la limite du champ longueur,
+# 65535 octets) demandent le CRC-32.
+FCS_CRC16 = 16
+FCS_CRC32 = 32
+TAILLE_FCS = {FCS_CRC16: STRUCT_CRC.size, FCS_CRC32: STRUCT_CRC32.size}
+TAILLE_MAX_FCS = {FCS_CRC16: 4000, FCS_CRC32: 0xFFFF}  # donnees max par trame selon le FCS
+FLAG_OCTET = 0x7E
+
+# Tramage: HDLC oriente bit (bit stuffing) ou PPP oriente octet (echappement 0x7D, voir stuffing.py)
+# Le tramage octet ne quitte jamais l'alignement sur l'octet: beaucoup moins couteux,
+# mais sans FEC (le code correcteur travaille sur les bits)
+TRAMAGE_BITS = 'bits'
+TRAMAGE_OCTETS = 'octets'
+
+# Bit de poids fort de l'octet de type: un octet "identifiant de flux" suit l'en-tete
+# (sessions multiplexees, voir sessions.py)
+BIT_FLUX = 0x80
 
 def calculer_crc16(data):
-    # Calcule le CRC-16 CCITT (polynome 0x1021)
+    # Calcule le CRC-16 CCITT (polynome 0x1021, initialisation 0xFFFF)
     # Utilisation de la methode de verification 'reste = 0'
+    # binascii.crc_hqx calcule exactement ce CRC en C, en une seule passe
+    # (meme resultat que calculer_crc16_bit_a_bit, qui sert de reference)
+    return binascii.crc_hqx(data, 0xFFFF)
+
+def calculer_crc32(data):
+    # CRC-32 IEEE 802.3 (celui d'Ethernet), calcule en C par zlib
+    return zlib.crc32(data)
+
+def calculer_crc16_bit_a_bit(data):
+    # Version de reference, bit par bit
     crc = 0xFFFF  # Initialisation
     
     for byte in data:
@@ -43,102 +100,257 @@ def get_timestamp():
 class Trame:
     # Represente une trame de donnees ou un ACK
     # Format: [num_seq(1B)] [type(1B)] [longueur(2B)] [donnees(0-100B)] [crc(2B)]
+    # Avec FCS_CRC32: [crc(4B)] et jusqu'a 65535 octets de donnees
     # Justification dans le rapport
+    # Octet de type: bits 0-3 = type, bits 4-6 = compression, bit 7 = BIT_FLUX
+    # Si BIT_FLUX est mis, l'en-tete contient un 5e octet: [id_flux(1B)]
+    # __slots__: pas de __dict__ par trame (beaucoup de trames sont creees a la reception)
+
+    __slots__ = ('num_seq', 'data', 'type_trame', 'compression', 'flux', 'bits_corriges')
 
-    def __init__(self, num_seq, data, type_trame=TYPE_DATA):
+    def __init__(self, num_seq, data, type_trame=TYPE_DATA, compression=COMPRESSION_AUCUNE, flux=None):
         self.num_seq = num_seq
         self.data = data
         self.type_trame = type_trame
-    
-    
-    def serialiser(self):
-        # (1) Construire la trame classique (sans stuffing)
-        # Determiner le type
-        type_byte = 0 if self.type_trame == TYPE_DATA else 1
+        self.compression = compression
+        self.flux = flux  # identifiant de flux logique (None = pas de multiplexage)
+
+        # Nombre de bits corriges par le FEC a la reception (0 si aucun FEC)
+        self.bits_corriges = 0
+
+    def conserver(self):
+        # Les donnees d'une trame deserialisee sans copie sont une vue (memoryview)
+        # sur le tampon de reception: on les copie seulement si on les garde
+        if isinstance(self.data, memoryview):
+            self.data = self.data.tobytes()
+        return self
+    
+    
+    def serialiser(self, fec=None, tramage=TRAMAGE_BITS, fcs=FCS_CRC16):
+        if tramage == TRAMAGE_OCTETS:
+            if fec is not None:
+                raise ValueError("le FEC n'est disponible qu'avec le tramage bits")
+            return ajouter_flags_octets(byte_stuffing(self._octets(fcs)))
+
+        # (1)-(3) Trame stuffee, sans flags
+        bits_stuffed = self._bits_stuffes(fec, fcs)
+
+        # (4) Ajouter les flags HDLC
+        bits_flagged = ajouter_flags(bits_stuffed)
 
+        return bits_to_bytes(bits_flagged)  # renvoyer en bytes pour le canal
+
+    @staticmethod
+    def serialiser_flux(trames, fec=None, tramage=TRAMAGE_BITS, fcs=FCS_CRC16):
+        # Serialise plusieurs trames dans un seul flux HDLC continu
+        # Les trames partagent leurs flags et le padding n'est ajoute qu'une fois, a la fin
+        return Trame._assembler_flux(Trame._segments_flux(trames, fec, tramage, fcs), tramage)
+
+    @staticmethod
+    def _segments_flux(trames, fec=None, tramage=TRAMAGE_BITS, fcs=FCS_CRC16):
+        # Chaque trame stuffee, sans flags (bits en string, ou bytes en tramage octet)
+        if tramage == TRAMAGE_OCTETS:
+            if fec is not None:
+                raise ValueError("le FEC n'est disponible qu'avec le tramage bits")
+            return [byte_stuffing(trame._octets(fcs)) for trame in trames]
+        return [trame._bits_stuffes(fec, fcs) for trame in trames]
+
+    @staticmethod
+    def _assembler_flux(segments, tramage=TRAMAGE_BITS):
+        if tramage == TRAMAGE_OCTETS:
+            return ajouter_flags_multiples_octets(segments)
+        return bits_to_bytes(ajouter_flags_multiples(segments))
+
+    def _octets(self, fcs=FCS_CRC16):
+        # (1) Construire la trame classique (sans stuffing ni flags)
         # Longueur des donnees
         data_len = len(self.data) if self.data else 0
+        if data_len > TAILLE_MAX_FCS[fcs]:
+            raise ValueError(f"{data_len} octets de donnees: maximum {TAILLE_MAX_FCS[fcs]} avec CRC-{fcs}")
+
+        # Determiner le type
+        type_byte = self.type_trame | (self.compression << 4)
+        if self.flux is not None:
+            type_byte = type_byte | BIT_FLUX
 
         # Construire l'en-tete: num_seq (1B) + type (1B) + longueur (2B)
-        header = struct.pack('!BBH', self.num_seq, type_byte, data_len)
+        header = ENTETE.pack(self.num_seq, type_byte, data_len)
+        if self.flux is not None:
+            header = header + bytes([self.flux])
 
         # Corps = en-tete + donnees
         corps = header + (self.data if self.data else b'')
 
         # Calculer le CRC sur le corps
-        crc = calculer_crc16(corps)
-
         # Trame complete = corps + crc (SANS FLAGS)
-        trame_bytes = corps + struct.pack('!H', crc)
+        if fcs == FCS_CRC32:
+            return corps + STRUCT_CRC32.pack(calculer_crc32(corps))
+        return corps + STRUCT_CRC.pack(calculer_crc16(corps))
+
+    def _bits_stuffes(self, fec=None, fcs=FCS_CRC16):
+        # (1) Trame classique
+        trame_bytes = self._octets(fcs)
 
         # (2) Convertir en bits
         bits = ''.join(f"{byte:08b}" for byte in trame_bytes)
 
-        # (3) Bit stuffing
-        bits_stuffed = bit_stuffing(bits)
+        # (2b) Code correcteur optionnel (FEC) avant le stuffing
+        if fec is not None:
+            bits = fec.encoder(bits)
 
-        # (4) Ajouter les flags HDLC
-        bits_flagged = ajouter_flags(bits_stuffed)
-
-        return bits_to_bytes(bits_flagged)  # renvoyer en bytes pour le canal
+        # (3) Bit stuffing
+        return bit_stuffing(bits)
     
     
     @staticmethod
-    def deserialiser(trame_bytes):
+    def deserialiser(trame_bytes, fec=None, copier=True, tramage=TRAMAGE_BITS, fcs=FCS_CRC16):
         # Reconstruit une trame depuis bytes
-        # Args:trame_bytes: bytes recus
+        # Args:trame_bytes: bytes recus, fec: code correcteur utilise par l'emetteur (ou None)
+        #      copier: si False, trame.data est une vue sur le tampon decode (voir conserver())
+        #      tramage: TRAMAGE_BITS ou TRAMAGE_OCTETS, fcs: FCS_CRC16 ou FCS_CRC32 (les memes que l'emetteur)
         # Returns:(Trame, crc_valide) ou (None, False) si erreur
 
+        # === REJET RAPIDE ===
+        # Une trame emise commence par un flag aligne sur l'octet et contient au moins
+        # flag + en-tete(4) + crc(2) + flag: sinon inutile de la decoder
+        if len(trame_bytes) < 8 or trame_bytes[0] != FLAG_OCTET:
+            return None, False
+
+        # === TRAMAGE OCTET: retirer l'echappement, sans passer par les bits ===
+        if tramage == TRAMAGE_OCTETS:
+            contenu = extraire_entre_flags_octets(trame_bytes)
+            if contenu is None:
+                return None, False
+            contenu = byte_destuffing(contenu)
+            if contenu is None:
+                return None, False
+            return Trame._decoder_octets(contenu, 0, copier, fcs)
+
         # === RETIRER LE BIT-STUFFING HDLC ===
         # Convertir bytes → string de bits
-        bits_str = ''.join(f"{byte:08b}" for byte in trame_bytes)
+        bits_str = bytes_to_bits(trame_bytes)
 
         # (1) Extraire entre flags
         bits_no_flags = extraire_entre_flags(bits_str)
         if bits_no_flags is None:
             return None, False
 
+        return Trame._decoder_bits(bits_no_flags, fec, copier, fcs)
+
+    @staticmethod
+    def deserialiser_flux(flux_bytes, fec=None, copier=True, tramage=TRAMAGE_BITS, fcs=FCS_CRC16):
+        # Reconstruit toutes les trames d'un flux HDLC continu (voir serialiser_flux)
+        # Returns: liste de (Trame, crc_valide) ou (None, False), une entree par segment entre flags
+        if tramage == TRAMAGE_OCTETS:
+            resultats = []
+            for segment in extraire_trames_octets(flux_bytes):
+                contenu = byte_destuffing(segment)
+                resultats.append((None, False) if contenu is None else Trame._decoder_octets(contenu, 0, copier, fcs))
+            return resultats
+        bits_str = bytes_to_bits(flux_bytes)
+        return [Trame._decoder_bits(segment, fec, copier, fcs) for segment in extraire_trames(bits_str)]
+
+    @staticmethod
+    def _decoder_bits(bits_no_flags, fec=None, copier=True, fcs=FCS_CRC16):
+        # (1b) Plausibilite de la longueur des qu'on a l'en-tete
+        if fec is None:
+            # Sept '1' de suite: sequence d'abandon HDLC, la trame est rejetee sans
+            # destuffing ni CRC (six '1' peuvent venir d'un bit stuffe inverse, que le
+            # destuffing saute: on laisse le CRC trancher)
+            if '1111111' in bits_no_flags:
+                return None, False
+            # 40 bits stuffes donnent au moins les 32 bits de l'en-tete
+            entete = bit_destuffing(bits_no_flags[:40])
+            if len(entete) < 32:
+                return None, False
+        else:
+            # Avec FEC: on ne decode que les premiers blocs, ceux qui portent l'en-tete
+            # (pas de rejet sur six '1': un bit inverse peut en creer un, et le FEC le corrige)
+            nb_blocs = -(-32 // fec.k)
+            longueur = nb_blocs * fec.n
+            entete, _ = fec.decoder(bit_destuffing(bits_no_flags[:longueur + longueur // 5 + 5])[:longueur])
+            if entete is None:
+                return None, False
+        taille_entete = 5 if entete[8] == '1' else 4  # BIT_FLUX
+        data_len = int(entete[16:32], 2)
+        nb_bits = (taille_entete + data_len + TAILLE_FCS[fcs]) * 8
+        if fec is not None:
+            nb_bits = -(-nb_bits // fec.k) * fec.n  # blocs complets
+        # Le stuffing ajoute au plus un bit tous les 5 bits
+        if not nb_bits <= len(bits_no_flags) <= nb_bits + nb_bits // 5:
+            return None, False
+
         # (2) Destuffing
         bits_clean = bit_destuffing(bits_no_flags)
 
+        # (2b) Correction d'erreurs (FEC); au-dela de sa capacite, la trame est rejetee
+        bits_corriges = 0
+        if fec is not None:
+            bits_clean, bits_corriges = fec.decoder(bits_clean)
+            if bits_clean is None:
+                return None, False
+            # Retirer le bourrage du dernier bloc (la longueur reelle est dans l'en-tete)
+            bits_clean = bits_clean[:len(bits_clean) - len(bits_clean) % 8]
+
         # (3) Retour aux bytes
         if len(bits_clean) % 8 != 0:
             return None, False
 
-        data_bytes = bytes(int(bits_clean[i:i+8], 2)
-                        for i in range(0, len(bits_clean), 8))
-        
-        # === DESERIALISATION NORMALE ===
-        # (4) Analyse normale de trame
+        # Verifier la taille minimale: header(4) + crc(2) = 6 octets
+        if len(bits_clean) < 6 * 8:
+            return None, False
+
+        data_bytes = int(bits_clean, 2).to_bytes(len(bits_clean) // 8, 'big')
+        return Trame._decoder_octets(data_bytes, bits_corriges, copier, fcs)
+
+    @staticmethod
+    def _decoder_octets(data_bytes, bits_corriges=0, copier=True, fcs=FCS_CRC16):
+        # Trame sans flags ni stuffing: en-tete + donnees + CRC
         # Verifier la taille minimale: header(4) + crc(2) = 6 octets
         if len(data_bytes) < 6:
             return None, False
 
-        # Extraire l'en-tete (4 premiers octets)
-        num_seq, type_byte, data_len = struct.unpack('!BBH', data_bytes[:4])
+        # Un seul tampon pour toute la trame; en-tete, donnees et CRC sont lus
+        # a travers une memoryview, sans copie
+        vue = memoryview(data_bytes)
+        
+        # === DESERIALISATION NORMALE ===
+        # (4) Analyse normale de trame
+        # Extraire l'en-tete (4 premiers octets, + identifiant de flux si BIT_FLUX)
+        num_seq, type_byte, data_len = ENTETE.unpack_from(vue)
+        taille_entete = 4
+        flux = None
+        if type_byte & BIT_FLUX:
+            taille_entete = 5
+            flux = vue[4]
 
         # Verifier que la taille est coherente
         # header + data + crc
-        taille_attendue = 4 + data_len + 2
-        if len(data_bytes) < taille_attendue:
+        taille_corps = taille_entete + data_len
+        taille_attendue = taille_corps + TAILLE_FCS[fcs]
+        if len(vue) < taille_attendue:
             return None, False
         
-        # Extraire les donnees (si presentes)
-        data = data_bytes[4:4+data_len]
+        # Extraire les donnees (si presentes), copiees seulement si demande
+        data = vue[taille_entete:taille_entete+data_len]
+        if copier:
+            data = data.tobytes()
 
-        # Extraire le CRC (2 derniers octets de la partie attendue)
-        crc_recu = struct.unpack('!H', data_bytes[4+data_len:4+data_len+2])[0]
-
-        # Calculer le CRC sur la trame complete (corps + crc recu)
-        trame_complete = data_bytes[:4+data_len+2]
-        reste = calculer_crc16(trame_complete)
+        if fcs == FCS_CRC32:
+            # CRC-32 (reflechi, inverse en sortie): on compare au CRC recu
+            crc_valide = calculer_crc32(vue[:taille_corps]) == STRUCT_CRC32.unpack_from(vue, taille_corps)[0]
+        else:
+            # Calculer le CRC sur la trame complete (corps + crc recu)
+            reste = calculer_crc16(vue[:taille_attendue])
 
-        # Verifier si le reste est 0
-        crc_valide = (reste == 0)
+            # Verifier si le reste est 0
+            crc_valide = (reste == 0)
 
         # Reconstruire la trame
-        type_trame = TYPE_DATA if type_byte == 0 else TYPE_ACK
-        trame = Trame(num_seq, data, type_trame)
+        type_trame = type_byte & 0x0F
+        compression = (type_byte >> 4) & 0x07
+        trame = Trame(num_seq, data, type_trame, compression, flux)
+        trame.bits_corriges = bits_corriges
 
         return trame, crc_valide
     
@@ -146,32 +358,85 @@ class Emetteur:
     # Emetteur de trames avec Go-Back-N
     # Gere l'envoi, les timeouts et les retransmissions
     
-    def __init__(self, canal, timeout=TIMEOUT, taille_fenetre=5):
+    def __init__(self, canal, timeout=TIMEOUT, taille_fenetre=5, tramage=TRAMAGE_BITS, fcs=FCS_CRC16,
+                 taille_trame=TAILLE_MAX_DATA):
+        if taille_trame > TAILLE_MAX_FCS[fcs]:
+            raise ValueError(f"taille_trame={taille_trame}: maximum {TAILLE_MAX_FCS[fcs]} avec CRC-{fcs}")
         self.canal = canal
         self.timeout = timeout
         self.taille_fenetre = taille_fenetre
+        self.tramage = tramage  # choisi par lien: TRAMAGE_BITS ou TRAMAGE_OCTETS
+        self.fcs = fcs          # choisi par lien: FCS_CRC16 ou FCS_CRC32
+        self.taille_trame = taille_trame  # donnees max par trame (trames geantes avec CRC-32)
         
         # Numero de sequence courant
         self.num_seq = 0
         
+        # Controle de flux: plus grand numero absolu que le recepteur accepte
+        # (dernier ACK + fenetre annoncee), None = pas de limite annoncee
+        self.limite_recepteur = None
+
         # Statistiques
         self.trames_envoyees = 0
         self.trames_retransmises = 0
         self.acks_recus = 0
+        self.blocages_flux = 0  # fois ou la fenetre annoncee a bloque l'envoi
+
+    def mettre_a_jour_fenetre(self, num_ack, fenetre):
+        # ACK (RR) ou RNR recu: le recepteur accepte jusqu'a num_ack + fenetre
+        self.limite_recepteur = num_ack + fenetre
+
+    def peut_envoyer(self, num, base):
+        # La trame num peut partir si elle est dans la fenetre d'emission
+        # et dans la fenetre annoncee par le recepteur
+        if num >= base + self.taille_fenetre:
+            return False
+        return self.limite_recepteur is None or num <= self.limite_recepteur
+
+    def envoyer_flux(self, trames, fec=None):
+        # Envoie plusieurs trames en un seul appel au canal (flux HDLC continu)
+        # Retourne les bytes recus de l'autre cote, ou None si tout le flux est perdu
+        segments = Trame._segments_flux(trames, fec, self.tramage, self.fcs)
+        flux = Trame._assembler_flux(segments, self.tramage)
+
+        # Position (en bits) du flag d'ouverture de chaque trame, puis du flag final:
+        # le canal perd des trames entieres sans toucher a leurs voisines
+        bits_par_unite = 8 if self.tramage == TRAMAGE_OCTETS else 1
+        frontieres = [0]
+        for segment in segments:
+            frontieres.append(frontieres[-1] + 8 + len(segment) * bits_par_unite)
+
+        self.trames_envoyees = self.trames_envoyees + len(trames)
+        return self.canal.transmettre_flux(flux, frontieres)
 
     def _segmenter(self, message):
-        # Segmente le message en chunks de TAILLE_MAX_DATA octets
+        # Segmente le message en chunks de taille_trame octets (TAILLE_MAX_DATA par defaut)
         # retourne liste de bytes (chaque element = 1 trame de donnees)
  
         chunks = []
         
-        # Parcourir le message par blocs de TAILLE_MAX_DATA
-        for i in range(0, len(message), TAILLE_MAX_DATA):
+        # Parcourir le message par blocs de taille_trame
+        for i in range(0, len(message), self.taille_trame):
             # Extraire un chunk
-            chunk = message[i:i+TAILLE_MAX_DATA]
+            chunk = message[i:i+self.taille_trame]
             chunks.append(chunk)
         
         return chunks
+
+    def _segmenter_flux(self, flux):
+        # Version streaming de _segmenter: flux = iterable de blocs de bytes
+        # de taille quelconque (ex: sortie de compresser_flux)
+        tampon = b''
+        for bloc in flux:
+            tampon = tampon + bloc
+            debut = 0
+            while len(tampon) - debut >= self.taille_trame:
+                yield tampon[debut:debut+self.taille_trame]
+                debut = debut + self.taille_trame
+            tampon = tampon[debut:]
+
+        if tampon:
+            yield tampon
     
     
 class Recepteur:
@@ -192,11 +457,61 @@ class Recepteur:
         # Statistiques
         self.trames_acceptees = 0
         self.trames_rejetees = 0
+        self.trames_corrigees = 0  # trames acceptees grace au FEC
         self.acks_envoyes = 0
+
+        # Decompression incrementale (si l'emetteur a compresse le fichier)
+        self.decompresseur = None
+        self.message_decompresse = bytearray()
+
+    def livrer(self, num, data, compression=COMPRESSION_AUCUNE):
+        # Livraison a l'application d'une trame recue dans l'ordre (voir RecepteurBorne)
+        self.trames_recues.append((num, data))
+        if compression != COMPRESSION_AUCUNE:
+            self.livrer_compresse(compression, data)
+
+    def livrer_compresse(self, compression, data):
+        # Decompresse les donnees d'une trame livree dans l'ordre
+        if self.decompresseur is None:
+            self.decompresseur = Decompresseur(compression)
+        self.message_decompresse += self.decompresseur.alimenter(data)
+
+    def traiter_trame(self, trame, crc_valide):
+        # Logique Go-Back-N du recepteur pour une trame deja decodee
+        # (utilisee par le pipeline de reception, voir pipeline.py)
+        # num_seq tient sur 1 octet: on compare modulo 256, mais on garde
+        # le numero absolu dans trames_recues
+        # Retourne le numero (absolu) a acquitter, ou None si aucun ACK
+        if not crc_valide:
+            self.trames_rejetees += 1
+            return None
+
+        if trame.bits_corriges > 0:
+            self.trames_corrigees += 1
+
+        attendu = self.dernier_num_seq + 1
+        if trame.num_seq == attendu % 256:
+            self.livrer(attendu, trame.conserver().data, trame.compression)
+            self.dernier_num_seq = attendu
+            self.trames_acceptees += 1
+            self.acks_envoyes += 1
+            return attendu
+
+        # Hors ordre: ACK du dernier recu (si existant)
+        self.trames_rejetees += 1
+        if self.dernier_num_seq >= 0:
+            self.acks_envoyes += 1
+            return self.dernier_num_seq
+        return None
     
     def recomposer_message(self):
         # Recompose le message complet a partir des trames recues
 
+        # Message compresse: deja decompresse au fil de la livraison
+        if self.decompresseur is not None:
+            self.message_decompresse += self.decompresseur.terminer()
+            return bytes(self.message_decompresse)
+
         # Trier par numero de sequence (normalement deja dans l'ordre)
         self.trames_recues.sort(key=lambda x: x[0])
         
@@ -208,9 +523,216 @@ class Recepteur:
         return message
     
 
+class TransfertGoBackN:
+    # Boucle d'emission Go-Back-N partagee par les simulations (sessions.py, messages.py,
+    # reprise.py, delta.py, fichiers.py, controle_flux.py). Memes regles que simulation_gobackn:
+    # fenetre d'emission, ACK cumulatif (numero sur 1 octet -> numero absolu), renvoi depuis
+    # la base au timeout, abandon apres max_tentatives, fenetre annoncee (RR/RNR) et sonde;
+    # sans sa trace trame par trame ni ses pauses de simulation (estimation.py et modele.py
+    # reproduisent la boucle de simulation_gobackn, qui garde donc la sienne).
+    # - source: elements a envoyer, lus au fil de l'envoi (un element = une trame)
+    # - encoder(num, element): trame encodee (bytes) pour le numero absolu num
+    #   (par defaut: trame de donnees, element = donnees)
+    # - trame_ack(num): trame d'ACK du recepteur (par defaut ACK sans donnees)
+    # - envoyer(trame_bytes): lien asynchrone (LienAsynchrone); les ACKs reviennent alors par
+    #   recevoir_ack, appele depuis le fil du lien retour. Sans envoyer, la trame traverse
+    #   emetteur.canal et le recepteur repond tout de suite.
+    # - pret(): faux si l'element suivant doit attendre (ex: que la fenetre se vide)
+    # - arreter(): raison d'un arret immediat du transfert, ou None
+    # - a_chaque_tour(): appele a chaque tour de boucle; peut retourner une trame a
+    #   annoncer a l'emetteur (RR de mise a jour du controle de flux)
+    # - fenetre_annoncee: l'emetteur respecte la fenetre portee par les ACKs
+
+    def __init__(self, emetteur, recepteur, source, encoder=None, trame_ack=None, envoyer=None,
+                 pret=None, arreter=None, a_chaque_tour=None, max_tentatives=None,
+                 fenetre_annoncee=False, fec=None):
+        self.emetteur = emetteur
+        self.recepteur = recepteur
+        self.source = iter(source)
+        self.fec = fec
+        if encoder is None:
+            def encoder(num, data):
+                return Trame(num % 256, data, TYPE_DATA).serialiser(fec, emetteur.tramage, emetteur.fcs)
+        self.encoder = encoder
+        self.trame_ack = trame_ack if trame_ack is not None else (lambda num: Trame(num % 256, b'', TYPE_ACK))
+        self.envoyer = envoyer
+        self.pret = pret
+        self.arreter = arreter
+        self.a_chaque_tour = a_chaque_tour
+        self.max_tentatives = max_tentatives
+        self.format_fenetre = None
+        if fenetre_annoncee:
+            from controle_flux import FENETRE  # import local: controle_flux.py importe protocole.py
+            self.format_fenetre = FENETRE
+
+        self.base = 0          # plus ancienne trame non acquittee (numero absolu)
+        self.prochain = 0      # prochain numero absolu a utiliser
+        self.en_vol = {}       # numero absolu -> trame encodee, jusqu'a son acquittement
+        self.tentatives = {}   # numero absolu -> envois
+        self.derniere = None   # derniere trame acquittee: sonde quand la fenetre annoncee est nulle
+        self.epuisee = False   # source lue jusqu'au bout
+        self.abandon = None    # raison de l'arret du transfert
+        self.octets = 0        # trames et ACKs emis sur le lien
+        self.temps_bloque = 0.0
+        self.condition = threading.Condition()
+        self.dernier_progres = time.time()
+
+    def executer(self):
+        emetteur = self.emetteur
+        debut = time.time()
+        debut_blocage = None
+        with self.condition:
+            while self.abandon is None:
+                if self.a_chaque_tour is not None:
+                    annonce = self.a_chaque_tour()
+                    if annonce is not None:
+                        self._annoncer(annonce)
+
+                bloque = self._remplir()
+                if self.epuisee and self.base >= self.prochain:
+                    break
+
+                # Blocage par le recepteur: un episode compte une fois
+                if bloque and debut_blocage is None:
+                    emetteur.blocages_flux += 1
+                    debut_blocage = time.time()
+                elif not bloque and debut_blocage is not None:
+                    self.temps_bloque += time.time() - debut_blocage
+                    debut_blocage = None
+
+                attente = emetteur.timeout - (time.time() - self.dernier_progres)
+                if attente > 0:
+                    self.condition.wait(min(attente, PAUSE_ATTENTE))
+                    continue
+                self._expirer()
+
+            if debut_blocage is not None:
+                self.temps_bloque += time.time() - debut_blocage
+        return {
+            'abandon': self.abandon,
+            'octets': self.octets,
+            'temps_bloque': self.temps_bloque,
+            'duree': time.time() - debut
+        }
+
+    def _remplir(self):
+        # Envoie les nouveaux elements tant que la fenetre le permet
+        # Retourne vrai si c'est la fenetre annoncee par le recepteur qui arrete l'envoi
+        emetteur = self.emetteur
+        while not self.epuisee:
+            if not emetteur.peut_envoyer(self.prochain, self.base):
+                return self.prochain < self.base + emetteur.taille_fenetre
+            if self.pret is not None and not self.pret():
+                return False
+            if self.arreter is not None:
+                self.abandon = self.arreter()
+                if self.abandon is not None:
+                    return False
+            try:
+                element = next(self.source)
+            except StopIteration:
+                self.epuisee = True
+                return False
+
+            num = self.prochain
+            if self.base == num:
+                # Rien en vol: le timer de la base part avec cette trame
+                self.dernier_progres = time.time()
+            self.en_vol[num] = self.encoder(num, element)
+            self.tentatives[num] = 1
+            self.prochain += 1
+            emetteur.trames_envoyees += 1
+            self._envoyer(self.en_vol[num])
+        return False
+
+    def _expirer(self):
+        # Timeout de la base: Go-Back-N depuis la base, sans depasser la fenetre annoncee
+        emetteur = self.emetteur
+        a_renvoyer = [num for num in range(self.base, self.prochain) if emetteur.peut_envoyer(num, self.base)]
+        if a_renvoyer:
+            if self.max_tentatives is not None and self.tentatives[self.base] >= self.max_tentatives:
+                self.abandon = f"trame #{self.base} abandonnee apres {self.max_tentatives} tentatives"
+                return
+            print(f"[{get_timestamp()}] ⏱️  TIMEOUT: retransmission depuis #{self.base}")
+            for num in a_renvoyer:
+                if num < self.base:
+                    continue  # acquittee pendant ce renvoi (lien synchrone)
+                emetteur.trames_retransmises += 1
+                self.tentatives[num] += 1
+                self._envoyer(self.en_vol[num])
+        elif self.derniere is not None:
+            # Fenetre nulle et RR peut-etre perdu: le recepteur repond a la sonde (duplicata)
+            # avec sa fenetre courante
+            print(f"[{get_timestamp()}] 🔍 Fenetre nulle: sonde avec la trame #{self.base - 1}")
+            self._envoyer(self.derniere)
+        self.dernier_progres = time.time()
+
+    def _envoyer(self, trame_bytes):
+        self.octets += len(trame_bytes)
+        if self.envoyer is not None:
+            self.envoyer(trame_bytes)
+            return
+        emetteur = self.emetteur
+        trame_transmise = emetteur.canal.transmettre(trame_bytes)
+        if trame_transmise is None:
+            return
+        trame_recue, crc_valide = Trame.deserialiser(trame_transmise, self.fec, copier=False,
+                                                     tramage=emetteur.tramage, fcs=emetteur.fcs)
+        ack_num = self.recepteur.traiter_trame(trame_recue, crc_valide)
+        if ack_num is not None:
+            self._annoncer(self.trame_ack(ack_num))
+
+    def _annoncer(self, trame):
+        # ACK (ou RR) du recepteur vers l'emetteur, sur le meme canal
+        emetteur = self.emetteur
+        ack_bytes = trame.serialiser(self.fec, emetteur.tramage, emetteur.fcs)
+        self.octets += len(ack_bytes)
+        ack_transmis = emetteur.canal.transmettre(ack_bytes)
+        if ack_transmis is not None:
+            self.recevoir_ack(ack_transmis)
+
+    def recevoir_ack(self, ack_bytes):
+        # ACK cumulatif: le numero sur 1 octet designe une trame entre base - 1 et prochain - 1
+        emetteur = self.emetteur
+        ack, crc_valide = Trame.deserialiser(ack_bytes, self.fec, tramage=emetteur.tramage, fcs=emetteur.fcs)
+        if not crc_valide or ack.type_trame not in (TYPE_ACK, TYPE_RNR):
+            return
+        with self.condition:
+            num = self.base - 1 + (ack.num_seq - (self.base - 1)) % 256
+            if num >= self.prochain:
+                return  # ACK tardif d'une trame acquittee depuis longtemps
+            emetteur.acks_recus += 1
+            if self.format_fenetre is not None and len(ack.data) == self.format_fenetre.size:
+                emetteur.mettre_a_jour_fenetre(num, self.format_fenetre.unpack(ack.data)[0])
+            if num >= self.base:
+                self.derniere = self.en_vol[num]
+                for k in range(self.base, num + 1):
+                    del self.en_vol[k]
+                    del self.tentatives[k]
+                self.base = num + 1
+                self.dernier_progres = time.time()
+            self.condition.notify()
+
+
+def transfert_gobackn(emetteur, recepteur, source, **options):
+    # Transfert Go-Back-N de source (voir TransfertGoBackN pour les options)
+    # Retourne {'abandon', 'octets', 'temps_bloque', 'duree'}
+    return TransfertGoBackN(emetteur, recepteur, source, **options).executer()
+
+
 def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0.02,
-                       timeout=TIMEOUT, taille_fenetre=5, max_tentatives=5):
+                       timeout=TIMEOUT, taille_fenetre=5, max_tentatives=5, fec_r=None,
+                       compression=None, tramage=TRAMAGE_BITS, fcs=FCS_CRC16, taille_trame=TAILLE_MAX_DATA,
+                       metriques=None, capacite=None, debit_consommateur=None):
     # Simulation GO-BACK-N
+    # - fec_r: active le code correcteur Hamming SECDED (n = 2^fec_r) si different de None
+    # - compression: None, 'zlib', 'lzma', 'bz2' ou 'auto' (zlib si le ratio est bon)
+    # - tramage: TRAMAGE_BITS (HDLC, bit stuffing) ou TRAMAGE_OCTETS (PPP, echappement d'octets)
+    # - fcs, taille_trame: FCS_CRC32 permet des trames geantes (jusqu'a 65535 octets de donnees)
+    # - metriques: Registre (metriques.py) mis a jour en direct pendant le transfert
+    # - capacite, debit_consommateur: tampon borne du recepteur (en trames) vide par un consommateur
+    #   a debit_consommateur octets/s; les ACKs annoncent la place libre (RR/RNR, voir
+    #   controle_flux.py) et l'emetteur ne depasse pas la fenetre annoncee
     # - Ne modifie pas le Canal.
     # - Introduit un buffer global d'ACKs pour ne pas "perdre" les ACKs arrivant hors timing.
     # - Mesure le temps d'envoi réel (send_times) et déclenche timeout si elapsed > timeout.
@@ -220,31 +742,133 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
     print("="*70)
     print(f"Fichier: {fichier_path}")
     print(f"Parametres: erreur={probErreur}, perte={probPerte}, delai={delaiMax*1000}ms")
-    print(f"Timeout: {timeout*1000}ms, Fenetre: {taille_fenetre}")
+    print(f"Timeout: {timeout*1000}ms, Fenetre: {taille_fenetre}, Tramage: {tramage}")
+    print(f"FCS: CRC-{fcs}, donnees par trame: {taille_trame} octets")
+    fec = CodeHamming(fec_r) if fec_r is not None else None
+    if fec is not None:
+        print(f"FEC: Hamming SECDED ({fec.n},{fec.k}), rendement={fec.rendement():.2f}")
     print("="*70 + "\n")
     
     canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
-    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre)
-    recepteur = Recepteur(canal)
-    
-    with open(fichier_path, 'rb') as f:
-        message = f.read()
-    
-    print(f"Taille: {len(message)} octets")
-    trames_data = emetteur._segmenter(message)
-    nb_trames_total = len(trames_data)
-    print(f"Segmente en {nb_trames_total} trames\n")
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre, tramage=tramage, fcs=fcs,
+                        taille_trame=taille_trame)
+    if capacite is None:
+        recepteur = Recepteur(canal)
+    else:
+        from controle_flux import RecepteurBorne, FENETRE  # import local: controle_flux.py importe protocole.py
+        recepteur = RecepteurBorne(canal, capacite, debit_consommateur)
+        print(f"Controle de flux: tampon de {capacite} trames, consommateur a {debit_consommateur} octets/s")
+    
+    # Le fichier est lu (et compresse) au fil de l'envoi: seules les trames pas encore
+    # acquittees, plus une petite avance de lecture, sont en memoire
+    taille_fichier = os.path.getsize(fichier_path)
+    print(f"Taille: {taille_fichier} octets")
+    fichier = open(fichier_path, 'rb')
+    algo = COMPRESSION_AUCUNE
+    if compression == 'auto':
+        algo, ratio = choisir_compression(fichier)
+        print(f"Compression auto: ratio mesure={ratio:.2f} -> {'zlib' if algo else 'desactivee'}")
+    elif compression is not None:
+        algo = NOMS_COMPRESSION[compression]
+    source = emetteur._segmenter_flux(compresser_flux(fichier, algo))
     
     # Variables EMETTEUR (ce qu'il sait)
     base_emetteur = 0  # indice de la plus ancienne trame non acquittée
-    tentatives = [0] * nb_trames_total
+    nb_trames_total = None  # connu une fois le fichier lu jusqu'au bout
+    nb_trames_lues = 0
+    octets_envoyes = 0  # donnees des trames (apres compression)
+    derniere_annonce = time.time()  # derniere fenetre annoncee recue (controle de flux)
+    debut_blocage = None  # debut de l'episode en cours ou la fenetre annoncee bloque l'envoi
+    temps_bloque = 0.0
+    tentatives = {}
     # send_times stocke l'instant d'envoi (time.time()) pour chaque trame envoyée/retx,
     # ou None si pas en attente.
-    send_times = [None] * nb_trames_total
+    send_times = {}
     temps_debut = time.time()
 
+    # Metriques en direct (optionnelles): instant du premier envoi pour le delai de livraison
+    instruments = None
+    if metriques is not None:
+        from metriques import MetriquesGoBackN
+        instruments = MetriquesGoBackN(metriques, canal, emetteur, recepteur, taille_fenetre, timeout)
+        premier_envoi = {}
+
     # Buffer global pour ACKs reçus
     acks_buffer_global = set()
+
+    # Trame abandonnee (max_tentatives atteint): le transfert s'arrete
+    abandon = None
+
+    # Les trames de donnees sont encodees a la lecture et reutilisees telles quelles pour les
+    # retransmissions; par lots (NumPy) en tramage bit, CRC-16 sans FEC, sinon trame par trame
+    from lot import serialiser_lot  # import local: lot.py importe protocole.py
+    trames_encodees = {}  # numero -> trame encodee, pour les trames lues et pas encore acquittees
+
+    def charger(jusqu_a):
+        # Lit les trames jusqu'a jusqu_a (exclu), avec LECTURE_AVANCE trames d'avance
+        nonlocal nb_trames_lues, nb_trames_total, octets_envoyes
+        if nb_trames_total is not None or nb_trames_lues >= jusqu_a:
+            return
+        premier = nb_trames_lues
+        nouvelles = list(itertools.islice(source, jusqu_a + LECTURE_AVANCE - premier))
+        if len(nouvelles) < jusqu_a + LECTURE_AVANCE - premier:
+            nb_trames_total = premier + len(nouvelles)
+        if nouvelles:
+            numeros = range(premier, premier + len(nouvelles))
+            trames_encodees.update(zip(numeros, serialiser_lot([n % 256 for n in numeros], nouvelles,
+                                                               TYPE_DATA, algo, fec, tramage, fcs)))
+        for donnees in nouvelles:
+            tentatives[nb_trames_lues] = 0
+            send_times[nb_trames_lues] = None
+            if instruments is not None:
+                premier_envoi[nb_trames_lues] = None
+            octets_envoyes += len(donnees)
+            nb_trames_lues += 1
+
+    def liberer(base):
+        # Les trames acquittees ne seront plus envoyees
+        for dictionnaire in (tentatives, send_times, trames_encodees,
+                             premier_envoi if instruments is not None else None):
+            if dictionnaire is not None:
+                for num in [num for num in dictionnaire if num < base]:
+                    del dictionnaire[num]
+
+    def encoder_donnees(num_seq):
+        return trames_encodees[num_seq]
+
+    def trame_ack(num):
+        # ACK du recepteur; avec un tampon borne, il porte la fenetre annoncee (ou c'est un RNR)
+        if capacite is None:
+            return Trame(num % 256, b'', TYPE_ACK)
+        return recepteur.trame_ack(num)
+
+    def lire_fenetre(ack_transmis, num):
+        # Emetteur: fenetre annoncee par l'ACK recu (controle de flux seulement)
+        nonlocal derniere_annonce
+        if capacite is None:
+            return
+        ack_recu, crc_valide = Trame.deserialiser(ack_transmis, fec, tramage=tramage, fcs=fcs)
+        if crc_valide and len(ack_recu.data) == FENETRE.size:
+            emetteur.mettre_a_jour_fenetre(num, FENETRE.unpack(ack_recu.data)[0])
+            derniere_annonce = time.time()
+
+    def annoncer(trame):
+        # ACK hors flux de donnees (RR de mise a jour, reponse a une sonde)
+        ack_transmis = canal.transmettre(trame.serialiser(fec, tramage, fcs))
+        if ack_transmis is not None:
+            lire_fenetre(ack_transmis, recepteur.dernier_num_seq)
+
+    def sonder():
+        # Fenetre nulle et RR peut-etre perdu: la derniere trame acquittee est renvoyee,
+        # le recepteur y repond (duplicata) avec sa fenetre courante
+        print(f"[{get_timestamp()}] 🔍 Fenetre nulle: sonde avec la trame #{base_emetteur - 1}")
+        trame_transmise = canal.transmettre(encoder_donnees(base_emetteur - 1))
+        if trame_transmise is None:
+            return
+        trame_recue, crc_valide = Trame.deserialiser(trame_transmise, fec, copier=False, tramage=tramage, fcs=fcs)
+        ack_num = recepteur.traiter_trame(trame_recue, crc_valide)
+        if ack_num is not None:
+            annoncer(trame_ack(ack_num))
     
     print("Debut transmission...\n")
 
@@ -252,14 +876,16 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
     def retransmettre_depuis_base():
         print(f"[{get_timestamp()}] 🔁 GO-BACK-N: Retransmission depuis base={base_emetteur} jusqu'à {fin_fenetre - 1}")
         for num_seq in range(base_emetteur, fin_fenetre):
-            data = trames_data[num_seq]
-            trame = Trame(num_seq, data, TYPE_DATA)
-            trame_bytes = trame.serialiser()
+            if not emetteur.peut_envoyer(num_seq, base_emetteur):
+                break  # au-dela de la fenetre annoncee par le recepteur
+            trame_bytes = encoder_donnees(num_seq)
 
             print(f"[{get_timestamp()}] 🔄 RETRANS trame #{num_seq}")
             emetteur.trames_retransmises += 1
             tentatives[num_seq] += 1
             send_times[num_seq] = time.time()
+            if instruments is not None and premier_envoi[num_seq] is None:
+                premier_envoi[num_seq] = send_times[num_seq]
 
             # Transmettre la trame
             trame_transmise = canal.transmettre(trame_bytes)
@@ -269,30 +895,35 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
                 continue
 
             # Réception côté récepteur
-            trame_recue, crc_valide = Trame.deserialiser(trame_transmise)
+            trame_recue, crc_valide = Trame.deserialiser(trame_transmise, fec, copier=False, tramage=tramage, fcs=fcs)
             if not crc_valide:
                 print(f"[{get_timestamp()}]   ❌ Trame CORROMPUE (CRC) en retransmission")
                 recepteur.trames_rejetees += 1
                 continue
 
-            # Ordonnancement Go-Back-N
-            if trame_recue.num_seq == recepteur.dernier_num_seq + 1:
+            if trame_recue.bits_corriges > 0:
+                print(f"[{get_timestamp()}]   🩹 FEC: {trame_recue.bits_corriges} bit(s) corrige(s)")
+
+            # Ordonnancement Go-Back-N (et tampon borne): logique du Recepteur
+            avant = recepteur.dernier_num_seq
+            ack_num = recepteur.traiter_trame(trame_recue, crc_valide)
+            if recepteur.dernier_num_seq != avant:
                 print(f"[{get_timestamp()}]   ✅ Recepteur accepte trame #{num_seq} (retransmission)")
-                recepteur.trames_recues.append((num_seq, data))
-                recepteur.dernier_num_seq = num_seq
-                recepteur.trames_acceptees += 1
+                if instruments is not None:
+                    instruments.livraison.observer(time.time() - premier_envoi[num_seq])
 
                 # Envoyer ACK
-                ack = Trame(num_seq, b'', TYPE_ACK)
-                ack_bytes = ack.serialiser()
+                ack_bytes = trame_ack(num_seq).serialiser(fec, tramage, fcs)
                 print(f"[{get_timestamp()}]   📨 Recepteur envoie ACK #{num_seq} (retransmission)")
                 ack_transmis = canal.transmettre(ack_bytes)
-                recepteur.acks_envoyes += 1
                 time.sleep(delaiMax)
 
                 if ack_transmis is not None:
                     print(f"[{get_timestamp()}]   ✅ Emetteur recoit ACK #{num_seq}")
                     emetteur.acks_recus += 1
+                    lire_fenetre(ack_transmis, num_seq)
+                    if instruments is not None:
+                        instruments.rtt.observer(time.time() - send_times[num_seq])
                     # ACK cumulatif: on marque toutes les trames <= num_seq comme acquittées
                     for k in range(base_emetteur, num_seq + 1):
                         acks_recus_cette_fenetre.add(k)
@@ -304,18 +935,16 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
             else:
                 # Duplicata/hors ordre → ACK du dernier reçu (utile pour débloquer la base)
                 print(
-                    f"[{get_timestamp()}]   ⚠️  Trame #{num_seq} hors ordre (retransmission), recepteur attend #{recepteur.dernier_num_seq + 1}")
-                recepteur.trames_rejetees += 1
-                if recepteur.dernier_num_seq >= 0:
-                    ack_dernier = Trame(recepteur.dernier_num_seq, b'', TYPE_ACK)
-                    ack_dernier_bytes = ack_dernier.serialiser()
+                    f"[{get_timestamp()}]   ⚠️  Trame #{num_seq} hors ordre ou refusee (retransmission), recepteur attend #{recepteur.dernier_num_seq + 1}")
+                if ack_num is not None:
+                    ack_dernier_bytes = trame_ack(ack_num).serialiser(fec, tramage, fcs)
                     print(f"[{get_timestamp()}]   📨 Recepteur renvoie ACK duplicata #{recepteur.dernier_num_seq}")
                     ack_dernier_transmis = canal.transmettre(ack_dernier_bytes)
-                    recepteur.acks_envoyes += 1
                     if ack_dernier_transmis is not None:
                         dernier = recepteur.dernier_num_seq
                         print(f"[{get_timestamp()}]   ✅ Emetteur recoit ACK duplicata #{dernier}")
                         emetteur.acks_recus += 1
+                        lire_fenetre(ack_dernier_transmis, dernier)
                         # ACK cumulatif: tout jusqu'à 'dernier' est considéré acquitté
                         for k in range(base_emetteur, dernier + 1):
                             acks_buffer_global.add(k)
@@ -324,9 +953,19 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
     # ========================================================================
     # BOUCLE PRINCIPALE
     # ========================================================================
-    while base_emetteur < nb_trames_total:
-        fin_fenetre = min(base_emetteur + taille_fenetre, nb_trames_total)
+    while abandon is None:
+        if capacite is not None:
+            # Le consommateur lit le tampon; le recepteur annonce la place liberee (RR)
+            mise_a_jour = recepteur.consommer()
+            if mise_a_jour is not None:
+                annoncer(mise_a_jour)
+        charger(base_emetteur + taille_fenetre)
+        if base_emetteur >= nb_trames_lues:
+            break  # tout le fichier est acquitte
+        fin_fenetre = min(base_emetteur + taille_fenetre, nb_trames_lues)
         print(f"[{get_timestamp()}] 📊 Fenetre emetteur: [{base_emetteur}, {fin_fenetre-1}], Recepteur attend: #{recepteur.dernier_num_seq + 1}")
+        if instruments is not None:
+            instruments.en_vol.set(sum(send_times[num] is not None for num in range(base_emetteur, fin_fenetre)))
         
         # On garde un set local pour debug mais la progression sera faite
         # en se basant sur acks_buffer_global (persistant).
@@ -334,10 +973,12 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
         
         # Si le timer pour la base_emetteur est actif et a expiré, on détecte timeout
         timeout_detecte = False
-        if base_emetteur < nb_trames_total and send_times[base_emetteur] is not None:
+        if send_times[base_emetteur] is not None:
             elapsed = time.time() - send_times[base_emetteur]
             if elapsed > timeout:
                 timeout_detecte = True
+                if instruments is not None:
+                    instruments.timeouts.inc()
                 print(f"[{get_timestamp()}] ⏱️  TIMEOUT DETECTE pour base={base_emetteur} (elapsed={elapsed:.3f}s > timeout={timeout:.3f}s)")
         
         # Si timeout déjà détecté avant d'envoyer la fenêtre, on n'envoie rien de nouveau :
@@ -350,24 +991,24 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
             # Sinon on envoie chaque trame de la fenêtre (ou retransmet individuellement si nécessaire)
             for num_seq in range(base_emetteur, fin_fenetre):
                 
+                # Fenetre annoncee par le recepteur (controle de flux): on attend un RR
+                if not emetteur.peut_envoyer(num_seq, base_emetteur):
+                    break
+
                 # Verifier tentatives
                 if tentatives[num_seq] >= max_tentatives:
-                    print(f"[{get_timestamp()}] ❌ ABANDON trame #{num_seq}")
-                    # On considère l'abandon comme si on laissait base avancer (perte définitive)
-                    # (selon ton comportement précédent)
-                    base_emetteur += 1
-                    # Nettoyage éventuel du send_times
-                    send_times[num_seq] = None
-                    continue
+                    # On n'avance pas la base: le recepteur livrerait un fichier troue.
+                    # Le transfert s'arrete (voir reprise.py pour le reprendre plus tard)
+                    print(f"[{get_timestamp()}] ❌ ABANDON trame #{num_seq}: transfert interrompu")
+                    abandon = num_seq
+                    break
                 
                 # Si on a déjà envoyé la trame et qu'on attend l'ACK,
                 # on n'a pas besoin de la renvoyer sauf si c'est une retransmission explicitement.
                 # Dans cette version minimale, on transmet la trame chaque itération de fenêtre
                 # *si* send_times[num_seq] is None (jamais envoyée) OU si on est en mode retransmission.
                 
-                data = trames_data[num_seq]
-                trame = Trame(num_seq, data, TYPE_DATA)
-                trame_bytes = trame.serialiser()
+                trame_bytes = encoder_donnees(num_seq)
                 
                 # Afficher
                 if tentatives[num_seq] > 0:
@@ -379,6 +1020,8 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
                 
                 # Enregistrer l'instant d'envoi (toujours mettre à jour à l'envoi/retransmission)
                 send_times[num_seq] = time.time()
+                if instruments is not None and premier_envoi[num_seq] is None:
+                    premier_envoi[num_seq] = send_times[num_seq]
                 
                 tentatives[num_seq] += 1
                 
@@ -395,7 +1038,7 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
                 # ============================================================
                 # PHASE 2: RECEPTEUR TRAITE LA TRAME
                 # ============================================================
-                trame_recue, crc_valide = Trame.deserialiser(trame_transmise)
+                trame_recue, crc_valide = Trame.deserialiser(trame_transmise, fec, copier=False, tramage=tramage, fcs=fcs)
                 
                 if not crc_valide:
                     print(f"[{get_timestamp()}]   ❌ Trame CORROMPUE (CRC)")
@@ -403,24 +1046,26 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
                     # Recepteur ne fait rien, pas d'ACK; on sort pour attendre timeout
                     break
                 
-                # Verifier ordre (Go-Back-N strict)
-                if trame_recue.num_seq == recepteur.dernier_num_seq + 1:
+                if trame_recue.bits_corriges > 0:
+                    print(f"[{get_timestamp()}]   🩹 FEC: {trame_recue.bits_corriges} bit(s) corrige(s)")
+
+                # Verifier ordre (Go-Back-N strict, et place dans le tampon): logique du Recepteur
+                avant = recepteur.dernier_num_seq
+                ack_num = recepteur.traiter_trame(trame_recue, crc_valide)
+                if recepteur.dernier_num_seq != avant:
                     # Trame acceptee
                     print(f"[{get_timestamp()}]   ✅ Recepteur accepte trame #{num_seq}")
-                    recepteur.trames_recues.append((num_seq, data))
-                    recepteur.dernier_num_seq = num_seq
-                    recepteur.trames_acceptees += 1
+                    if instruments is not None:
+                        instruments.livraison.observer(time.time() - premier_envoi[num_seq])
                     
                     # Envoyer ACK
-                    ack = Trame(num_seq, b'', TYPE_ACK)
-                    ack_bytes = ack.serialiser()
+                    ack_bytes = trame_ack(num_seq).serialiser(fec, tramage, fcs)
                     print(f"[{get_timestamp()}]   📨 Recepteur envoie ACK #{num_seq}")
                     
                     # Transmettre l'ACK via le canal — on récupère le résultat
                     ack_transmis = canal.transmettre(ack_bytes)
-                    recepteur.acks_envoyes += 1
                     # petite attente simulée côté récepteur
-                    time.sleep(0.01)
+                    time.sleep(PAUSE_ACK)
                     
                     # ============================================================
                     # PHASE 3: EMETTEUR RECOIT (ou pas) L'ACK
@@ -429,6 +1074,9 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
                         # ACK arrive a l'emetteur : on le stocke dans le buffer global
                         print(f"[{get_timestamp()}]   ✅ Emetteur recoit ACK #{num_seq}")
                         emetteur.acks_recus += 1
+                        lire_fenetre(ack_transmis, num_seq)
+                        if instruments is not None:
+                            instruments.rtt.observer(time.time() - send_times[num_seq])
                         for k in range(base_emetteur, num_seq + 1):
                             acks_recus_cette_fenetre.add(k)
                             acks_buffer_global.add(k)
@@ -442,23 +1090,21 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
                         break
                 
                 else:
-                    # Trame hors ordre (duplicata ou saut)
-                    print(f"[{get_timestamp()}]   ⚠️  Trame #{num_seq} hors ordre (recepteur attend #{recepteur.dernier_num_seq + 1})")
-                    recepteur.trames_rejetees += 1
+                    # Trame hors ordre (duplicata ou saut), ou refusee (tampon plein)
+                    print(f"[{get_timestamp()}]   ⚠️  Trame #{num_seq} hors ordre ou refusee (recepteur attend #{recepteur.dernier_num_seq + 1})")
                     
                     # Go-Back-N: Recepteur renvoie ACK du dernier recu (si existant)
-                    if recepteur.dernier_num_seq >= 0:
-                        ack_dernier = Trame(recepteur.dernier_num_seq, b'', TYPE_ACK)
-                        ack_dernier_bytes = ack_dernier.serialiser()
+                    if ack_num is not None:
+                        ack_dernier_bytes = trame_ack(ack_num).serialiser(fec, tramage, fcs)
                         print(f"[{get_timestamp()}]   📨 Recepteur renvoie ACK #{recepteur.dernier_num_seq} (duplicata)")
                         # ici on récupère aussi la livraison de l'ACK duplicata
                         ack_dernier_transmis = canal.transmettre(ack_dernier_bytes)
-                        recepteur.acks_envoyes += 1
                         # si l'ACK duplicata parvient, le conserver dans le buffer global
                         if ack_dernier_transmis is not None:
                             dernier = recepteur.dernier_num_seq
                             print(f"[{get_timestamp()}]   ✅ Emetteur recoit ACK duplicata #{dernier}")
                             emetteur.acks_recus += 1
+                            lire_fenetre(ack_dernier_transmis, dernier)
                             # ACK cumulatif: tout jusqu'à 'dernier' est considéré acquitté
                             for k in range(base_emetteur, dernier + 1):
                                 acks_buffer_global.add(k)
@@ -466,6 +1112,9 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
                     
                     # Arreter l'envoi de cette fenetre (on sort pour traiter acks / timeout)
                     break
+
+        if abandon is not None:
+            break
         
         # ----------------------------------------------------------------
         # AVANCER BASE EMETTEUR en se basant sur acks_buffer_global
@@ -478,7 +1127,19 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
         
         # Nettoyer le buffer
         acks_buffer_global = {a for a in acks_buffer_global if a >= base_emetteur}
+        liberer(base_emetteur - 1)  # la derniere trame acquittee sert de sonde (controle de flux)
         
+        # Blocage par le recepteur: la fenetre d'emission a de la place, pas la fenetre annoncee
+        # (un episode compte une fois, comme dans controle_flux.py)
+        derniere = min(base_emetteur + taille_fenetre, nb_trames_lues) - 1
+        bloque = base_emetteur <= derniere and not emetteur.peut_envoyer(derniere, base_emetteur)
+        if bloque and debut_blocage is None:
+            emetteur.blocages_flux += 1
+            debut_blocage = time.time()
+        elif not bloque and debut_blocage is not None:
+            temps_bloque += time.time() - debut_blocage
+            debut_blocage = None
+
         if base_emetteur > ancien_base:
             print(f"[{get_timestamp()}] 📊 Base emetteur avance: {ancien_base} → {base_emetteur}\n")
             # Si la base a avancé, on continue (les send_times pour les trames acquittées sont None)
@@ -486,16 +1147,22 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
         else:
             # Aucune progression : vérifier si timeout réel s'est produit pour la base
             timeout_actuel = False
-            if base_emetteur < nb_trames_total and send_times[base_emetteur] is not None:
+            if base_emetteur < nb_trames_lues and send_times[base_emetteur] is not None:
                 elapsed_base = time.time() - send_times[base_emetteur]
                 if elapsed_base > timeout:
                     timeout_actuel = True
+                    if instruments is not None:
+                        instruments.timeouts.inc()
                     print(f"[{get_timestamp()}] ⏱️  TIMEOUT: Aucun ACK utile recu pour base={base_emetteur} (elapsed={elapsed_base:.3f}s > timeout={timeout:.3f}s). GO-BACK-N depuis base={base_emetteur}\n")
             
-            if not timeout_actuel:
+            if (not timeout_actuel and not emetteur.peut_envoyer(base_emetteur, base_emetteur)
+                    and time.time() - derniere_annonce > timeout):
+                sonder()
+                derniere_annonce = time.time()
+            elif not timeout_actuel:
                 # Aucun ACK utile reçu et pas (encore) de timeout : attente courte
                 # On laisse un petit délai pour simuler l'attente de réponses asynchrones
-                time.sleep(0.01)
+                time.sleep(PAUSE_BOUCLE)
             else:
                 # Timeout détecté → retransmission immédiate depuis la base
                 retransmettre_depuis_base()
@@ -503,13 +1170,23 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
                 time.sleep(timeout * 0.1)
         
         # Petit sleep pour laisser "respirer" la simulation
-        time.sleep(0.01)
+        time.sleep(PAUSE_BOUCLE)
     
     # ========================================================================
     # FIN
     # ========================================================================
     
+    if debut_blocage is not None:
+        temps_bloque += time.time() - debut_blocage
+    if capacite is not None:
+        # L'application termine de lire le tampon
+        while recepteur.tampon:
+            time.sleep(0.001)
+            recepteur.consommer()
     duree = time.time() - temps_debut
+    fichier.close()
+    if instruments is not None:
+        instruments.en_vol.set(0)
     
     print("\n" + "="*70)
     print("RESULTATS - EMETTEUR")
@@ -518,6 +1195,8 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
     print(f"Frames retransmises : {emetteur.trames_retransmises}")
     print(f"ACK recus           : {emetteur.acks_recus}")
     print(f"Duree totale        : {duree:.2f} s")
+    if algo != COMPRESSION_AUCUNE:
+        print(f"Taille compressee   : {octets_envoyes} octets lus ({octets_envoyes / max(taille_fichier, 1) * 100:.1f}%)")
     print("="*70)
     
     print("\n" + "="*70)
@@ -525,23 +1204,42 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
     print("="*70)
     print(f"Trames acceptees : {recepteur.trames_acceptees}")
     print(f"Trames rejetees  : {recepteur.trames_rejetees}")
+    print(f"Trames corrigees : {recepteur.trames_corrigees}")
     print(f"ACKs envoyes     : {recepteur.acks_envoyes}")
+    if capacite is not None:
+        print(f"RNR envoyes      : {recepteur.rnr_envoyes}")
+        print(f"Trames refusees  : {recepteur.trames_refusees} (tampon plein)")
+        print(f"Tampon max       : {recepteur.taille_max_tampon}/{capacite} trames")
+        print(f"Envois bloques   : {emetteur.blocages_flux} fois, {temps_bloque:.2f} s (fenetre annoncee)")
     print("="*70)
     
     message_recu = recepteur.recomposer_message()
+
+    # Comparaison avec le fichier d'origine, relu par blocs
+    identiques = len(message_recu) == taille_fichier
+    with open(fichier_path, 'rb') as f:
+        position = 0
+        while identiques:
+            bloc = f.read(TAILLE_BLOC_LECTURE)
+            if not bloc:
+                break
+            identiques = message_recu[position:position + len(bloc)] == bloc
+            position += len(bloc)
     
     print("\n" + "="*70)
     print("VERIFICATION")
     print("="*70)
-    print(f"Taille originale : {len(message)} octets")
+    print(f"Taille originale : {taille_fichier} octets")
     print(f"Taille recue     : {len(message_recu)} octets")
-    print(f"Identiques       : {message == message_recu}")
+    print(f"Identiques       : {identiques}")
     
-    if message == message_recu:
+    if identiques:
         print("✅ SUCCES: Transmission complete!")
     else:
         print("❌ ECHEC: Message incomplet")
-        print(f"Trames recues: {len(recepteur.trames_recues)}/{nb_trames_total}")
+        if abandon is not None:
+            print(f"Transfert interrompu a la trame #{abandon}")
+        print(f"Trames recues: {len(recepteur.trames_recues)}/{nb_trames_total if nb_trames_total is not None else '?'}")
     
     print("="*70 + "\n")
     
@@ -554,11 +1252,98 @@ def simulation_gobackn(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0
         'retransmises': emetteur.trames_retransmises,
         'acks': emetteur.acks_recus,
         'duree': duree,
-        'succes': message == message_recu,
-        'taux_retransmission': taux
+        'succes': identiques,
+        'taux_retransmission': taux,
+        'corrigees': recepteur.trames_corrigees,
+        'rejetees': recepteur.trames_rejetees,
+        'refusees': recepteur.trames_refusees if capacite is not None else 0,
+        'blocages': emetteur.blocages_flux,
+        'temps_bloque': temps_bloque,
+        'abandon': abandon
     }
 
 
+def simulation_flux(fichier_path, probErreur=0.05, probPerte=0.10, delaiMax=0.02, timeout=TIMEOUT,
+                    taille_fenetre=5, fec_r=None, tramage=TRAMAGE_BITS, fcs=FCS_CRC16):
+    # Go-Back-N par rafales: toute la fenetre part dans un seul flux HDLC continu
+    # (flags partages, Emetteur.envoyer_flux); le recepteur decoupe le flux
+    # (Trame.deserialiser_flux), accepte les trames dans l'ordre et renvoie un seul
+    # ACK cumulatif. Une trame perdue ou corrompue n'abime pas ses voisines, mais
+    # Go-Back-N rejette celles qui la suivent: la rafale suivante repart du trou.
+
+    print("\n" + "="*70)
+    print("SIMULATION GO-BACK-N PAR RAFALES (FLUX CONTINU)")
+    print("="*70)
+    print(f"Fichier: {fichier_path}, fenetre: {taille_fenetre}, tramage: {tramage}, FCS: CRC-{fcs}")
+    print("="*70 + "\n")
+
+    fec = CodeHamming(fec_r) if fec_r is not None else None
+    canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre, tramage=tramage, fcs=fcs)
+    recepteur = Recepteur(canal)
+
+    with open(fichier_path, 'rb') as f:
+        message = f.read()
+    trames_data = emetteur._segmenter(message)
+
+    base = 0
+    deja_envoyees = 0  # trames [0, deja_envoyees) parties au moins une fois
+    rafales = 0
+    timeouts = 0
+    temps_debut = time.time()
+    while base < len(trames_data):
+        fin = min(base + taille_fenetre, len(trames_data))
+        trames = [Trame(num % 256, trames_data[num]) for num in range(base, fin)]
+        rafales += 1
+        emetteur.trames_retransmises += max(0, min(fin, deja_envoyees) - base)
+        deja_envoyees = max(deja_envoyees, fin)
+        flux_recu = emetteur.envoyer_flux(trames, fec)
+
+        # Recepteur: toutes les trames du flux, puis un ACK cumulatif pour la rafale
+        ack_num = None
+        if flux_recu is not None:
+            for trame_recue, crc_valide in Trame.deserialiser_flux(flux_recu, fec, copier=False,
+                                                                   tramage=tramage, fcs=fcs):
+                num = recepteur.traiter_trame(trame_recue, crc_valide)
+                if num is not None:
+                    ack_num = num
+
+        ack_recu = None
+        if ack_num is not None:
+            ack_transmis = canal.transmettre(Trame(ack_num % 256, b'', TYPE_ACK).serialiser(fec, tramage, fcs))
+            if ack_transmis is not None:
+                ack_recu, crc_valide = Trame.deserialiser(ack_transmis, fec, tramage=tramage, fcs=fcs)
+                if not crc_valide:
+                    ack_recu = None
+
+        if ack_recu is None:
+            timeouts += 1
+            print(f"[{get_timestamp()}] ⏱️  Rafale [{base}, {fin - 1}]: pas d'ACK, TIMEOUT")
+            time.sleep(timeout)
+            continue
+
+        emetteur.acks_recus += 1
+        print(f"[{get_timestamp()}] 📨 Rafale [{base}, {fin - 1}]: ACK #{ack_recu.num_seq}")
+        ecart = (ack_recu.num_seq - base) % 256
+        if ecart < fin - base:
+            base = base + ecart + 1
+
+    duree = time.time() - temps_debut
+    message_recu = recepteur.recomposer_message()
+    print(f"\nRafales: {rafales}, timeouts: {timeouts}, trames envoyees: {emetteur.trames_envoyees} "
+          f"({emetteur.trames_retransmises} retransmises) pour {len(trames_data)} trames, duree: {duree:.2f} s")
+    print(f"Identiques: {message == message_recu}")
+    canal.afficher_statistiques()
+
+    return {
+        'rafales': rafales,
+        'envoyees': emetteur.trames_envoyees,
+        'retransmises': emetteur.trames_retransmises,
+        'timeouts': timeouts,
+        'duree': duree,
+        'succes': message == message_recu
+    }
+
 
 if __name__ == "__main__":
     # Commenter/Decommenter pour un test spécifique
@@ -765,6 +1550,39 @@ if __name__ == "__main__":
     print("-" * 70)
     fichier_message = '../message.txt'
 
+    # python3 protocole.py --auto : fenetre, timeout et taille de trame choisis par le modele
+    # du simulateur (modele.recommander_simulation) pour un taux d'erreur binaire donne,
+    # puis duree et debit utile prevus vs mesures
+    if '--auto' in sys.argv:
+        from modele import recommander_simulation
+        ber, probPerte, delaiMax = 1e-5, 0.10, 0.020
+        with open(fichier_message, 'rb') as f:
+            taille_message = len(f.read())
+        recommandation = recommander_simulation(taille_message, probPerte, delaiMax, ber)
+        print(f"\nAuto (ber={ber:g}): fenetre={recommandation['taille_fenetre']}, "
+              f"timeout={recommandation['timeout']*1000:.0f} ms, "
+              f"trames de {recommandation['taille_trame']} octets "
+              f"(erreur par trame {recommandation['probErreur']:.3f}, "
+              f"risque d'abandon {recommandation['risque_abandon']:.3f})")
+
+        resultat = simulation_gobackn(fichier_message, probErreur=recommandation['probErreur'],
+                                      probPerte=probPerte, delaiMax=delaiMax,
+                                      timeout=recommandation['timeout'],
+                                      taille_fenetre=recommandation['taille_fenetre'],
+                                      taille_trame=recommandation['taille_trame'])
+        ecart = resultat['duree'] / recommandation['duree'] - 1
+        print(f"Debit utile prevu : {recommandation['debit_utile']/1000:.1f} Ko/s ({recommandation['duree']:.2f} s)")
+        print(f"Debit utile mesure: {taille_message/resultat['duree']/1000:.1f} Ko/s ({resultat['duree']:.2f} s, "
+              f"ecart {ecart:+.0%})")
+        sys.exit()
+
+    # python3 protocole.py --flux : chaque fenetre part dans un seul flux continu (simulation_flux)
+    if '--flux' in sys.argv:
+        simulation_flux(fichier_message, probErreur=0.05, probPerte=0.10, delaiMax=0.010, timeout=0.050)
+        simulation_flux(fichier_message, probErreur=0.05, probPerte=0.10, delaiMax=0.010, timeout=0.050,
+                        tramage=TRAMAGE_OCTETS, fcs=FCS_CRC32)
+        sys.exit()
+
     # Cas 1 : delaiMax = 50 ms (< timeout)
     print("\nCas 1: delaiMax = 0.050 s (< timeout, aucune retransmission attendue)")
     simulation_gobackn(fichier_message, probErreur=0.05, probPerte=0.10,
@@ -779,3 +1597,8 @@ if __name__ == "__main__":
     # print("\nCas 3: delaiMax = 0.300 s (> timeout, nombreuses retransmissions attendues)")
     # simulation_gobackn(fichier_message, probErreur=0.05, probPerte=0.10,
     #                    delaiMax=0.300, timeout=0.200)
+
+    # # Cas 4 : lien propre et rapide, trames geantes (CRC-32, tramage octet)
+    # print("\nCas 4: trames de 4000 octets avec CRC-32 et tramage octet")
+    # simulation_gobackn(fichier_message, probErreur=0.01, probPerte=0.01, delaiMax=0.010, timeout=0.200,
+    #                    tramage=TRAMAGE_OCTETS, fcs=FCS_CRC32, taille_trame=4000)
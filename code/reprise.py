@@ -0,0 +1,352 @@
+import os
+import time
+import zlib
+import struct
+from canal import Canal
+from compression import TAILLE_BLOC_LECTURE
+from protocole import Trame, Emetteur, Recepteur, TYPE_REPRISE, TAILLE_MAX_DATA, TIMEOUT, get_timestamp, \
+    TransfertGoBackN
+
+# Transferts reprenables
+# Le recepteur ecrit chaque trame livree a sa place dans un fichier partiel (<sortie>.part)
+# et garde un bitmap des trames recues, sauvegarde regulierement dans <sortie>.etat.
+# Si le transfert s'interrompt (abandon apres max_tentatives, arret du processus),
+# une nouvelle session commence par une poignee de main:
+#   emetteur  -> TYPE_REPRISE [nb_trames(4B)] [taille_trame(2B)] [taille_fichier(8B)] [crc32 fichier(4B)]
+#   recepteur -> TYPE_REPRISE [haut(4B)] [debut(4B) fin(4B)] ...  (plages de trames manquantes)
+# 'haut' est le nombre de trames recues sans trou depuis le debut. L'emetteur n'envoie
+# que les trames des plages annoncees; la k-ieme trame de la session correspond a la
+# k-ieme trame manquante, ce que les deux cotes calculent a partir des memes plages.
+# Quand toutes les trames sont recues, le recepteur compare le crc32 du fichier partiel a
+# celui de la demande. En cas de difference (ex: fichier partiel d'une session precedente
+# modifie ou abime), le bitmap est efface et le transfert reprend depuis le debut.
+
+DEMANDE = struct.Struct('!IHQI')
+ENTETE_ETAT = struct.Struct('!4sIHQI')  # magique, nb_trames, taille_trame, taille_fichier, crc32 fichier
+MAGIQUE = b'RPR1'
+PLAGE = struct.Struct('!II')
+HAUT = struct.Struct('!I')
+INTERVALLE_SAUVEGARDE = 64  # trames recues entre deux sauvegardes du bitmap
+MAX_PLAGES = (TAILLE_MAX_DATA - HAUT.size) // PLAGE.size
+
+
+class EtatReception:
+    # Etat persistant du recepteur: fichier partiel + bitmap des trames recues
+
+    def __init__(self, chemin_sortie, nb_trames, taille_trame, taille_fichier, crc_fichier,
+                 intervalle=INTERVALLE_SAUVEGARDE):
+        self.chemin_sortie = chemin_sortie
+        self.chemin_partiel = chemin_sortie + '.part'
+        self.chemin_etat = chemin_sortie + '.etat'
+        self.entete = ENTETE_ETAT.pack(MAGIQUE, nb_trames, taille_trame, taille_fichier, crc_fichier)
+        self.nb_trames = nb_trames
+        self.taille_trame = taille_trame
+        self.taille_fichier = taille_fichier
+        self.crc_fichier = crc_fichier
+        self.intervalle = intervalle
+        self.reprise = False  # etat repris d'une session precedente
+
+        self.bitmap = bytearray((nb_trames + 7) // 8)
+        self.nb_recues = 0
+        self.non_sauvegardees = 0
+
+        # Reprendre l'etat sauvegarde s'il correspond au meme fichier
+        if os.path.exists(self.chemin_etat) and os.path.exists(self.chemin_partiel):
+            with open(self.chemin_etat, 'rb') as f:
+                contenu = f.read()
+            if contenu[:ENTETE_ETAT.size] == self.entete and len(contenu) == ENTETE_ETAT.size + len(self.bitmap):
+                self.bitmap[:] = contenu[ENTETE_ETAT.size:]
+                self.nb_recues = sum(bin(octet).count('1') for octet in self.bitmap)
+                self.fichier = open(self.chemin_partiel, 'r+b')
+                self.reprise = True
+                return
+
+        # Sinon: nouveau transfert
+        self.fichier = open(self.chemin_partiel, 'w+b')
+        self.sauvegarder()
+
+    def recue(self, index):
+        return (self.bitmap[index >> 3] >> (index & 7)) & 1 == 1
+
+    def marquer(self, index, data):
+        # Ecrit la trame a sa place dans le fichier partiel et la note dans le bitmap
+        if self.recue(index):
+            return
+        self.fichier.seek(index * self.taille_trame)
+        self.fichier.write(data)
+        self.bitmap[index >> 3] |= 1 << (index & 7)
+        self.nb_recues += 1
+        self.non_sauvegardees += 1
+        if self.non_sauvegardees >= self.intervalle:
+            self.sauvegarder()
+
+    def sauvegarder(self):
+        # Les donnees sont ecrites sur disque avant le bitmap: le bitmap sauvegarde
+        # ne designe jamais une trame absente du fichier partiel
+        self.fichier.flush()
+        os.fsync(self.fichier.fileno())
+        temporaire = self.chemin_etat + '.tmp'
+        with open(temporaire, 'wb') as f:
+            f.write(self.entete + self.bitmap)
+        os.replace(temporaire, self.chemin_etat)
+        self.non_sauvegardees = 0
+
+    def haut(self):
+        # Nombre de trames recues sans trou depuis le debut
+        index = 0
+        while index < self.nb_trames and self.bitmap[index >> 3] == 0xFF and index + 8 <= self.nb_trames:
+            index += 8
+        while index < self.nb_trames and self.recue(index):
+            index += 1
+        return index
+
+    def plages_manquantes(self, max_plages=MAX_PLAGES):
+        # Plages [debut, fin) de trames manquantes; au-dela de max_plages, la derniere
+        # plage s'etend jusqu'a la fin (quelques trames deja recues seront renvoyees)
+        plages = []
+        index = self.haut()
+        while index < self.nb_trames:
+            if self.recue(index):
+                index += 1
+                continue
+            debut = index
+            while index < self.nb_trames and not self.recue(index):
+                index += 1
+            if len(plages) == max_plages - 1:
+                plages.append((debut, self.nb_trames))
+                break
+            plages.append((debut, index))
+        return plages
+
+    def complet(self):
+        return self.nb_recues == self.nb_trames
+
+    def verifier(self):
+        # crc32 du fichier partiel (relu par blocs) == crc32 annonce par l'emetteur
+        self.fichier.flush()
+        self.fichier.seek(0)
+        crc = 0
+        restant = self.taille_fichier
+        while restant > 0:
+            bloc = self.fichier.read(min(TAILLE_BLOC_LECTURE, restant))
+            if not bloc:
+                break
+            crc = zlib.crc32(bloc, crc)
+            restant -= len(bloc)
+        return restant == 0 and crc == self.crc_fichier
+
+    def recommencer(self):
+        # Fichier partiel invalide: le bitmap est efface, tout sera renvoye
+        self.bitmap = bytearray(len(self.bitmap))
+        self.nb_recues = 0
+        self.fichier.truncate(0)
+        self.sauvegarder()
+
+    def terminer(self):
+        # Transfert complet: le fichier partiel devient le fichier de sortie
+        self.fichier.truncate(self.taille_fichier)
+        self.fichier.close()
+        os.replace(self.chemin_partiel, self.chemin_sortie)
+        os.remove(self.chemin_etat)
+
+    def fermer(self):
+        self.fichier.close()
+
+
+def plan_depuis_plages(plages):
+    # Liste des indices de trames a transferer pendant la session
+    return [index for debut, fin in plages for index in range(debut, fin)]
+
+
+class RecepteurReprise(Recepteur):
+    # Recepteur Go-Back-N qui ecrit chaque trame livree dans l'etat persistant
+
+    def __init__(self, canal, etat, plan):
+        super().__init__(canal)
+        self.etat = etat
+        self.plan = plan  # k-ieme trame de la session -> indice dans le fichier
+
+    def traiter_trame(self, trame, crc_valide):
+        avant = self.dernier_num_seq
+        ack = super().traiter_trame(trame, crc_valide)
+        if self.dernier_num_seq != avant:
+            # Trame livree: directement sur disque, rien n'est garde en memoire
+            k, data = self.trames_recues.pop()
+            self.etat.marquer(self.plan[k], data)
+        return ack
+
+
+def simulation_reprise(fichier_path, sortie_path, probErreur=0.05, probPerte=0.10, delaiMax=0.02,
+                       timeout=TIMEOUT, taille_fenetre=5, max_tentatives=5,
+                       intervalle=INTERVALLE_SAUVEGARDE, arret_apres=None):
+    # Une session de transfert reprenable (a relancer tant que 'succes' est faux)
+    # - arret_apres: simule un arret brutal du processus apres ce nombre de trames envoyees
+    #   (sans sauvegarde finale du bitmap)
+
+    print("\n" + "="*70)
+    print("SIMULATION TRANSFERT REPRENABLE")
+    print("="*70)
+    print(f"Fichier: {fichier_path} -> {sortie_path}")
+    print(f"Parametres: erreur={probErreur}, perte={probPerte}, delai={delaiMax*1000}ms, "
+          f"max_tentatives={max_tentatives}")
+    print("="*70 + "\n")
+
+    canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre)
+
+    # Le fichier n'est jamais charge en entier: crc32 calcule par blocs, puis chaque
+    # trame est lue a sa position quand elle part
+    taille_fichier = os.path.getsize(fichier_path)
+    nb_trames_total = (taille_fichier + TAILLE_MAX_DATA - 1) // TAILLE_MAX_DATA
+    crc_fichier = 0
+    with open(fichier_path, 'rb') as f:
+        while True:
+            bloc = f.read(TAILLE_BLOC_LECTURE)
+            if not bloc:
+                break
+            crc_fichier = zlib.crc32(bloc, crc_fichier)
+    demande = DEMANDE.pack(nb_trames_total, TAILLE_MAX_DATA, taille_fichier, crc_fichier)
+    fichier = open(fichier_path, 'rb')
+    temps_debut = time.time()
+
+    def lire_trame(index):
+        # Les trames manquantes peuvent etre dispersees: lecture a la position de la trame
+        fichier.seek(index * TAILLE_MAX_DATA)
+        return fichier.read(TAILLE_MAX_DATA)
+
+    def resultat(succes, plan, envoyees, raison=None, crc_invalide=False):
+        fichier.close()
+        duree = time.time() - temps_debut
+        if raison is not None:
+            print(f"[{get_timestamp()}] ❌ Session interrompue: {raison}")
+        print("\n" + "="*70)
+        print("RESULTATS DE LA SESSION")
+        print("="*70)
+        print(f"Trames a envoyer    : {len(plan)}/{nb_trames_total}")
+        print(f"Trames envoyees     : {envoyees} (+{emetteur.trames_retransmises} retransmissions)")
+        print(f"Duree               : {duree:.2f} s")
+        print(f"Transfert complet   : {succes}")
+        print("="*70 + "\n")
+        return {
+            'succes': succes,
+            'plan': len(plan),
+            'envoyees': envoyees,
+            'retransmises': emetteur.trames_retransmises,
+            'duree': duree,
+            'crc_invalide': crc_invalide
+        }
+
+    # ========================================================================
+    # POIGNEE DE MAIN: l'emetteur demande l'etat du recepteur
+    # ========================================================================
+    etat = None
+    plages = None
+    for tentative in range(max_tentatives):
+        demande_transmise = canal.transmettre(Trame(0, demande, TYPE_REPRISE).serialiser())
+        if demande_transmise is not None:
+            trame_demande, crc_valide = Trame.deserialiser(demande_transmise)
+            if crc_valide and trame_demande.type_trame == TYPE_REPRISE:
+                # Recepteur: ouvre (ou reprend) l'etat correspondant a ce fichier
+                if etat is None:
+                    nb, taille_trame, taille_fichier, crc_fichier = DEMANDE.unpack(trame_demande.data)
+                    etat = EtatReception(sortie_path, nb, taille_trame, taille_fichier, crc_fichier, intervalle)
+                    plages_recepteur = etat.plages_manquantes()
+                reponse = HAUT.pack(etat.haut()) + b''.join(PLAGE.pack(d, f) for d, f in plages_recepteur)
+                reponse_transmise = canal.transmettre(Trame(0, reponse, TYPE_REPRISE).serialiser())
+                if reponse_transmise is not None:
+                    trame_reponse, crc_valide = Trame.deserialiser(reponse_transmise)
+                    if crc_valide and trame_reponse.type_trame == TYPE_REPRISE:
+                        haut = HAUT.unpack_from(trame_reponse.data)[0]
+                        plages = [PLAGE.unpack_from(trame_reponse.data, HAUT.size + i * PLAGE.size)
+                                  for i in range((len(trame_reponse.data) - HAUT.size) // PLAGE.size)]
+                        break
+        time.sleep(timeout)
+
+    if plages is None:
+        if etat is not None:
+            etat.fermer()
+        return resultat(False, [], 0, "pas de reponse a la demande de reprise")
+
+    plan = plan_depuis_plages(plages)
+    print(f"[{get_timestamp()}] 🤝 Reprise: {haut} trames deja recues sans trou, "
+          f"{len(plan)} trames a envoyer en {len(plages)} plage(s)")
+
+    # ========================================================================
+    # TRANSFERT GO-BACK-N des seules trames manquantes
+    # ========================================================================
+    recepteur = RecepteurReprise(canal, etat, plan_depuis_plages(plages_recepteur))
+    arret = None
+
+    def arreter():
+        # Arret brutal: seul le dernier bitmap sauvegarde survit
+        nonlocal arret
+        if arret_apres is not None and emetteur.trames_envoyees >= arret_apres:
+            arret = f"arret du processus apres {emetteur.trames_envoyees} trames"
+        return arret
+
+    # Les trames sont lues a leur position au moment de partir
+    transfert = TransfertGoBackN(emetteur, recepteur, (lire_trame(index) for index in plan),
+                                 arreter=arreter, max_tentatives=max_tentatives)
+    abandon = transfert.executer()['abandon']
+    envoyees = emetteur.trames_envoyees
+    if arret is not None:
+        etat.fermer()
+        return resultat(False, plan, envoyees, arret)
+    if abandon is not None:
+        # La base a epuise ses tentatives
+        etat.sauvegarder()
+        etat.fermer()
+        return resultat(False, plan, envoyees,
+                        f"trame #{plan[transfert.base]} abandonnee apres {max_tentatives} tentatives (etat sauvegarde)")
+
+    # Toutes les trames de la session sont acquittees
+    etat.sauvegarder()
+    if not etat.complet():
+        etat.fermer()
+        return resultat(False, plan, envoyees)
+    if not etat.verifier():
+        # Fichier reassemble different de l'original: on ne livre pas, tout repart de zero
+        origine = "fichier partiel repris" if etat.reprise else "fichier recu"
+        etat.recommencer()
+        etat.fermer()
+        return resultat(False, plan, envoyees, f"crc32 du {origine} invalide, transfert recommence",
+                        crc_invalide=True)
+    etat.terminer()
+    return resultat(True, plan, envoyees)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    fichier_message = '../message.txt'
+    with open(fichier_message, 'rb') as f:
+        original = f.read()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        sortie = os.path.join(dossier, 'message_recu.txt')
+
+        # Session 1: arret brutal du processus au milieu du transfert
+        sessions = [simulation_reprise(fichier_message, sortie, probErreur=0.05, probPerte=0.05, delaiMax=0.002,
+                                       timeout=0.05, intervalle=16, arret_apres=40)]
+
+        # Fichier partiel abime entre deux sessions (le bitmap le croit bon):
+        # le crc32 final le detecte et le transfert recommence
+        with open(sortie + '.part', 'r+b') as f:
+            f.write(b'#' * 16)
+
+        # Sessions suivantes sur un lien tres instable: chaque abandon sauvegarde l'etat,
+        # la session suivante ne renvoie que ce qui manque
+        while not sessions[-1]['succes']:
+            sessions.append(simulation_reprise(fichier_message, sortie, probErreur=0.25, probPerte=0.25,
+                                               delaiMax=0.002, timeout=0.05, max_tentatives=3, intervalle=16))
+
+        with open(sortie, 'rb') as f:
+            recu = f.read()
+
+    nb_trames = (len(original) + TAILLE_MAX_DATA - 1) // TAILLE_MAX_DATA
+    print(f"Sessions               : {len(sessions)}")
+    print(f"Fichier partiel rejete : {sum(s['crc_invalide'] for s in sessions)} fois (crc32)")
+    print(f"Trames du fichier      : {nb_trames}")
+    print(f"Trames envoyees (total): {sum(s['envoyees'] for s in sessions)} "
+          f"(+{sum(s['retransmises'] for s in sessions)} retransmissions)")
+    print(f"Fichier identique      : {recu == original}")
@@ -0,0 +1,171 @@
+import time
+from collections import deque
+from canal import Canal
+from protocole import Trame, Emetteur, Recepteur, TYPE_DATA, TAILLE_MAX_DATA, TIMEOUT, get_timestamp, \
+    transfert_gobackn
+
+# Sessions multiplexees sur un seul lien
+# Plusieurs flux logiques partagent la meme connexion Go-Back-N:
+# - chaque trame porte l'identifiant de son flux dans l'en-tete (BIT_FLUX)
+# - l'emetteur choisit quelle trame entre dans la fenetre avec un ordonnanceur:
+#   priorite stricte entre classes, deficit round-robin (DRR) a l'interieur d'une classe
+# - le recepteur reassemble chaque flux separement
+# Un petit message de controle n'attend donc pas derriere un gros transfert.
+
+
+class Flux:
+    # Un flux logique a envoyer
+
+    def __init__(self, id_flux, donnees, priorite=0, quantum=TAILLE_MAX_DATA):
+        if not 0 <= id_flux <= 255:
+            raise ValueError("id_flux doit tenir sur 1 octet")
+        self.id_flux = id_flux
+        self.taille = len(donnees)
+        self.priorite = priorite  # 0 = la plus haute
+        self.quantum = quantum    # octets credites a chaque tour DRR
+
+        self.chunks = deque(donnees[i:i + TAILLE_MAX_DATA] for i in range(0, len(donnees), TAILLE_MAX_DATA))
+        self.deficit = 0
+
+
+class OrdonnanceurFlux:
+    # Priorite stricte entre classes, deficit round-robin dans chaque classe
+
+    def __init__(self):
+        self.classes = {}  # priorite -> deque de flux actifs
+
+    def ajouter_flux(self, flux):
+        self.classes.setdefault(flux.priorite, deque()).append(flux)
+
+    def vide(self):
+        return not any(self.classes.values())
+
+    def prochaine_trame(self):
+        # Retourne (id_flux, chunk) ou None si aucun flux n'a de donnees
+        for priorite in sorted(self.classes):
+            actifs = self.classes[priorite]
+            while actifs:
+                flux = actifs[0]
+                if not flux.chunks:
+                    # Flux termine: il quitte la liste et perd son credit
+                    actifs.popleft()
+                    flux.deficit = 0
+                    continue
+
+                if flux.deficit >= len(flux.chunks[0]):
+                    chunk = flux.chunks.popleft()
+                    flux.deficit -= len(chunk)
+                    return flux.id_flux, chunk
+
+                # Credit insuffisant: le flux recoit son quantum et passe son tour
+                flux.deficit += flux.quantum
+                actifs.rotate(-1)
+        return None
+
+
+class RecepteurSessions(Recepteur):
+    # Recepteur Go-Back-N qui reassemble chaque flux separement
+
+    def __init__(self, canal, tailles):
+        super().__init__(canal)
+        self.tailles = tailles  # id_flux -> taille attendue
+        self.donnees_flux = {}  # id_flux -> bytearray
+        self.termines = {}      # id_flux -> instant ou le flux est complet
+
+    def traiter_trame(self, trame, crc_valide):
+        avant = self.dernier_num_seq
+        ack = super().traiter_trame(trame, crc_valide)
+        if self.dernier_num_seq != avant:
+            # Trame livree: on l'ajoute a son flux
+            recu = self.donnees_flux.setdefault(trame.flux, bytearray())
+            recu.extend(self.trames_recues[-1][1])
+            if len(recu) == self.tailles[trame.flux]:
+                self.termines[trame.flux] = time.time()
+                print(f"[{get_timestamp()}]   🏁 Flux {trame.flux} complet")
+        return ack
+
+
+def simulation_sessions(flux_specs, probErreur=0.05, probPerte=0.10, delaiMax=0.02,
+                        timeout=TIMEOUT, taille_fenetre=5):
+    # Simulation de plusieurs flux logiques sur un seul lien Go-Back-N
+    # flux_specs: liste de dicts {'id', 'donnees', 'priorite' (opt.), 'arrivee' (opt.)}
+    #   arrivee = nombre de trames deja envoyees sur le lien quand le flux apparait
+
+    print("\n" + "="*70)
+    print("SIMULATION SESSIONS MULTIPLEXEES")
+    print("="*70)
+    for spec in flux_specs:
+        print(f"Flux {spec['id']}: {len(spec['donnees'])} octets, priorite={spec.get('priorite', 0)}, "
+              f"arrivee apres {spec.get('arrivee', 0)} trames")
+    print("="*70 + "\n")
+
+    canal = Canal(probErreur=probErreur, probPerte=probPerte, delaiMax=delaiMax)
+    emetteur = Emetteur(canal, timeout=timeout, taille_fenetre=taille_fenetre)
+    recepteur = RecepteurSessions(canal, {spec['id']: len(spec['donnees']) for spec in flux_specs})
+    ordonnanceur = OrdonnanceurFlux()
+
+    a_venir = sorted(flux_specs, key=lambda s: s.get('arrivee', 0))
+    temps_arrivee = {}
+
+    def source():
+        # Trames choisies par l'ordonnanceur, au moment ou la fenetre a de la place
+        envoyees = 0
+        while a_venir or not ordonnanceur.vide():
+            # Nouveaux flux (ou le suivant tout de suite si l'ordonnanceur n'a plus rien)
+            while a_venir and (a_venir[0].get('arrivee', 0) <= envoyees or ordonnanceur.vide()):
+                spec = a_venir.pop(0)
+                ordonnanceur.ajouter_flux(Flux(spec['id'], spec['donnees'], spec.get('priorite', 0)))
+                temps_arrivee[spec['id']] = time.time()
+                print(f"[{get_timestamp()}] ➕ Flux {spec['id']} ouvert")
+            choix = ordonnanceur.prochaine_trame()
+            if choix is not None:
+                envoyees += 1
+                yield choix
+
+    def encoder(num, choix):
+        id_flux, chunk = choix
+        return Trame(num % 256, chunk, TYPE_DATA, flux=id_flux).serialiser()
+
+    duree = transfert_gobackn(emetteur, recepteur, source(), encoder=encoder)['duree']
+    temps_fin = recepteur.termines
+    trames_envoyees = emetteur.trames_envoyees
+    trames_retransmises = emetteur.trames_retransmises
+
+    print("\n" + "="*70)
+    print("RESULTATS PAR FLUX")
+    print("="*70)
+    succes = True
+    for spec in flux_specs:
+        id_flux = spec['id']
+        identique = bytes(recepteur.donnees_flux.get(id_flux, b'')) == spec['donnees']
+        succes = succes and identique
+        delai = temps_fin.get(id_flux, time.time()) - temps_arrivee[id_flux]
+        print(f"Flux {id_flux}: {len(spec['donnees'])} octets, termine en {delai:.2f} s apres son arrivee, "
+              f"identique: {identique}")
+    print("-"*70)
+    print(f"Trames envoyees     : {trames_envoyees}")
+    print(f"Trames retransmises : {trames_retransmises}")
+    print(f"Duree totale        : {duree:.2f} s")
+    print("="*70 + "\n")
+
+    return {
+        'envoyees': trames_envoyees,
+        'retransmises': trames_retransmises,
+        'duree': duree,
+        'succes': succes,
+        'delais': {i: temps_fin.get(i, time.time()) - temps_arrivee[i] for i in temps_arrivee}
+    }
+
+
+if __name__ == "__main__":
+    with open('../message.txt', 'rb') as f:
+        gros_fichier = f.read() * 3
+
+    controle = b"CTRL: changer le debit a 9600 bauds"
+
+    # Un gros transfert, puis un message de controle prioritaire et un petit fichier
+    simulation_sessions([
+        {'id': 1, 'donnees': gros_fichier, 'priorite': 1},
+        {'id': 2, 'donnees': controle, 'priorite': 0, 'arrivee': 20},
+        {'id': 3, 'donnees': b"petit fichier " * 30, 'priorite': 1, 'arrivee': 40},
+    ], probErreur=0.05, probPerte=0.05, delaiMax=0.005, timeout=0.05)
@@ -31,6 +31,12 @@ def bit_destuffing(bits_str):
 
     # Retire le bit-stuffing: enleve les '0' inseres apres 5 bits '1' consecutifs
 
+    # Cas normal (aucune suite de 6 '1'): chaque '11111' est suivi du '0' stuffe,
+    # un seul remplacement (fait en C) donne le meme resultat que la boucle
+    if '111111' not in bits_str:
+        return bits_str.replace('111110', '11111')
+
+    # Trame anormale (corrompue): boucle bit par bit
     resultat = ""
     compteur_uns = 0
     i = 0
@@ -80,22 +86,14 @@ def extraire_entre_flags(trame_bits):
     FLAG = "01111110"
     
     # Trouver la position du premier FLAG
-    position_debut = -1
-    for i in range(len(trame_bits) - len(FLAG) + 1):
-        if trame_bits[i:i+len(FLAG)] == FLAG:
-            position_debut = i
-            break
+    position_debut = trame_bits.find(FLAG)
     
     # Si pas de FLAG de debut, retourner None
     if position_debut == -1:
         return None
     
     # Chercher le FLAG de fin (apres le FLAG de debut)
-    position_fin = -1
-    for i in range(position_debut + len(FLAG), len(trame_bits) - len(FLAG) + 1):
-        if trame_bits[i:i+len(FLAG)] == FLAG:
-            position_fin = i
-            break
+    position_fin = trame_bits.find(FLAG, position_debut + len(FLAG))
     
     # Si pas de FLAG de fin, retourner None
     if position_fin == -1:
@@ -108,6 +106,106 @@ def extraire_entre_flags(trame_bits):
     
     return donnees
 
+def ajouter_flags_multiples(liste_data_bits):
+
+    # Colle plusieurs trames (deja stuffees) dans un seul flux HDLC
+    # Un seul flag entre deux trames: le flag de fin d'une trame sert de flag de debut a la suivante
+
+    FLAG = "01111110"
+
+    return FLAG + FLAG.join(liste_data_bits) + FLAG
+
+
+def extraire_trames(flux_bits):
+
+    # Extrait les donnees de toutes les trames d'un flux HDLC
+    # Les flags consecutifs (flags non partages, remplissage) donnent des segments vides, ignores
+    # Le stuffing garantit qu'un flag ne peut pas apparaitre dans les donnees
+
+    FLAG = "01111110"
+
+    trames = []
+    position = flux_bits.find(FLAG)
+    while position != -1:
+        suivant = flux_bits.find(FLAG, position + len(FLAG))
+        if suivant == -1:
+            break
+
+        segment = flux_bits[position + len(FLAG):suivant]
+        if segment:
+            trames.append(segment)
+        position = suivant
+
+    return trames
+
+
+# ======================================================================
+# Tramage oriente octet (PPP / HDLC asynchrone, RFC 1662)
+# Flag 0x7E, echappement 0x7D: un octet 0x7E ou 0x7D des donnees devient
+# 0x7D suivi de l'octet XOR 0x20. On reste aligne sur l'octet: tout se fait
+# avec bytes.replace/split/find (en C), sans passer par une chaine de bits.
+# ======================================================================
+
+FLAG_PPP = b'\x7e'
+ECHAPPEMENT_PPP = b'\x7d'
+
+
+def byte_stuffing(data):
+    # Echapper 0x7D d'abord, sinon les 0x7D ajoutes pour 0x7E seraient echappes a nouveau
+    return bytes(data).replace(b'\x7d', b'\x7d\x5d').replace(b'\x7e', b'\x7d\x5e')
+
+
+def byte_destuffing(data):
+    # Retire l'echappement; retourne None si une sequence d'echappement est invalide
+    data = bytes(data)
+    if ECHAPPEMENT_PPP not in data:
+        return data
+    morceaux = data.split(ECHAPPEMENT_PPP)
+    resultat = bytearray(morceaux[0])
+    for morceau in morceaux[1:]:
+        # Chaque 0x7D doit etre suivi d'un octet echappe (0x5D ou 0x5E)
+        if not morceau or morceau[0] not in (0x5D, 0x5E):
+            return None
+        resultat.append(morceau[0] ^ 0x20)
+        resultat += morceau[1:]
+    return bytes(resultat)
+
+
+def ajouter_flags_octets(data):
+    # FLAG + donnees (deja echappees) + FLAG
+    return FLAG_PPP + data + FLAG_PPP
+
+
+def extraire_entre_flags_octets(trame):
+    # Donnees entre le premier flag et le suivant, ou None
+    position_debut = trame.find(FLAG_PPP)
+    if position_debut == -1:
+        return None
+    position_fin = trame.find(FLAG_PPP, position_debut + 1)
+    if position_fin == -1:
+        return None
+    return trame[position_debut + 1:position_fin]
+
+
+def ajouter_flags_multiples_octets(liste_data):
+    # Plusieurs trames echappees dans un seul flux, un flag partage entre deux trames
+    return FLAG_PPP + FLAG_PPP.join(liste_data) + FLAG_PPP
+
+
+def extraire_trames_octets(flux):
+    # Donnees de toutes les trames d'un flux (segments vides ignores)
+    morceaux = flux.split(FLAG_PPP)
+    # Le morceau avant le premier flag et celui apres le dernier ne sont pas des trames
+    return [morceau for morceau in morceaux[1:-1] if morceau]
+
+
+def bytes_to_bits(data):
+    # Convertit des bytes en string de bits (une seule conversion via un entier)
+    if len(data) == 0:
+        return ""
+    return format(int.from_bytes(data, 'big'), f"0{len(data) * 8}b")
+
+
 def bits_to_bytes(bits_str):
     # Convertit un string de bits en bytes
     # Padding si nécessaire pour avoir un multiple de 8
@@ -158,6 +256,35 @@ if __name__ == "__main__":
 
     print("testing destuffing : " + bit_destuffing(extraire_entre_flags(ajouter_flags(bit_stuffing(codeWithoutStuffing)))))
 
+    print("\n===== TEST FLUX: plusieurs trames avec flags partages =====")
+    morceaux = ["0111111", "1111101111", "0000"]
+    flux = ajouter_flags_multiples([bit_stuffing(m) for m in morceaux])
+    print("Flux : " + flux)
+    extraites = [bit_destuffing(t) for t in extraire_trames(flux)]
+    print("Trames extraites : ", extraites, extraites == morceaux)
+
+    print("\n===== TEST TRAMAGE OCTET (PPP) =====")
+    donnees = bytes([0x01, 0x7E, 0x7D, 0x7E, 0x20, 0x7D])
+    echappees = byte_stuffing(donnees)
+    print("Donnees  :", donnees.hex())
+    print("Echappees:", echappees.hex())
+    flux_octets = ajouter_flags_multiples_octets([echappees, byte_stuffing(b"abc")])
+    print("Trames extraites:", [byte_destuffing(t) for t in extraire_trames_octets(flux_octets)])
+    print("Identiques:", byte_destuffing(extraire_entre_flags_octets(ajouter_flags_octets(echappees))) == donnees)
+
+    import os
+    import time
+    payload = os.urandom(100)
+    debut = time.perf_counter()
+    for _ in range(2000):
+        bit_destuffing(bit_stuffing(bytes_to_bits(payload)))
+    duree_bits = time.perf_counter() - debut
+    debut = time.perf_counter()
+    for _ in range(2000):
+        byte_destuffing(byte_stuffing(payload))
+    duree_octets = time.perf_counter() - debut
+    print(f"2000 x 100 octets: bit stuffing {duree_bits*1000:.0f} ms, byte stuffing {duree_octets*1000:.1f} ms")
+
     # ===========================
     # TEST COMPLET AVEC CRC
     # ===========================